@@ -11,5 +11,7 @@
 
 from app import *
 
-game = Monopoly()
-game.run()
+# Worker processes import this module again, and must not open a game of their own
+if __name__ == "__main__":
+    game = Monopoly()
+    game.run()
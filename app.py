@@ -1,5 +1,6 @@
 from consts import *
 from game import *
+from winprob import WinProbabilityEstimator
 from tkinter import *
 from win32.win32api import GetSystemMetrics
 
@@ -14,6 +15,7 @@ class Monopoly:
         """
         self.mainWindow = Tk()
         self._playerInfo = None
+        self._drawnVersion = None
         self.gameLog = None
         self.showWelcome()
 
@@ -104,6 +106,7 @@ class Monopoly:
             players.append((playerId, name, nameColor[1].get()))
 
         self.game = Game(players)
+        self.game.shuffleDecks()
         self.draw()
 
     def draw(self):
@@ -112,6 +115,7 @@ class Monopoly:
             log to the mainWindow
         """
         self._clear(self.mainWindow)
+        self._drawnVersion = self.game.getVersion()
         self.drawBoard()
         self.createControls()
         self.createPlayerInfo()
@@ -123,8 +127,12 @@ class Monopoly:
 
     def redraw(self):
         """
-            Redraws the board and playerInfo Frame
+            Redraws the board and playerInfo Frame, if the game has changed since they were last
+            drawn
         """
+        if self.game.getVersion() == self._drawnVersion:
+            return
+        self._drawnVersion = self.game.getVersion()
         self.drawBoard()
         self.createPlayerInfo()
 
@@ -135,7 +143,7 @@ class Monopoly:
         """
         board = Canvas(self.mainWindow, width=longPlus[9] +
                        TILE_LONG, height=longPlus[9]+TILE_LONG, bg="#c0e2ca")
-        for tile in self.game.getBoard():
+        for tile in self.game.getBoardView():
             self._drawTile(tile, board)
         board.grid(row=0, column=0, rowspan=3)
         self._drawPlayers(board)
@@ -167,6 +175,9 @@ class Monopoly:
         Button(controlFrame, text="Help", padx=5, command=self._help,
                bg="#03c2fc").grid(row=2, column=1)
 
+        Button(controlFrame, text="Win Odds", command=self._winOdds,
+               bg="#03c2fc").grid(row=2, column=2)
+
     def createPlayerInfo(self):
         """
             Adds a frame with the stats of the current player to the mainWindow
@@ -245,8 +256,9 @@ class Monopoly:
             Parameter: cvs, the canvas to draw to
             Requires: Must be of type tk.Canvas
         """
-        pieceSize = int((TILE_LONG - HOUSE_SIZE) / len(self.game.getPlayers()))
-        for playerNumber, player in enumerate(self.game.getPlayers(), start=1):
+        players = self.game.getPlayersView()
+        pieceSize = int((TILE_LONG - HOUSE_SIZE) / len(players))
+        for playerNumber, player in enumerate(players, start=1):
             color = None if player["color"] is None else self._toHex(player["color"])
             color = "#ffffff" if color == GAME_BOARD_COLOR else color
             x = self._getPlayerTopLeft(playerNumber, player["location"], pieceSize)[0]
@@ -802,6 +814,54 @@ class Monopoly:
         rules.tag_config("title", justify=CENTER, font=TITLE_FONT)
         rules.tag_add("content", 2.0, END)
         rules.tag_config("content", font=GENERAL_TEXT_FONT)
+  # Win Odds
+
+    def _winOdds(self):
+        """
+            Command of win odds button in controls
+
+            Creates a Top Level showing the chance each player has of winning from the game as it
+            is now, estimated by rollouts in other processes. The window polls the estimator with
+            after, so the game can be played on while it fills in, and stops it when closed
+        """
+        estimator = WinProbabilityEstimator(self.game)
+        thread = estimator.start()
+        pollId = None
+        oddsWindow = Toplevel()
+        labels = {}
+        for row, player in enumerate(self.game.getPlayers()):
+            labels[player["name"]] = Label(oddsWindow, text=f"{player['name']}: ...", padx=5)
+            labels[player["name"]].grid(row=row, column=0, sticky=W)
+        status = Label(oddsWindow, text="Estimating...")
+        status.grid(row=len(labels), column=0)
+
+        def _close():
+            if pollId is not None:
+                oddsWindow.after_cancel(pollId)
+            estimator.stop()
+            oddsWindow.destroy()
+
+        def _poll():
+            nonlocal pollId
+            # Checked before reading latest, so the last estimate of a finished thread is seen
+            running = thread.is_alive()
+            estimate = estimator.latest
+            if estimate is not None:
+                for name, label in labels.items():
+                    low, high = estimate.intervals[name]
+                    label.config(text=f"{name}: {estimate.probabilities[name]:.0%} "
+                                      f"({low:.0%} - {high:.0%})")
+                status.config(text=f"{estimate.rollouts} games played" +
+                              ("" if estimate.done else "..."))
+            if running and (estimate is None or not estimate.done):
+                pollId = oddsWindow.after(WIN_ODDS_POLL, _poll)
+                return
+            pollId = None
+            if estimate is None or not estimate.done:
+                status.config(text="Estimate stopped")
+
+        oddsWindow.protocol("WM_DELETE_WINDOW", _close)
+        _poll()
   # Auction
 
     def _auction(self, propName):
@@ -927,7 +987,7 @@ class Monopoly:
         tradeLogs = ["Trade Success", "Trade Fail"]
         jailLogs = ["Jail", "Jail Success", "Jail Fail"]
         bankruptcyLogs = ["Bankruptcy Player", "Bankruptcy Bank"]
-        otherLogs = ["Rent", "Tax", "Roll"]
+        otherLogs = ["Rent", "Tax", "Roll", "Bankruptcy"]
 
         for log in logs:
             if log[0] == "Card" or log[0] in otherLogs:
@@ -0,0 +1,161 @@
+"""
+    Runs auctions between automated players without the GUI
+
+    Every bidder submits a valuation, the most they are willing to pay, through their policy's
+    bid decision. An AuctionEngine gathers the valuations of every auction waiting in a batch of
+    games with one bidArray call per policy, or one decideBatch call for policies that cannot bid
+    with arrays, then settles all of them at once with array operations in resolve. Two kinds of
+    auction are supported:
+
+        SEALED: every bidder pays what they bid, the highest bid wins. This is how the Simulator
+        has always settled auctions, so it is the default
+        ENGLISH: the price rises in steps of increment until one bidder is left, who pays one
+        step over the second highest valuation, never more than their own
+"""
+import numpy as np
+
+# The kinds of auction
+SEALED = "sealed"
+ENGLISH = "english"
+
+# The step the price of an English auction rises by
+BID_INCREMENT = 10
+
+
+def resolve(valuations, cash, mode=SEALED, increment=BID_INCREMENT):
+    """
+        Returns a (winners, prices) tuple of int numpy arrays with the index of the winning bidder
+        of every auction, -1 if no one bid, and the price they pay. Valuations are capped at the
+        bidder's cash, and ties go to the first bidder
+
+        Parameter: valuations, the valuation of every bidder in every auction, one row per
+        auction, 0 for bidders that do not take part
+        Requires: Must be of type 2d int numpy array
+
+        Parameter: cash, the cash of every bidder in every auction
+        Requires: Must be of type 2d int numpy array, with the shape of valuations
+
+        Parameter: mode, the kind of auction, SEALED or ENGLISH
+        Requires: Must be of type string
+
+        Parameter: increment, the step the price of an English auction rises by
+        Requires: Must be of type int, greater than 0
+    """
+    bids = np.maximum(np.minimum(valuations, cash), 0)
+    winners = bids.argmax(1)
+    top = bids[np.arange(len(bids)), winners]
+    if mode == ENGLISH and bids.shape[1] > 1:
+        second = np.partition(bids, bids.shape[1] - 2, 1)[:, -2]
+        prices = np.minimum(top, second + increment)
+    elif mode == ENGLISH:
+        prices = np.minimum(top, increment)
+    else:
+        prices = top
+    winners[top <= 0] = -1
+    return winners, prices
+
+
+class AuctionEngine:
+    def __init__(self, mode=SEALED, increment=BID_INCREMENT):
+        """
+            Creates an engine settling auctions of the kind mode
+
+            Parameter: mode, the kind of auction, SEALED or ENGLISH
+            Requires: Must be of type string
+
+            Parameter: increment, the step the price of an English auction rises by
+            Requires: Must be of type int, greater than 0
+        """
+        if mode not in (SEALED, ENGLISH):
+            raise ValueError(f"Unknown auction mode {mode}")
+        self.mode = mode
+        self.increment = increment
+
+    def auction(self, game, tile, policies, bids=None):
+        """
+            Auctions tile between every player in game, selling it to the winner. The tile stays
+            with the bank if no one bids
+
+            Returns: A (winner name, price) tuple, None if no one bid
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: tile, the tile being auctioned
+            Requires: Must be of type dict
+
+            Parameter: policies, the policy of each player, by player id
+            Requires: Must be of type dict with int keys and Policy values
+
+            Parameter: bids, valuations already submitted, by player id, which are not asked for
+            again
+            Requires: Must be of type dict with int keys and int values, or None
+        """
+        return self.decideBatch("auction", [(game, tile, policies, bids)])[0]
+
+    def decideBatch(self, decision, requests):
+        """
+            Runs every auction in requests at once, see auction. Lets the engine stand in for a
+            policy in the requests of Simulator.steps, so playBatch settles every auction waiting
+            in a batch of games together
+
+            Returns: A list of the result of each auction
+
+            Parameter: decision, the name of the decision
+            Requires: Must be "auction"
+
+            Parameter: requests, the arguments of auction for each auction
+            Requires: Must be of type tuple list
+        """
+        winners, prices = self.settle(requests)
+        results = []
+        for (game, tile, policies, bids), winner, price in zip(requests, winners.tolist(),
+                                                               prices.tolist()):
+            if winner < 0:
+                results.append(None)
+                continue
+            name = game.players[winner].name
+            game.auction(tile["name"], price, name)
+            results.append((name, price))
+        return results
+
+    def settle(self, requests):
+        """
+            Returns the (winners, prices) of every auction in requests, see resolve, without
+            selling the tiles. The valuations of each policy are asked for with a single call to
+            its bidArray, or to its decideBatch if bidArray returns None
+
+            Parameter: requests, the arguments of auction for each auction
+            Requires: Must be of type tuple list
+        """
+        numBidders = max(len(request[0].players) for request in requests)
+        valuations = [0] * (len(requests) * numBidders)
+        cash = [0] * (len(requests) * numBidders)
+        # The bidders asked for a valuation by each policy: their index in valuations, the price
+        # of the tile, their cash, and the game, tile and player to ask bid about
+        asks = {}
+        for row, (game, tile, policies, bids) in enumerate(requests):
+            price = tile["price"]
+            for index, player in enumerate(game.players, row * numBidders):
+                bidderCash = cash[index] = player.cash
+                if bids is not None and player.id in bids:
+                    valuations[index] = bids[player.id]
+                    continue
+                ask = asks.get(policies[player.id])
+                if ask is None:
+                    ask = asks[policies[player.id]] = ([], [], [], [])
+                ask[0].append(index)
+                ask[1].append(price)
+                ask[2].append(bidderCash)
+                ask[3].append((game, tile, player))
+
+        valuations = np.array(valuations, np.int64)
+        for policy, (indexes, prices, bidderCash, bidders) in asks.items():
+            bids = policy.bidArray(np.array(prices, np.int64), np.array(bidderCash, np.int64))
+            if bids is None:
+                bids = policy.decideBatch("bid", [(game, tile, player.getView())
+                                                  for game, tile, player in bidders])
+            valuations[indexes] = bids
+        shape = (len(requests), numBidders)
+        return resolve(valuations.reshape(shape), np.array(cash, np.int64).reshape(shape),
+                       self.mode, self.increment)
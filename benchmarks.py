@@ -0,0 +1,713 @@
+"""
+    Microbenchmarks for the game engine
+
+    Run every benchmark with `python benchmarks.py`, or a single one by passing its name,
+    e.g. `python benchmarks.py tileLookup`
+"""
+import copy
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+import auction
+import boardspec
+import events
+import markov
+import mcts
+import montecarlo
+import policies
+import replay
+import savegame
+import simulation
+import tournament
+import trades
+import valuation
+import winprob
+from boardspec import BOARD_PATH, loadBoardSpec
+from dice import Dice
+from game import Game, GamePool
+from objects import *
+
+
+# HELPERS ------------------------------------------------------------------------------------------
+def _loadBoard(state=None):
+    """
+        Returns a Board object built from the BoardSpec
+
+        Parameter: state, the state to store the tiles in, a new state if None
+        Requires: Must be of type BoardState or None
+    """
+    spec = loadBoardSpec()
+    tiles = [Tile(i, spec.names[i], spec.prices[i], spec.rents[i], spec.houseCosts[i],
+                  spec.colors[i]) for i in range(spec.numTiles)]
+    return Board(tiles, state)
+
+
+def _perCall(func, number):
+    """
+        Returns the best per call latency of func in microseconds over 5 repeats
+
+        Parameter: func, the function to time
+        Requires: Must be a function with no parameters
+
+        Parameter: number, the number of calls in each repeat
+        Requires: Must be of type int
+    """
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def _allocated(func):
+    """
+        Returns the number of bytes still allocated by the object func returns
+
+        Parameter: func, the function creating the object to measure
+        Requires: Must be a function with no parameters
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def _report(name, before, after):
+    """
+        Prints a line comparing the before and after latency of name
+
+        Parameter: name, the name of the operation timed
+        Requires: Must be of type string
+
+        Parameter: before, the latency before the change in microseconds
+        Requires: Must be of type float
+
+        Parameter: after, the latency after the change in microseconds
+        Requires: Must be of type float
+    """
+    print(f"  {name:<28}{before:>10.3f} us {after:>10.3f} us {before / after:>8.1f}x")
+
+
+# BENCHMARKS ---------------------------------------------------------------------------------------
+def benchTileLookup():
+    """
+        Compares the linear toDict scans Board used to do against the prebuilt indexes
+    """
+    board = _loadBoard()
+
+    def scanTileId(tileName):
+        for tile in board.tiles:
+            if tile.toDict()["name"] == tileName:
+                return tile.toDict()["id"]
+
+    def scanTile(tileId):
+        for tile in board.tiles:
+            if tile.toDict()["id"] == tileId:
+                return tile
+
+    print("tileLookup (per call, before / after)")
+    _report("getTileId('Boardwalk')",
+            _perCall(lambda: scanTileId("Boardwalk"), 2000),
+            _perCall(lambda: board.getTileId("Boardwalk"), 200000))
+    _report("getTileObject(39)",
+            _perCall(lambda: scanTile(39), 2000),
+            _perCall(lambda: board.getTileObject(39), 200000))
+    _report("getTile(getTileId(name))",
+            _perCall(lambda: scanTile(scanTileId("Boardwalk")).toDict(), 2000),
+            _perCall(lambda: board.getTile(board.getTileId("Boardwalk")), 200000))
+
+
+def benchStateCopy():
+    """
+        Compares copying the mutable state of a 4 player game with deepcopy against copying the
+        BoardState columns
+    """
+    state = BoardState(NUM_TILES, 4)
+    board = _loadBoard(state)
+    players = [Player(i, f"Player {i}", "red", state, i) for i in range(4)]
+    for tile in board.tiles[1::3]:
+        tile.owner = players[tile.id % 4]
+
+    print("stateCopy (per copy, deepcopy / BoardState.copy)")
+    _report("copy latency", _perCall(lambda: copy.deepcopy((board, players)), 50),
+            _perCall(state.copy, 20000))
+    deepBytes = _allocated(lambda: copy.deepcopy((board, players)))
+    stateBytes = _allocated(state.copy)
+    print(f"  {'copy size':<28}{deepBytes:>10} B  {stateBytes:>10} B  {deepBytes / stateBytes:>8.1f}x")
+
+
+def benchViews():
+    """
+        Compares copying the board and players to dictionaries against reading the live views,
+        the way the GUI reads them on a redraw
+    """
+    state = BoardState(NUM_TILES, 4)
+    board = _loadBoard(state)
+    players = [Player(i, f"Player {i}", "red", state, i) for i in range(4)]
+
+    def readCopies():
+        for tile in board.toDict():
+            tile["owner"], tile["numHouses"], tile["mortgaged"]
+        for player in [player.toDict() for player in players]:
+            player["location"]
+
+    def readViews():
+        for tile in board.getView():
+            tile["owner"], tile["numHouses"], tile["mortgaged"]
+        for player in [player.getView() for player in players]:
+            player["location"]
+
+    print("views (per redraw, toDict copies / live views)")
+    _report("read board and players", _perCall(readCopies, 500), _perCall(readViews, 500))
+
+
+def benchHeadless():
+    """
+        Reports the throughput of playing complete 4 player games without the GUI
+    """
+    batch = simulation.runGames(20)
+    print("headless (20 games of 4 players)")
+    print(f"  {'games/sec':<28}{batch.gamesPerSecond():>10.1f}")
+    print(f"  {'turns/sec':<28}{batch.turnsPerSecond():>10.0f}")
+
+
+def benchLockstep():
+    """
+        Compares the turn throughput of the object engine against the NumPy lockstep engine
+    """
+    batch = simulation.runGames(20)
+    result = montecarlo.runGames(20000, maxTurns=200)
+    print("lockstep (per turn, Game / MonteCarloEngine)")
+    _report("turn", 1e6 / batch.turnsPerSecond(), 1e6 / result.turnsPerSecond())
+
+
+def benchTournament():
+    """
+        Reports the games/sec of a tournament with 1 worker up to one worker per core
+    """
+    print(f"tournament (200 games, {os.cpu_count()} cores)")
+    baseline = None
+    for workers in range(1, os.cpu_count() + 1):
+        batch = tournament.runTournament(200, workers=workers, maxTurns=200)
+        baseline = baseline or batch.gamesPerSecond()
+        print(f"  {workers:>2} workers{batch.gamesPerSecond():>20.1f} games/sec "
+              f"{batch.gamesPerSecond() / baseline:>8.2f}x")
+
+
+def benchDice():
+    """
+        Compares rolling two dice with the global random.randint against the buffered Dice
+    """
+    dice = Dice(0)
+    print("dice (per pair of dice, random.randint / Dice.rollPair)")
+    _report("roll two dice", _perCall(lambda: (random.randint(1, 6), random.randint(1, 6)), 200000),
+            _perCall(dice.rollPair, 200000))
+
+
+def benchMarkov():
+    """
+        Compares estimating the landing probabilities by simulation against solving for them
+    """
+    result = montecarlo.runGames(20000, maxTurns=200)
+    markov._cache.clear()
+    start = timeit.default_timer()
+    markov.solve()
+    solved = (timeit.default_timer() - start) * 1e6
+    print("markov (landing probabilities, MonteCarloEngine / markov.solve)")
+    _report("landing probabilities", result.seconds * 1e6, solved)
+    print(f"  {'cached solve (us)':<28}{_perCall(markov.solve, 1000):>10.1f}")
+
+
+def benchRent():
+    """
+        Compares working out the rent of a landing the way Game used to against the rent table
+    """
+    board = _loadBoard(BoardState(NUM_TILES, 2))
+    players = [Player(i, f"Player {i}", "red", board.state, i) for i in range(2)]
+    for tile in board.tiles:
+        if tile.price > 0:
+            tile.setOwner(players[tile.id % 2])
+            players[tile.id % 2].giveProperty(tile.id, board)
+    railroads = ["Reading Railroad", "Pennsylvania Railroad", "B. & O. Railroad", "Short Line"]
+    utilities = ["Electric Company", "Water Works"]
+    landings = [tile.id for tile in board.tiles if tile.price > 0]
+
+    def numOwned(owner, props):
+        return sum(1 for prop in props if board.getTileObject(board.getTileId(prop)).owner == owner)
+
+    def computedRent():
+        for tileId in landings:
+            tile = board.getTile(tileId)
+            if tile["name"] in railroads:
+                25 << (numOwned(tile["owner"], railroads) - 1)
+            elif tile["name"] in utilities:
+                (10 if numOwned(tile["owner"], utilities) == 2 else 4) * 7
+            elif tile["color"] not in board.getMonopolies():
+                tile["rents"][0]
+            else:
+                tile["rents"][tile["numHouses"]]
+
+    def tableRent():
+        for tileId in landings:
+            rent = board.getRent(tileId)
+            if tileId in board.utilities:
+                rent *= 7
+
+    print("rent (per landing, computed / rent table)")
+    _report("rent", _perCall(computedRent, 2000) / len(landings),
+            _perCall(tableRent, 2000) / len(landings))
+
+
+def benchOwnership():
+    """
+        Compares changing the owner of a tile with the scan of every player and color group Game
+        used to do afterwards against checking the one group's holdings mask, in an 8 player game
+    """
+    game = Game([(i, f"Player {i}", "red") for i in range(8)])
+    board = game.board
+    colorGroups = {color: {board.tiles[tileId].name for tileId in group}
+                   for color, group in board.colorGroups.items() if color != "white"}
+    tile = board.getTileObject(board.getTileId("Boardwalk"))
+
+    def scanMonopolies():
+        for player in game.getPlayers():
+            for color, names in colorGroups.items():
+                if names <= player["properties"]:
+                    board.setMonopoly(color, player["name"])
+
+    def scanned():
+        for player in game.players:
+            tile.setOwner(player)
+            scanMonopolies()
+
+    def counted():
+        for player in game.players:
+            tile.setOwner(player)
+
+    print("ownership (per buy or trade of a tile, 8 players, rescan / masks)")
+    _report("change owner", _perCall(scanned, 2000) / 8, _perCall(counted, 2000) / 8)
+
+
+def benchCandidates():
+    """
+        Compares working out the buildable, sellable, mortgageable and unmortgageable properties
+        from the owned tile dictionaries, as Game used to, against the cached candidates
+    """
+    game = Game([(1, "Player 1", "red"), (2, "Player 2", "red")])
+    board = game.board
+    player = game.players[0]
+    for color in ("brown", "light blue", "orange", "green", "white"):
+        for tileId in board.getColorGroup(color):
+            if board.tiles[tileId].price > 0:
+                board.tiles[tileId].setOwner(player)
+                player.giveProperty(tileId, board)
+
+    def rebuilt():
+        monopolies = {color for color, owner in board.getMonopolies().items()
+                      if owner == player.name}
+        owned = [board.getTile(board.getTileId(name)) for name in player.properties]
+        fewest = {}
+        most = {}
+        for tile in owned:
+            if tile["color"] in monopolies:
+                fewest[tile["color"]] = min(fewest.get(tile["color"], 5), tile["numHouses"])
+                most[tile["color"]] = max(most.get(tile["color"], 0), tile["numHouses"])
+        owned = [board.getTile(board.getTileId(name)) for name in player.properties]
+        [tile["name"] for tile in owned if tile["numHouses"] == fewest.get(tile["color"])]
+        owned = [board.getTile(board.getTileId(name)) for name in player.properties]
+        [tile["name"] for tile in owned if tile["numHouses"] == most.get(tile["color"])]
+        owned = [board.getTile(board.getTileId(name)) for name in player.properties]
+        [tile["name"] for tile in owned if not tile["mortgaged"]]
+        owned = [board.getTile(board.getTileId(name)) for name in player.properties]
+        [tile["name"] for tile in owned if tile["mortgaged"]]
+
+    def cached():
+        game.getBuildable()
+        game.getSellable()
+        game.getMortgageable()
+        game.getUnmortgageable()
+
+    print(f"candidates (per turn, {len(player.properties)} properties, rebuilt / cached)")
+    _report("all four queries", _perCall(rebuilt, 2000), _perCall(cached, 2000))
+
+
+def benchHoldings():
+    """
+        Compares monopoly and trade checks on sets of tile names against holdings masks. The
+        monopolies are the ones the Board keeps from the masks as tiles change hands, and the
+        trade check reads the holdings column as Game._checkTrade does
+    """
+    board = _loadBoard(BoardState(NUM_TILES, 1))
+    player = Player(1, "Player 1", "red", board.state, 0)
+    for color in ("brown", "orange", "green", "white"):
+        for tileId in board.getColorGroup(color):
+            if board.tiles[tileId].price > 0:
+                board.tiles[tileId].setOwner(player)
+    names = set(player.properties)
+    colorNames = {color: {board.tiles[tileId].name for tileId in group}
+                  for color, group in board.colorGroups.items() if color != "white"}
+    offer = ["Boardwalk", "Park Place", "St. James Place"]
+
+    def namedMonopolies():
+        return [color for color, group in colorNames.items() if group <= names]
+
+    def maskedMonopolies():
+        return [color for color, owner in board.getMonopolies().items() if owner == "Player 1"]
+
+    def namedGiveAndTake():
+        names.add(board.getTile(39)["name"])
+        names.discard(board.getTile(39)["name"])
+
+    def maskedGiveAndTake():
+        player.giveProperty(39, board)
+        player.takeProperty(39, board)
+
+    print("holdings (per operation, name sets / masks)")
+    _report("give and take a property", _perCall(namedGiveAndTake, 20000),
+            _perCall(maskedGiveAndTake, 20000))
+    _report("monopolies", _perCall(namedMonopolies, 20000), _perCall(maskedMonopolies, 20000))
+    _report("owns trade offer", _perCall(lambda: all(name in names for name in offer), 20000),
+            _perCall(lambda: board.getMask(offer) & ~board.state.holdings[0] == 0, 20000))
+
+
+def benchUndo():
+    """
+        Compares trying a buy and going back with deepcopy, snapshot and restore, and the undo
+        journal
+    """
+    game = Game([(i, f"Player {i}", "red") for i in range(1, 5)], Dice(0))
+    game.currentPlayer.location = game.getTileId("Boardwalk")
+
+    def deepcopied():
+        copy.deepcopy(game).buy()
+
+    def snapshotted():
+        snapshot = game.snapshot()
+        game.buy()
+        game.restore(snapshot)
+
+    def journaled():
+        mark = game.mark()
+        game.buy()
+        game.undo(mark)
+
+    print("undo (per try and revert of a buy, deepcopy / snapshot / journal)")
+    before = _perCall(deepcopied, 20)
+    _report("snapshot and restore", before, _perCall(snapshotted, 5000))
+    _report("mark and undo", before, _perCall(journaled, 5000))
+
+
+def benchSave():
+    """
+        Reports the latency of saving and loading a game, in memory and in a memory mapped file
+    """
+    game = Game([(i, f"Player {i}", "red") for i in range(1, 5)], Dice(0))
+    simulation.Simulator(100).play(game, {i: simulation.Policy() for i in range(1, 5)})
+    data = savegame.dumps(game)
+    path = os.path.join(os.path.dirname(BOARD_PATH), "benchmark.saves")
+    saveFile = savegame.createSaveFile(path, game, 100000)
+    for i in range(1000):
+        saveFile.write(i, game)
+    print(f"save ({len(data)} bytes per game)")
+    print(f"  {'dumps (us)':<28}{_perCall(lambda: savegame.dumps(game), 5000):>10.3f}")
+    print(f"  {'loads (us)':<28}{_perCall(lambda: savegame.loads(game, data), 5000):>10.3f}")
+    print(f"  {'SaveFile.write (us)':<28}"
+          f"{_perCall(lambda: saveFile.write(random.randrange(1000), game), 5000):>10.3f}")
+    print(f"  {'SaveFile.read (us)':<28}"
+          f"{_perCall(lambda: saveFile.read(random.randrange(1000), game), 5000):>10.3f}")
+    saveFile.close()
+    os.remove(path)
+
+
+def benchEvents():
+    """
+        Compares formatting a log tuple for a rent payment against recording a RentPaid event,
+        and reports the cost of formatting an event on demand
+    """
+    game = Game([(i, f"Player {i}", "red") for i in range(1, 5)], Dice(0))
+    player, owner = game.players[0], game.players[1]
+    eventLog = events.EventLog()
+
+    def logTuple():
+        return ("Rent", f"{player.toDict()['name']} paid ${50} to {owner.toDict()['name']}")
+
+    print("events (per rent payment, log tuple / event)")
+    _report("record", _perCall(logTuple, 100000),
+            _perCall(lambda: eventLog.record(events.RENT_PAID, player.slot, owner.slot, 50), 100000))
+    event = next(iter(eventLog))
+    print(f"  {'formatEvent (us)':<28}{_perCall(lambda: events.formatEvent(event, game), 100000):>10.3f}")
+
+
+def benchReplay():
+    """
+        Compares rebuilding a 1000 turn game at a random turn by replaying every action against
+        loading the nearest checkpoint and replaying the rest
+    """
+    gameReplay = replay.Replay([(i, f"Player {i}", "red") for i in range(1, 5)], 0)
+    game = gameReplay.newGame()
+    simulation.Simulator(1000).play(gameReplay.recording(game),
+                                    {i: simulation.Policy() for i in range(1, 5)})
+
+    def fromStart():
+        turn = random.randrange(gameReplay.getNumTurns())
+        game = gameReplay.newGame()
+        for action in gameReplay.actions[:gameReplay.turnStarts[turn]]:
+            getattr(game, action[0])(*action[1:])
+
+    print(f"replay (per rebuild of a random turn of {gameReplay.getNumTurns()}, "
+          f"from the start / from a checkpoint)")
+    _report("rebuild", _perCall(fromStart, 20),
+            _perCall(lambda: gameReplay.gameAt(random.randrange(gameReplay.getNumTurns())), 200))
+
+
+def benchBoardSpec():
+    """
+        Compares parsing board.json against loading the BoardSpec from the precompiled cache and
+        from the process cache, and reports the cost of creating a Game
+    """
+    def parse():
+        with open(BOARD_PATH) as boardJson:
+            json.load(boardJson)
+
+    def precompiled():
+        boardspec._specs.clear()
+        loadBoardSpec()
+
+    print("boardSpec (per load, parse board.json / load spec)")
+    before = _perCall(parse, 2000)
+    _report("precompiled cache", before, _perCall(precompiled, 2000))
+    _report("process cache", before, _perCall(loadBoardSpec, 20000))
+    players = [(i, f"Player {i}", "red") for i in range(1, 5)]
+    print(f"  {'Game() (us)':<28}{_perCall(lambda: Game(players, Dice(0)), 2000):>10.3f}")
+
+
+def benchPool():
+    """
+        Compares the cost of getting a game ready to play by constructing it against taking it
+        from a GamePool
+    """
+    players = [(i, f"Player {i}", "red") for i in range(1, 5)]
+    pool = GamePool()
+    pool.release(Game(players, Dice(0)))
+
+    def pooled():
+        pool.release(pool.acquire(players, 0))
+
+    print("pool (per game, Game() / GamePool.acquire)")
+    _report("construct", _perCall(lambda: Game(players, Dice(0)), 2000), _perCall(pooled, 2000))
+
+
+def benchPolicies():
+    """
+        Compares CashThresholdPolicy deciding the buys, bids and builds waiting in 64 games one at
+        a time against its decideBatch, then playing the same 64 seeded games of the built in bots
+        one at a time against playing them in one batch, and reports how many decisions each
+        decideBatch call gets
+    """
+    calls = []
+
+    class CountingPolicy(policies.CashThresholdPolicy):
+        def decideBatch(self, decision, requests):
+            calls.append(len(requests))
+            return super().decideBatch(decision, requests)
+
+    counting = CountingPolicy()
+    players = [(i, f"Player {i}", "red") for i in range(1, 5)]
+    policyById = {1: policies.AlwaysBuyPolicy(), 2: counting, 3: policies.BuildMaxPolicy(),
+                  4: counting}
+    simulator = simulation.Simulator(300)
+    pool = GamePool(64)
+
+    games = [Game(players, Dice(seed)) for seed in range(64)]
+    for game in games:
+        simulation.Simulator(40).play(game, policyById)
+    requests = {"decideBuy": [(game, game.getTile(game.getTileId("Boardwalk"))) for game in games],
+                "bid": [(game, game.getTile(game.getTileId("Boardwalk")), player.getView())
+                        for game in games for player in game.players],
+                "decideBuild": [(game,) for game in games]}
+    print("policies (per decision, 64 games, CashThresholdPolicy one at a time / decideBatch)")
+    for decision, batch in requests.items():
+        decide = getattr(counting, decision)
+        _report(decision, _perCall(lambda: [decide(*args) for args in batch], 200) / len(batch),
+                _perCall(lambda: counting.decideBatch(decision, batch), 200) / len(batch))
+
+    def played(batched):
+        games = [pool.acquire(players, seed) for seed in range(64)]
+        if batched:
+            simulator.playBatch(games, policyById)
+        else:
+            for game in games:
+                simulator.play(game, policyById)
+        for game in games:
+            pool.release(game)
+
+    print("policies (per game, 64 seeded games of 300 turns, one at a time / one batch of 64)")
+    sequential = _perCall(lambda: played(False), 1) / 64
+    calls.clear()
+    _report("game", sequential, _perCall(lambda: played(True), 1) / 64)
+    print(f"  {'decisions per batch call':<28}{sum(calls) / len(calls):>10.1f}")
+
+
+def benchMcts():
+    """
+        Reports how many rollouts the MCTS policy plays per second of search, and how often it
+        wins the same 16 seeded games against the simple bots compared to its own rollout policy
+        in the same seat. Games still going after 300 turns are won by the richest player, see
+        mcts.netWorths, and the mean share of the net worth left is reported as well
+    """
+    bots = {2: policies.AlwaysBuyPolicy(), 3: policies.CashThresholdPolicy(),
+            4: policies.BuildMaxPolicy()}
+    players = [(i, f"Player {i}", "red") for i in range(1, 5)]
+    simulator = simulation.Simulator(300)
+    search = mcts.MCTSPolicy(timeBudget=0.01, seed=0)
+    print("mcts (16 games of 300 turns against AlwaysBuy, CashThreshold and BuildMax, 10ms "
+          "per decision)")
+    for name, policy in (("CashThreshold", policies.CashThresholdPolicy()), ("MCTS", search)):
+        wins = unfinished = 0
+        share = 0.0
+        for seed in range(16):
+            game = Game(players, Dice(seed))
+            result = simulator.play(game, {1: policy, **bots})
+            if result.winner is None:
+                unfinished += 1
+                worths = mcts.netWorths(game)
+                wins += max(worths, key=worths.get) == 0
+            else:
+                wins += result.winner == "Player 1"
+            share += mcts.score(game, 1) / 16
+        print(f"  {name + ' wins':<28}{wins:>10}   ({unfinished} won on net worth)")
+        print(f"  {name + ' net worth share':<28}{share:>10.2f}")
+    print(f"  {'rollouts/sec':<28}{search.rollouts / search.searchSeconds:>10.0f}")
+    print(f"  {'rollouts per game':<28}{search.rollouts / 16:>10.0f}")
+
+
+def benchValuation():
+    """
+        Compares working out the expected rent of every tile from scratch against querying a
+        RentValuation, before and after a house is built
+    """
+    game = Game([(1, "A", "red"), (2, "B", "blue"), (3, "C", "green")], Dice(0))
+    bot = policies.BuildMaxPolicy()
+    simulation.Simulator(100).play(game, {1: bot, 2: bot, 3: bot})
+    tileId = game.getTileId("Boardwalk")
+    rentValuation = valuation.RentValuation(game)
+    rentValuation.getIncomes()
+
+    def fresh():
+        return valuation.RentValuation(game).getIncome(tileId)
+
+    def afterBuild():
+        game.state.version += 1
+        return rentValuation.getIncome(tileId)
+
+    print("valuation (expected rent per opponent turn, from scratch / RentValuation)")
+    _report("query", _perCall(fresh, 2000), _perCall(lambda: rentValuation.getIncome(tileId),
+                                                     100000))
+    _report("query after a change", _perCall(fresh, 2000), _perCall(afterBuild, 20000))
+    print(f"  {'Boardwalk with a hotel':<28}"
+          f"{rentValuation.getIncomeAt(tileId, valuation.NUM_LEVELS - 1):>10.2f}")
+
+
+def benchTrades():
+    """
+        Times scoring every trade between the current player and each other player 60 turns
+        into a game, keeping every acceptable trade against keeping only the best 50
+    """
+    game = Game([(i, f"Player {i}", "red") for i in range(1, 5)], Dice(0))
+    bot = policies.AlwaysBuyPolicy()
+    simulation.Simulator(60).play(game, {i: bot for i in range(1, 5)})
+    partners = [player.name for player in game.players if player is not game.currentPlayer]
+    trades.evaluateTrades(game, partners[0])
+
+    def evaluate(limit):
+        for partner in partners:
+            trades.evaluateTrades(game, partner, limit=limit)
+
+    print(f"trades (every trade with {len(partners)} players 60 turns in, all kept / best "
+          f"{trades.TRADE_LIMIT} kept)")
+    _report("evaluate", _perCall(lambda: evaluate(10 ** 9), 5),
+            _perCall(lambda: evaluate(trades.TRADE_LIMIT), 5))
+
+
+def benchAuction():
+    """
+        Compares deciding an auction in each of 64 games by asking every bidder in turn, as the
+        Simulator used to, against settling them all at once with an AuctionEngine
+    """
+    bots = [policies.CashThresholdPolicy(100), policies.AlwaysBuyPolicy()]
+    games = [Game([(i, f"Player {i}", "red") for i in range(1, 5)], Dice(seed))
+             for seed in range(64)]
+    policyById = {i: bots[i % 2] for i in range(1, 5)}
+    requests = [(game, game.getTile(game.getTileId("Boardwalk")), policyById, None)
+                for game in games]
+
+    def oneByOne():
+        results = []
+        for game, tile, policyById, bids in requests:
+            topBid, topBidder = 0, None
+            for player in game.getPlayersView():
+                bid = min(policyById[player["id"]].bid(game, tile, player), player["cash"])
+                if bid > topBid:
+                    topBid, topBidder = bid, player["name"]
+            results.append((topBidder, topBid))
+        return results
+
+    print("auction (deciding 64 auctions with 4 bidders, one bidder at a time / AuctionEngine)")
+    before = _perCall(oneByOne, 500)
+    for mode in (auction.SEALED, auction.ENGLISH):
+        engine = auction.AuctionEngine(mode)
+        _report(mode, before, _perCall(lambda: engine.settle(requests), 500))
+
+
+def benchWinProbability():
+    """
+        Reports the rollouts/sec of a win probability estimate from a game 60 turns in, with 0
+        workers up to one worker per core, and the seconds each takes to narrow every interval to
+        5 points either side
+    """
+    bots = {1: policies.AlwaysBuyPolicy(), 2: policies.CashThresholdPolicy(),
+            3: policies.BuildMaxPolicy(), 4: policies.CashThresholdPolicy()}
+    game = Game([(i, f"Player {i}", "red") for i in range(1, 5)], Dice(0))
+    simulation.Simulator(60).play(game, bots)
+    print(f"winProbability ({os.cpu_count()} cores, rollouts of 200 turns)")
+    for workers in range(os.cpu_count() + 1):
+        estimator = winprob.WinProbabilityEstimator(game, bots, workers=workers)
+        for estimate in estimator.estimates(tolerance=0.05, deadline=60):
+            pass
+        print(f"  {workers:>2} workers{estimate.rollouts / estimate.seconds:>20.1f} rollouts/sec "
+              f"{estimate.seconds:>8.2f} s for {estimate.rollouts} rollouts")
+
+
+BENCHMARKS = {
+    "tileLookup": benchTileLookup,
+    "stateCopy": benchStateCopy,
+    "views": benchViews,
+    "headless": benchHeadless,
+    "lockstep": benchLockstep,
+    "tournament": benchTournament,
+    "dice": benchDice,
+    "markov": benchMarkov,
+    "rent": benchRent,
+    "ownership": benchOwnership,
+    "candidates": benchCandidates,
+    "holdings": benchHoldings,
+    "undo": benchUndo,
+    "save": benchSave,
+    "events": benchEvents,
+    "replay": benchReplay,
+    "boardSpec": benchBoardSpec,
+    "pool": benchPool,
+    "policies": benchPolicies,
+    "mcts": benchMcts,
+    "valuation": benchValuation,
+    "trades": benchTrades,
+    "auction": benchAuction,
+    "winProbability": benchWinProbability,
+}
+
+if __name__ == "__main__":
+    for benchName in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[benchName]()
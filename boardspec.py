@@ -0,0 +1,235 @@
+"""
+    Contains the immutable description of a board, loaded once per process and shared by every
+    game, engine and worker
+
+    A BoardSpec holds everything about the board that never changes during a game: the names,
+    prices, rents, house costs, colors and kinds of the tiles, and the tiles in each group.
+    loadBoardSpec caches specs by path, only reading the board file again once it changes, and
+    keeps a precompiled copy of the parsed file in the __pycache__ directory next to it, keyed by
+    the file's modification time and hash, so new processes skip parsing the JSON.
+"""
+import hashlib
+import json
+import marshal
+import os
+from types import MappingProxyType
+from consts import RAILROADS, TAXES, UTILITIES
+
+# The path of the board every game is played on, unless the MONOPOLY_BOARD environment variable
+# names another
+BOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "board.json")
+
+# Tile kinds
+PROPERTY, RAILROAD, UTILITY, TAX, CHANCE, COMMUNITY_CHEST, GO_TO_JAIL, OTHER = range(8)
+
+# The version of the precompiled cache format, caches of other versions are ignored
+CACHE_VERSION = 1
+
+# The specs already loaded, by absolute path, with the modification time and size of the file
+_specs = {}
+
+
+class BoardSpec:
+    __slots__ = ("path", "digest", "numTiles", "names", "prices", "rents", "houseCosts", "colors",
+                 "kinds", "taxes", "tileIds", "colorGroups", "railroads", "utilities")
+
+    def __init__(self, tiles, path=None, digest=None):
+        """
+            Creates the BoardSpec of the board with tiles, tiles
+
+            Parameter: tiles, the tiles of the board, as in board.json
+            Requires: Must be of type dict list
+
+            Parameter: path, the path of the file the board was loaded from
+            Requires: Must be of type string or None
+
+            Parameter: digest, the sha256 hex digest of the file the board was loaded from
+            Requires: Must be of type string or None
+        """
+        setField = object.__setattr__
+        setField(self, "path", path)
+        setField(self, "digest", digest)
+        setField(self, "numTiles", len(tiles))
+        setField(self, "names", tuple(tile["name"] for tile in tiles))
+        setField(self, "prices", tuple(tile["price"] for tile in tiles))
+        setField(self, "rents", tuple(tuple(tile["rents"]) for tile in tiles))
+        setField(self, "houseCosts", tuple(tile["house cost"] for tile in tiles))
+        setField(self, "colors", tuple(tile["color"] for tile in tiles))
+        setField(self, "taxes", tuple(TAXES.get(name, 0) for name in self.names))
+
+        tileIds = {}
+        colorGroups = {}
+        kinds = []
+        for i, tile in enumerate(tiles):
+            # Names such as Chance repeat, the first tile with the name is the one looked up
+            tileIds.setdefault(tile["name"], i)
+            if tile["name"] in RAILROADS:
+                kinds.append(RAILROAD)
+            elif tile["name"] in UTILITIES:
+                kinds.append(UTILITY)
+            elif tile["color"] != "white":
+                kinds.append(PROPERTY)
+                colorGroups.setdefault(tile["color"], []).append(i)
+            elif tile["name"] in TAXES:
+                kinds.append(TAX)
+            else:
+                kinds.append({"Chance": CHANCE, "Community Chest": COMMUNITY_CHEST,
+                              "Go To Jail": GO_TO_JAIL}.get(tile["name"], OTHER))
+        setField(self, "kinds", tuple(kinds))
+        setField(self, "tileIds", MappingProxyType(tileIds))
+        setField(self, "colorGroups", MappingProxyType({color: tuple(group)
+                                                       for color, group in colorGroups.items()}))
+        setField(self, "railroads", tuple(i for i, kind in enumerate(kinds) if kind == RAILROAD))
+        setField(self, "utilities", tuple(i for i, kind in enumerate(kinds) if kind == UTILITY))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardSpec is immutable")
+
+    def __len__(self):
+        return self.numTiles
+
+    def __deepcopy__(self, memo):
+        # The spec never changes, so every copy of a game can share it
+        return self
+
+    def __reduce__(self):
+        return BoardSpec.fromFields, (self.toFields(), self.path, self.digest)
+
+    def toFields(self):
+        """
+            Returns a tuple of every field of the spec but its path and digest, made of plain
+            tuples and dictionaries so it can be marshaled, which fromFields turns back into a
+            BoardSpec
+        """
+        return tuple(dict(value) if isinstance(value, MappingProxyType) else value
+                     for value in map(self.__getattribute__, self.__slots__[2:]))
+
+    @staticmethod
+    def fromFields(fields, path=None, digest=None):
+        """
+            Returns the BoardSpec with fields, fields, without working any of them out again
+
+            Parameter: fields, the fields of the spec
+            Requires: Must be returned by toFields
+
+            Parameter: path, the path of the file the board was loaded from
+            Requires: Must be of type string or None
+
+            Parameter: digest, the sha256 hex digest of the file the board was loaded from
+            Requires: Must be of type string or None
+        """
+        spec = BoardSpec.__new__(BoardSpec)
+        for name, value in zip(BoardSpec.__slots__, (path, digest) + tuple(fields)):
+            if isinstance(value, dict):
+                value = MappingProxyType(value)
+            object.__setattr__(spec, name, value)
+        return spec
+
+    def getTileId(self, tileName):
+        """
+            Returns the id of the first tile with name, tileName
+
+            Parameter: tileName, the name of the tile
+            Requires: Must be of type string, the name of a tile on the board
+        """
+        return self.tileIds[tileName]
+
+
+def loadBoardSpec(path=None):
+    """
+        Returns the BoardSpec of the board file at path, only reading the file again if it
+        changed since it was last loaded in this process
+
+        Parameter: path, the path of the board file, the MONOPOLY_BOARD environment variable or
+        BOARD_PATH if None
+        Requires: Must be of type string or None
+    """
+    if path is None:
+        path = os.environ.get("MONOPOLY_BOARD", BOARD_PATH)
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cached = _specs.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    spec = _loadPrecompiled(path, stat)
+    if spec is None:
+        with open(path, "rb") as boardFile:
+            contents = boardFile.read()
+        digest = hashlib.sha256(contents).hexdigest()
+        spec = _loadPrecompiled(path, stat, digest)
+        if spec is None:
+            spec = BoardSpec(json.loads(contents)["tiles"], path, digest)
+            _writePrecompiled(path, stat, spec)
+    _specs[path] = (stat.st_mtime_ns, stat.st_size, spec)
+    return spec
+
+
+# HELPERS ------------------------------------------------------------------------------------------
+def _cachePath(path):
+    """
+        Returns the path of the precompiled cache of the board file at path
+
+        Parameter: path, the absolute path of the board file
+        Requires: Must be of type string
+    """
+    return os.path.join(os.path.dirname(path), "__pycache__", os.path.basename(path) + ".spec")
+
+
+def _loadPrecompiled(path, stat, digest=None):
+    """
+        Returns the BoardSpec in the precompiled cache of the board file at path, None if there
+        is no cache or it does not match the file. Without digest, the cache matches if it was
+        written for the file's current modification time and size; with it, if it was written
+        for a file with that hash
+
+        Parameter: path, the absolute path of the board file
+        Requires: Must be of type string
+
+        Parameter: stat, the result of os.stat on the board file
+        Requires: Must be of type os.stat_result
+
+        Parameter: digest, the sha256 hex digest of the board file, or None
+        Requires: Must be of type string or None
+    """
+    try:
+        with open(_cachePath(path), "rb") as cacheFile:
+            version, mtime, size, cachedDigest, fields = marshal.loads(cacheFile.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION:
+        return None
+    if digest is None and (mtime, size) != (stat.st_mtime_ns, stat.st_size):
+        return None
+    if digest is not None and digest != cachedDigest:
+        return None
+    spec = BoardSpec.fromFields(fields, path, cachedDigest)
+    if digest is not None:
+        _writePrecompiled(path, stat, spec)
+    return spec
+
+
+def _writePrecompiled(path, stat, spec):
+    """
+        Writes the precompiled cache of the board file at path. The cache is only an
+        optimization, so a directory that cannot be written to is ignored
+
+        Parameter: path, the absolute path of the board file
+        Requires: Must be of type string
+
+        Parameter: stat, the result of os.stat on the board file
+        Requires: Must be of type os.stat_result
+
+        Parameter: spec, the BoardSpec of the board file
+        Requires: Must be of type BoardSpec
+    """
+    cachePath = _cachePath(path)
+    try:
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+        temporaryPath = f"{cachePath}.{os.getpid()}"
+        with open(temporaryPath, "wb") as cacheFile:
+            marshal.dump((CACHE_VERSION, stat.st_mtime_ns, stat.st_size, spec.digest,
+                          spec.toFields()), cacheFile)
+        os.replace(temporaryPath, cachePath)
+    except OSError:
+        pass
@@ -0,0 +1,63 @@
+"""
+    Contains the Chance and Community Chest decks, shared by every game and engine
+
+    Each card is a (text, opcode, argument) tuple. Games only keep the order of their decks and
+    the position of the next card, and play a card by looking its opcode up in a dispatch table,
+    so the same tables drive Game, the lockstep MonteCarloEngine and the Markov chain.
+"""
+
+# Card opcodes, with the meaning of their argument
+CASH = 0            # gain argument, negative to pay
+ADVANCE = 1         # advance to the tile with name argument
+NEAREST_UTILITY = 2
+NEAREST_RAILROAD = 3
+BACK = 4            # move back argument spaces
+JAIL = 5
+JAIL_CARD = 6
+REPAIRS = 7         # argument is (per house, per hotel)
+PAY_EACH = 8        # pay argument to every other player
+COLLECT_EACH = 9    # collect argument from every other player
+
+CHANCE_CARDS = (
+    ("You have won a crossword competition. Collect $100.", CASH, 100),
+    ("Advance To Go. Collect $200", ADVANCE, "Go"),
+    ("Advance to Illinois Ave. If you pass Go, collect $200.", ADVANCE, "Illinois Avenue"),
+    ("Advance to St. Charles Place. If you pass Go, collect $200.", ADVANCE, "St. Charles Place"),
+    ("Advance to nearest Utility. If unowned, you may buy it from the Bank. If owned, throw dice "
+     "and pay owner a total 10 times the amount thrown.", NEAREST_UTILITY, 0),
+    ("Advance to the nearest Railroad and pay owner twice the rental to which they is otherwise "
+     "entitled. If Railroad is unowned, you may buy it from the Bank. ", NEAREST_RAILROAD, 0),
+    ("Bank pays you dividend of $50.", CASH, 50),
+    ("Get out of Jail Free. This card may be kept until needed, or traded/sold.", JAIL_CARD, 0),
+    ("Go Back Three Spaces.", BACK, 3),
+    ("Go to Jail. Do not pass GO, do not collect $200.", JAIL, 0),
+    ("Make general repairs on all your property: For each house pay $25, For each hotel pay "
+     "$100.", REPAIRS, (25, 100)),
+    ("Pay poor tax of $15 ", CASH, -15),
+    ("Take a trip to Reading Railroad. If you pass Go, collect $200.", ADVANCE, "Reading Railroad"),
+    ("Take a walk on the Boardwalk.", ADVANCE, "Boardwalk"),
+    ("You have been elected Chairman of the Board. Pay each player $50.", PAY_EACH, 50),
+    ("Your building and loan matures. Collect $150.", CASH, 150),
+)
+
+COMMUNITY_CHEST_CARDS = (
+    ("Advance to Go.", ADVANCE, "Go"),
+    ("Bank error in your favor. Collect $200.", CASH, 200),
+    ("Doctor's fees. Pay $50.", CASH, -50),
+    ("From sale of stock you get $50.", CASH, 50),
+    ("Get Out of Jail Free. This card may be kept until needed or sold/traded.", JAIL_CARD, 0),
+    ("Go to Jail.Do not pass Go, Do not collect $200.", JAIL, 0),
+    ("Grand Opera Night. Collect $50 from every player for opening night seats.",
+     COLLECT_EACH, 50),
+    ("Holiday Fund matures. Collect $100.", CASH, 100),
+    ("Income tax refund. Collect $20.", CASH, 20),
+    ("It's your birthday. Collect $10 from every player.", COLLECT_EACH, 10),
+    ("Life insurance matures – Collect $100", CASH, 100),
+    ("Hospital Fees. Pay $50.", CASH, -50),
+    ("School fees. Pay $50.", CASH, -50),
+    ("Receive $25 consultancy fee.", CASH, 50),
+    ("You are assessed for street repairs: Pay $40 per house and $115 per hotel you own.",
+     REPAIRS, (40, 115)),
+    ("You have won second prize in a beauty contest. Collect $10.", CASH, 10),
+    ("You inherit $100.", CASH, 100),
+)
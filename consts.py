@@ -4,6 +4,21 @@
 # The amount of money each player starts with
 STARTING_CASH = 1500
 
+# The number of tiles on the board
+NUM_TILES = 40
+
+# The id of the Jail tile, where players sent to jail are put
+JAIL_TILE = 10
+
+# The names of the railroad tiles, whose rent depends on how many of them the owner has
+RAILROADS = ["Reading Railroad", "Pennsylvania Railroad", "B. & O. Railroad", "Short Line"]
+
+# The names of the utility tiles, whose rent is a multiple of the dice rolled
+UTILITIES = ["Electric Company", "Water Works"]
+
+# The tax owed for landing on each tax tile
+TAXES = {"Income Tax": 200, "Luxury Tax": 100}
+
 # Width of the Game Window
 GAME_WIDTH = 1050
 
@@ -28,6 +43,12 @@ HOUSE_COLOR = "#006b1d"
 # Color of a hotel (Dark Red)
 HOTEL_COLOR = "#ba2800"
 
+# The most trade offers whose holdings mask a Board remembers
+MASK_CACHE_SIZE = 1024
+
+# Milliseconds between updates of the Win Odds window
+WIN_ODDS_POLL = 250
+
 # Color of a General Button (Light Blue)
 
 # Color of the Quit Button (Red)
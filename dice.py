@@ -0,0 +1,137 @@
+"""
+    Contains the seedable random number source of a game
+
+    Dice are drawn in bulk: a block of random bytes is turned into die faces with a single
+    translate call, and rolls are read from the block until it runs out. Each block is drawn from
+    a generator seeded with the seed of the dice and the number of the block, so the whole state
+    of the dice is a few integers that getState and setState can save and restore.
+"""
+import os
+import random
+
+# The number of random bytes drawn each time the dice run out, about 98% become dice
+DICE_BUFFER = 4096
+
+# Maps a random byte to a die face, bytes from 252 up are dropped so every face is equally likely
+_FACES = bytes(i % 6 + 1 for i in range(256))
+_UNEVEN = bytes(range(252, 256))
+
+
+class Dice:
+    def __init__(self, seed=None, bufferSize=DICE_BUFFER):
+        """
+            Creates a Dice object seeded with seed
+
+            Parameter: seed, the seed of the dice, seeded from the operating system if None
+            Requires: Must be of type int, from 0 to 2**64 - 1, or None
+
+            Parameter: bufferSize, the number of random bytes drawn at a time
+            Requires: Must be of type int
+        """
+        self.seed = int.from_bytes(os.urandom(8), "little") if seed is None else seed
+        self.bufferSize = bufferSize
+        self.block = 0
+        self.carried = b""
+        self.faces = b""
+        self.index = 0
+        # The index to carry on from once the block put back by setState is drawn again
+        self.resumeIndex = None
+
+    def reset(self, seed=None):
+        """
+            Puts the dice back to how new dice seeded with seed would be
+
+            Parameter: seed, the seed of the dice, seeded from the operating system if None
+            Requires: Must be of type int, from 0 to 2**64 - 1, or None
+        """
+        self.seed = int.from_bytes(os.urandom(8), "little") if seed is None else seed
+        self.setState((self.seed, 0, b"", 0))
+
+    def roll(self):
+        """
+            Returns the face of a single die, from 1 to 6
+        """
+        if self.index >= len(self.faces):
+            self._refill()
+        face = self.faces[self.index]
+        self.index += 1
+        return face
+
+    def rollPair(self):
+        """
+            Returns a tuple with the faces of two dice
+        """
+        if self.index + 1 >= len(self.faces):
+            self._refill()
+        index = self.index
+        self.index = index + 2
+        return self.faces[index], self.faces[index + 1]
+
+    def randint(self, low, high):
+        """
+            Returns a random integer from low to high, inclusive, made from rolls of a single die
+
+            Parameter: low, the smallest possible result
+            Requires: Must be of type int
+
+            Parameter: high, the largest possible result
+            Requires: Must be of type int; must be at least low
+        """
+        count = high - low + 1
+        # Read enough rolls as base 6 digits to cover count, and try again on the uneven top end
+        digits = 1
+        while 6 ** digits < count:
+            digits += 1
+        limit = 6 ** digits - 6 ** digits % count
+        while True:
+            value = 0
+            for i in range(digits):
+                value = value * 6 + self.roll() - 1
+            if value < limit:
+                return low + value % count
+
+    def getState(self):
+        """
+            Returns a (seed, block, carried, index) tuple with everything setState needs to make
+            the dice roll the same faces from here on
+        """
+        index = self.index if self.resumeIndex is None else self.resumeIndex
+        return self.seed, self.block, self.carried, index
+
+    def setState(self, state):
+        """
+            Puts the dice back in the state state, as returned by getState
+
+            Parameter: state, the state to put back
+            Requires: Must be of type (int, int, bytes, int)
+        """
+        self.seed, self.block, self.carried, index = state
+        # The block is only drawn again when the dice are next rolled
+        self.faces = b""
+        self.index = 0
+        self.resumeIndex = index if self.block > 0 else None
+
+    def _refill(self):
+        """
+            Replaces the used faces with a new block, keeping the faces that were not used yet
+        """
+        if self.resumeIndex is not None:
+            self.faces = self.carried + self._drawBlock(self.block - 1)
+            self.index = self.resumeIndex
+            self.resumeIndex = None
+            if self.index + 1 < len(self.faces):
+                return
+        self.carried = self.faces[self.index:]
+        self.faces = self.carried + self._drawBlock(self.block)
+        self.block += 1
+        self.index = 0
+
+    def _drawBlock(self, block):
+        """
+            Returns the faces drawn for the block with number, block
+
+            Parameter: block, the number of the block
+            Requires: Must be of type int
+        """
+        generator = random.Random(self.seed << 32 | block)
+        return generator.randbytes(self.bufferSize).translate(_FACES, _UNEVEN)
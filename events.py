@@ -0,0 +1,236 @@
+"""
+    Contains the structured event stream of a game
+
+    Every action in a game is recorded as an event: a kind, the slot of the player it happened
+    to and two integer fields whose meaning depends on the kind. Events are written into the
+    preallocated columns of an EventLog, which keeps the most recent ones, and are passed to every
+    subscriber, such as a JournalWriter that appends them to a binary file. Nothing is turned into
+    text until formatEvent is called.
+"""
+import struct
+from array import array
+from collections import namedtuple
+from cards import CHANCE_CARDS, COMMUNITY_CHEST_CARDS
+
+# The number of events an EventLog keeps by default
+EVENT_BUFFER = 4096
+
+# The kinds of event, and what their fields a and b hold
+ROLLED = 0          # a: first die, b: second die
+MOVED = 1           # a: id of the tile landed on
+BOUGHT = 2          # a: tile id, b: price
+BUILT = 3           # a: tile id, b: house cost
+SOLD = 4            # a: tile id, b: proceeds
+MORTGAGED = 5       # a: tile id, b: proceeds
+UNMORTGAGED = 6     # a: tile id, b: cost
+RENT_PAID = 7       # a: slot of the owner, b: amount
+TAX_PAID = 8        # a: amount
+CARD_DRAWN = 9      # a: deck, CHANCE or COMMUNITY_CHEST, b: index of the card in its card table
+JAIL_ENTERED = 10
+JAIL_LEFT = 11      # a: how, one of the LEFT_BY constants
+TRADED = 12         # a: slot of the other player
+AUCTIONED = 13      # a: tile id, b: winning bid
+DEBT_OWED = 14      # a: slot of the creditor, -1 for the bank, b: amount
+BANKRUPT = 15       # a: slot of the creditor, -1 for the bank
+QUIT = 16
+TURN_BEGAN = 17
+
+# The name of each kind of event
+EVENT_NAMES = ("Rolled", "Moved", "Bought", "Built", "Sold", "Mortgaged", "Unmortgaged",
+               "RentPaid", "TaxPaid", "CardDrawn", "JailEntered", "JailLeft", "Traded",
+               "Auctioned", "DebtOwed", "Bankrupt", "Quit", "TurnBegan")
+
+# The decks of a CARD_DRAWN event
+CHANCE = 0
+COMMUNITY_CHEST = 1
+
+# The ways of leaving jail in a JAIL_LEFT event
+LEFT_BY_PAYING = 0
+LEFT_BY_DOUBLES = 1
+LEFT_BY_CARD = 2
+LEFT_BY_FORCE = 3
+
+# An event read back from a log or journal
+Event = namedtuple("Event", ("kind", "player", "a", "b"))
+
+# An event in a binary journal: kind, player slot, a, b
+EVENT_RECORD = struct.Struct("<bbii")
+
+
+class EventLog:
+    def __init__(self, capacity=EVENT_BUFFER):
+        """
+            Creates an empty EventLog keeping the last capacity events
+
+            Parameter: capacity, the number of events kept, older events are overwritten
+            Requires: Must be of type int, greater than 0
+        """
+        self.capacity = capacity
+        self.kinds = array("b", bytes(capacity))
+        self.players = array("b", bytes(capacity))
+        self.a = array("i", [0]) * capacity
+        self.b = array("i", [0]) * capacity
+        # The number of events recorded since the log was created
+        self.count = 0
+        self.subscribers = []
+        # Events are dropped while False, so lookahead can play moves without recording them
+        self.enabled = True
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def __iter__(self):
+        return self.since(self.count - len(self))
+
+    def record(self, kind, player, a=0, b=0):
+        """
+            Records an event and passes it to every subscriber
+
+            Parameter: kind, the kind of the event
+            Requires: Must be one of the event kind constants
+
+            Parameter: player, the slot of the player the event happened to
+            Requires: Must be of type int
+
+            Parameter: a, the first field of the event
+            Requires: Must be of type int
+
+            Parameter: b, the second field of the event
+            Requires: Must be of type int
+        """
+        if not self.enabled:
+            return
+        index = self.count % self.capacity
+        self.kinds[index] = kind
+        self.players[index] = player
+        self.a[index] = a
+        self.b[index] = b
+        self.count += 1
+        if self.subscribers:
+            event = Event(kind, player, a, b)
+            for subscriber in self.subscribers:
+                subscriber(event)
+
+    def clear(self):
+        """
+            Forgets every event and enables the log. Subscribers stay subscribed, and are called
+            with the events of whatever game the log is used for next
+        """
+        self.count = 0
+        self.enabled = True
+
+    def since(self, position):
+        """
+            Yields every event kept from the event with number position on, oldest first
+
+            Parameter: position, the number of the first event, counting from 0 at the first
+            event recorded
+            Requires: Must be of type int; events before count - len(self) are no longer kept
+        """
+        if position < self.count - len(self):
+            raise IndexError(f"event {position} is no longer kept")
+        for i in range(position, self.count):
+            index = i % self.capacity
+            yield Event(self.kinds[index], self.players[index], self.a[index], self.b[index])
+
+    def subscribe(self, subscriber):
+        """
+            Calls subscriber with every event recorded from now on
+
+            Parameter: subscriber, the function called with each event
+            Requires: Must be a function taking an Event
+        """
+        self.subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        """
+            Stops calling subscriber with new events
+
+            Parameter: subscriber, a function passed to subscribe
+            Requires: Must be subscribed
+        """
+        self.subscribers.remove(subscriber)
+
+
+class JournalWriter:
+    def __init__(self, file):
+        """
+            Creates a subscriber that appends every event it is called with to file as a fixed
+            size binary record
+
+            Parameter: file, the file to write to
+            Requires: Must be a binary file open for writing
+        """
+        self.file = file
+
+    def __call__(self, event):
+        self.file.write(EVENT_RECORD.pack(*event))
+
+
+def readJournal(file):
+    """
+        Yields every event in a journal written by a JournalWriter
+
+        Parameter: file, the journal
+        Requires: Must be a binary file open for reading
+    """
+    data = file.read()
+    for fields in EVENT_RECORD.iter_unpack(data[:len(data) - len(data) % EVENT_RECORD.size]):
+        yield Event(*fields)
+
+
+def formatEvent(event, game):
+    """
+        Returns a human readable description of event
+
+        Parameter: event, the event to describe
+        Requires: Must be of type Event
+
+        Parameter: game, the game the event happened in
+        Requires: Must be of type Game
+    """
+    def playerName(slot):
+        return "the Bank" if slot < 0 else game.state.players[slot].name
+
+    def tileName(tileId):
+        return game.state.tileNames[tileId]
+
+    kind, name, a, b = event.kind, playerName(event.player), event.a, event.b
+    if kind == ROLLED:
+        return f"{name} rolled {a} and {b}"
+    if kind == MOVED:
+        return f"{name} landed on {tileName(a)}"
+    if kind == BOUGHT:
+        return f"{name} bought {tileName(a)} for ${b}"
+    if kind == BUILT:
+        return f"{name} built a house on {tileName(a)} for ${b}"
+    if kind == SOLD:
+        return f"{name} sold a house on {tileName(a)} for ${b}"
+    if kind == MORTGAGED:
+        return f"{name} mortgaged {tileName(a)} for ${b}"
+    if kind == UNMORTGAGED:
+        return f"{name} paid ${b} to unmortgage {tileName(a)}"
+    if kind == RENT_PAID:
+        return f"{name} paid ${b} to {playerName(a)}"
+    if kind == TAX_PAID:
+        return f"{name} paid ${a} to the Bank"
+    if kind == CARD_DRAWN:
+        cards = CHANCE_CARDS if a == CHANCE else COMMUNITY_CHEST_CARDS
+        return f"{name} drew: {cards[b][0]}"
+    if kind == JAIL_ENTERED:
+        return f"{name} went to jail"
+    if kind == JAIL_LEFT:
+        how = ("paid $50", "rolled doubles", "used a Get Out of Jail Free Card",
+               "was forced to pay $50")[a]
+        return f"{name} {how} to get out of jail"
+    if kind == TRADED:
+        return f"{name} traded with {playerName(a)}"
+    if kind == AUCTIONED:
+        return f"{name} won {tileName(a)} at an auction by bidding {b}"
+    if kind == DEBT_OWED:
+        return f"{name} owes ${b} to {playerName(a)}"
+    if kind == BANKRUPT:
+        return f"{name} became bankrupt and forfeited all assets to {playerName(a)}"
+    if kind == QUIT:
+        return f"{name} quit the game"
+    return f"{name} began their turn"
@@ -1,21 +1,112 @@
-import json
+from boardspec import BOARD_PATH, loadBoardSpec
+from cards import *
+from dice import Dice
+from events import *
 from objects import *
-import os
-import random
+
+
+# The most games a GamePool keeps for each number of players
+GAME_POOL_SIZE = 8
+
+# The function playing each card opcode, called with the game, the player who drew the card and
+# the card's argument, returning the logs from playing it
+_CARD_ACTIONS = (
+    lambda game, player, amount: player.giveCash(amount),
+    lambda game, player, tileName: game._advanceTo(tileName),
+    lambda game, player, arg: game._advanceToNearestUtility(),
+    lambda game, player, arg: game._advanceToNearestRailRoad(),
+    lambda game, player, spaces: game._move(-spaces),
+    lambda game, player, arg: game._goToJail(),
+    lambda game, player, arg: player.giveJailCard(),
+    lambda game, player, costs: player.makeRepairs(costs[0], costs[1], game.board),
+    lambda game, player, amount: player.giveToEach(amount, game.players),
+    lambda game, player, amount: player.takeFromEach(amount, game.players),
+)
+
+
+class GameSnapshot:
+    __slots__ = ("state", "turn")
+
+    def __init__(self, state, turn):
+        """
+            Creates the saved state of a game, to be restored with Game.restore
+
+            Parameter: state, a copy of the columns of the game's BoardState
+            Requires: Must be of type BoardState
+
+            Parameter: turn, the game's turn state, as returned by Game._getTurnState
+            Requires: Must be of type tuple
+        """
+        self.state = state
+        self.turn = turn
+
+
+class GamePool:
+    def __init__(self, maxSize=GAME_POOL_SIZE):
+        """
+            Creates an empty pool of games, handing out reset games instead of new ones
+
+            Parameter: maxSize, the most games the pool keeps for each number of players
+            Requires: Must be of type int
+        """
+        self.maxSize = maxSize
+        # The released games, by number of players
+        self.games = {}
+
+    def acquire(self, players, seed=None):
+        """
+            Returns a game in the state of Game(players, Dice(seed)), reset from a released game
+            with as many players if there is one
+
+            Parameter: players, a list of tuples with the player information (id,name,color)
+            Requires: Must be of type (int, string, string) list
+
+            Parameter: seed, the seed of the dice, seeded from the operating system if None
+            Requires: Must be of type int, from 0 to 2**64 - 1, or None
+        """
+        games = self.games.get(len(players))
+        if not games:
+            return Game(players, Dice(seed))
+        game = games.pop()
+        game.reset(players, seed)
+        return game
+
+    def release(self, game):
+        """
+            Gives game back to the pool to be handed out again. The game must no longer be used
+
+            Parameter: game, the game to give back
+            Requires: Must be of type Game
+        """
+        games = self.games.setdefault(len(game.state.players), [])
+        if len(games) < self.maxSize:
+            games.append(game)
 
 
 class Game:
     # INITIALIZATION -----------------------------------------------------------------------------------
-    def __init__(self, players):
+    def __init__(self, players, dice=None, boardSpec=None):
         """
             Creates a Game Object with the players given
 
             Parameter: players, a list of tuples with the player information (id,name,color)
             Requires: Must be of type (int, string, string) list
+
+            Parameter: dice, the source of every random number in the game, unseeded dice if None
+            Requires: Must be of type Dice or None
+
+            Parameter: boardSpec, the board the game is played on, the board loaded by
+            loadBoardSpec if None
+            Requires: Must be of type BoardSpec or None
         """
+        self.dice = Dice() if dice is None else dice
+        self.boardSpec = loadBoardSpec() if boardSpec is None else boardSpec
+        self.state = BoardState(self.boardSpec.numTiles, len(players))
         self.board = self.createBoard()
-        self.chanceCards = self.createChanceCards()
-        self.communityChestCards = self.createCommunityChestCards()
+        # The order of the cards in each deck, as indexes into CHANCE_CARDS and
+        # COMMUNITY_CHEST_CARDS
+        self.chanceOrder = bytes(range(len(CHANCE_CARDS)))
+        self.communityChestOrder = bytes(range(len(COMMUNITY_CHEST_CARDS)))
         self.players = self.createPlayers(players)
         self.currentPlayer = self.players[0]
         self.currentChanceIndex = 0
@@ -23,43 +114,52 @@ class Game:
         self.numRolled = 0
         self.hasRolled = False
         self.numDoublesRolled = 0
+        self.pendingDebt = None
+        self.events = EventLog()
+        # The columns of the game before anything happened, put back by reset
+        self.blankState = self.state.copy()
 
-    def createBoard(self):
-        """
-            Returns the Board object for the game
+    def reset(self, players, seed=None):
         """
-        possMonopolies = {}
-        tiles = []
-        with open(os.getcwd() + "\monopoly\\board.json") as boardJson:
-            board = json.load(boardJson)
-            for i, tile in enumerate(board["tiles"]):
-                newTile = Tile(i, tile["name"], tile["price"], tile["rents"],
-                               tile["house cost"], tile["color"])
-                tiles.append(newTile)
-                if possMonopolies.get(tile["color"]) is None:
-                    possMonopolies[tile["color"]] = set()
-                possMonopolies[tile["color"]].add(tile["name"])
-        del possMonopolies["white"]
-        self.possMonopolies = possMonopolies
-        return Board(tiles)
+            Puts the game back to how Game(players, Dice(seed)) would be, on the same board.
+            The board, tiles, players, columns and event log of this game are reused when
+            players has as many players as the game did, so no new objects are made. The event
+            log is emptied but keeps its subscribers either way
 
-    def createChanceCards(self):
-        """
-            Returns a list of Card objects representing the chance cards in the game
-        """
-        result = []
-        for text, action in zip(self._chanceCardTexts(), self._chanceCardActions()):
-            result.append(Card(text, action))
-        return result
+            Parameter: players, a list of tuples with the player information (id,name,color)
+            Requires: Must be of type (int, string, string) list
+
+            Parameter: seed, the seed of the dice, seeded from the operating system if None
+            Requires: Must be of type int, from 0 to 2**64 - 1, or None
+        """
+        if len(players) != len(self.state.players):
+            events = self.events
+            self.__init__(players, Dice(seed), self.boardSpec)
+            self.events = events
+            events.clear()
+            return
+        self.dice.reset(seed)
+        self.state.journal = None
+        self.state.copyFrom(self.blankState)
+        for player, (playerId, name, color) in zip(self.state.players, players):
+            player.id = playerId
+            player.name = name
+            player.color = color
+            player.namedHoldings = (0, frozenset())
+        self.board.recount()
+        self._setTurnState((self.state.players, self.state.players[0],
+                            bytes(range(len(CHANCE_CARDS))), 0,
+                            bytes(range(len(COMMUNITY_CHEST_CARDS))), 0, 0, False, 0, None))
+        self.events.clear()
 
-    def createCommunityChestCards(self):
+    def createBoard(self):
         """
-            Returns a list of Card objects representing the community chest cards in the game
+            Returns the Board object for the game
         """
-        result = []
-        for text, action in zip(self._communityChestCardTexts(), self._communityChestCardActions()):
-            result.append(Card(text, action))
-        return result
+        spec = self.boardSpec
+        tiles = [Tile(i, spec.names[i], spec.prices[i], spec.rents[i], spec.houseCosts[i],
+                      spec.colors[i]) for i in range(spec.numTiles)]
+        return Board(tiles, self.state)
 
     def createPlayers(self, players):
         """
@@ -68,7 +168,8 @@ class Game:
             Parameter: players, list of the id, name, and color for each player
             Requires: Must be of type int, string, string list
         """
-        return list(map(lambda player: Player(player[0], player[1], player[2]), players))
+        return [Player(player[0], player[1], player[2], self.state, slot)
+                for slot, player in enumerate(players)]
 # GETTERS AND SETTERS ------------------------------------------------------------------------------
 
     def getBoard(self):
@@ -77,6 +178,14 @@ class Game:
         """
         return self.board.toDict()
 
+    def getBoardView(self):
+        """
+            Returns a tuple of read only mappings over every tile on the board. The mappings have
+            the same keys as the dictionaries in getBoard, but read the live tiles instead of
+            copying them
+        """
+        return self.board.getView()
+
     def getTile(self, tileId):
         """
             Returns a dictionary representation of the tile with id, tileId
@@ -101,12 +210,47 @@ class Game:
         """
         return self.currentPlayer.toDict()
 
+    def getCurrentPlayerView(self):
+        """
+            Returns a read only mapping over the player whose turn it is, with the same keys as
+            getCurrentPlayer
+        """
+        return self.currentPlayer.getView()
+
     def getPlayers(self):
         """
             Returns a list of dictionaries representing every player in the game
         """
         return list(map(lambda player: player.toDict(), self.players))
 
+    def getPlayersView(self):
+        """
+            Returns a tuple of read only mappings over every player in the game. The mappings have
+            the same keys as the dictionaries in getPlayers, but read the live players instead of
+            copying them
+        """
+        return tuple(player.getView() for player in self.players)
+
+    def getPendingDebt(self):
+        """
+            Returns a (creditor, amount) tuple of the debt the current player could not pay, None
+            if there is no debt. The creditor is None if the debt is owed to the bank
+        """
+        return self.pendingDebt
+
+    def isOver(self):
+        """
+            Returns True if only one player is left in the game, False otherwise
+        """
+        return len(self.players) <= 1
+
+    def getVersion(self):
+        """
+            Returns a number that changes every time the state of the board or players changes,
+            including whose turn it is
+        """
+        return self.state.version
+
     def getBuildable(self):
         """
             Returns a list of the names of properties that the current player can build a house
@@ -118,23 +262,7 @@ class Game:
                 Building a house would not break the build evenly rule
                 The property is not mortgaged
         """
-        playerMonopolies = {}
-        playerName = self.currentPlayer.toDict()["name"]
-        for colorGroup, owner in self.board.getMonopolies().items():
-            if owner == playerName:
-                playerMonopolies[colorGroup] = 5
-
-        ownedTiles = self._getOwnedTiles()
-        for tile in ownedTiles:
-            if tile["color"] in playerMonopolies:
-                if playerMonopolies[tile["color"]] > tile["numHouses"]:
-                    playerMonopolies[tile["color"]] = tile["numHouses"]
-
-        result = []
-        for tile in ownedTiles:
-            if tile["numHouses"] == playerMonopolies[tile["color"]]:
-                result.append(tile["name"])
-        return result
+        return list(self.board.getCandidates(self.currentPlayer.slot)[0])
 
     def getSellable(self):
         """
@@ -143,44 +271,89 @@ class Game:
             The player can sell a house on the property if there is at least one house, and selling
             a house would not break the build evenly rule
         """
-        playerMonopolies = {}
-        playerName = self.currentPlayer.toDict()["name"]
-        for colorGroup, owner in self.board.getMonopolies().items():
-            if owner == playerName:
-                playerMonopolies[colorGroup] = 5
-
-        ownedTiles = self._getOwnedTiles()
-        for tile in ownedTiles:
-            if tile["color"] in playerMonopolies:
-                if playerMonopolies[tile["color"]] < tile["numHouses"]:
-                    playerMonopolies[tile["color"]] = tile["numHouses"]
-
-        result = []
-        for tile in ownedTiles:
-            if tile["numHouses"] == playerMonopolies[tile["color"]]:
-                result.append(tile["name"])
-        return result
+        return list(self.board.getCandidates(self.currentPlayer.slot)[1])
 
     def getMortgageable(self):
         """
             Returns a list of the names of properties that the current player can mortgage
         """
-        result = []
-        for tile in self._getOwnedTiles():
-            if not tile["mortgaged"]:
-                result.append(tile["name"])
-        return result
+        return list(self.board.getCandidates(self.currentPlayer.slot)[2])
 
     def getUnmortgageable(self):
         """
             Returns a list of the names of properties that the current player can unmortgage
         """
-        result = []
-        for tile in self._getOwnedTiles():
-            if tile["mortgaged"]:
-                result.append(tile["name"])
-        return result
+        return list(self.board.getCandidates(self.currentPlayer.slot)[3])
+# SNAPSHOTS AND UNDO -------------------------------------------------------------------------------
+
+    def snapshot(self):
+        """
+            Returns a GameSnapshot of the board, the players and the turn, which restore puts
+            back. The dice are not part of the snapshot, so a restored game rolls new numbers
+        """
+        return GameSnapshot(self.state.copy(), self._getTurnState())
+
+    def restore(self, snapshot):
+        """
+            Puts the board, the players and the turn back to how they were when snapshot was
+            taken. Stops the undo journal, so earlier marks can no longer be undone
+
+            Parameter: snapshot, the snapshot to restore
+            Requires: Must be of type GameSnapshot, taken from this game
+        """
+        self.state.journal = None
+        self.state.copyFrom(snapshot.state)
+        self._setTurnState(snapshot.turn)
+        self.board.recount()
+
+    def mark(self):
+        """
+            Returns a mark that undo can later roll the game back to, starting the undo journal if
+            it is not running. While the journal runs, the previous value of every change to the
+            board and players is recorded, so undoing costs as much as the changes being undone
+        """
+        if self.state.journal is None:
+            self.state.journal = []
+        return (len(self.state.journal), self._getTurnState())
+
+    def undo(self, mark):
+        """
+            Rolls the board, the players and the turn back to how they were when mark was made.
+            Like snapshots, the dice are not rolled back
+
+            Parameter: mark, the mark to roll back to
+            Requires: Must be returned by mark, with the journal still running and no later mark
+            undone past it
+        """
+        length, turn = mark
+        self.state.rollback(length)
+        self._setTurnState(turn)
+        self.board.recount()
+
+    def stopJournal(self):
+        """
+            Stops recording changes for undo, forgetting every mark
+        """
+        self.state.journal = None
 # GAME FUNCTIONALITY -------------------------------------------------------------------------------
+    # Cards
+
+    def shuffleDecks(self):
+        """
+            Shuffles every card of the Chance and Community Chest decks with the game's dice,
+            starting each deck again from the top
+        """
+        def shuffled(order):
+            order = bytearray(order)
+            for i in range(len(order) - 1, 0, -1):
+                j = self.dice.randint(0, i)
+                order[i], order[j] = order[j], order[i]
+            return bytes(order)
+        self.chanceOrder = shuffled(self.chanceOrder)
+        self.communityChestOrder = shuffled(self.communityChestOrder)
+        self.currentChanceIndex = 0
+        self.currentCommunityChestIndex = 0
+
     # Rolling
 
     def roll(self):
@@ -197,8 +370,8 @@ class Game:
             logs.append(("Roll", "You are in Jail"))
             return logs
         else:
-            dice1 = random.randint(1, 6)
-            dice2 = random.randint(1, 6)
+            dice1, dice2 = self.dice.rollPair()
+            self.events.record(ROLLED, self.currentPlayer.slot, dice1, dice2)
             if dice1 != dice2:
                 self.hasRolled = True
             else:
@@ -228,7 +401,8 @@ class Game:
             self.board.getTileObject(currentPlayer["location"]).setOwner(self.currentPlayer)
             self.currentPlayer.takeCash(currentTile["price"])
             self.currentPlayer.giveProperty(currentPlayer["location"], self.board)
-            self._updateMonopolies()
+            self.events.record(BOUGHT, self.currentPlayer.slot, currentPlayer["location"],
+                               currentTile["price"])
             return [("Buy Success", f"{currentPlayer['name']} bought {currentTile['name']}")]
         else:
             return [("Buy Fail", f"{currentPlayer['name']} cannot buy {currentTile['name']}")]
@@ -252,13 +426,14 @@ class Game:
 
         if tileDict["mortgaged"]:
             return [("Build Fail", f"{tileName} is mortgaged")]
-        elif tileName not in self.getBuildable():
+        elif tileName not in self.board.getCandidates(self.currentPlayer.slot)[0]:
             return [("Build Fail", "You must build evenly")]
         elif tileDict["houseCost"] > currentPlayer["cash"]:
             return [("Build Fail", f"{currentPlayer['name']} doesn't have enough money to build a house on {tileName}")]
         else:
             self.currentPlayer.takeCash(tileDict["houseCost"])
             tile.build()
+            self.events.record(BUILT, self.currentPlayer.slot, tile.id, tileDict["houseCost"])
             return [("Build Success", f"{currentPlayer['name']} built a house on {tileName}")]
 
     def sell(self, tileName):
@@ -276,11 +451,12 @@ class Game:
         tile = self.board.getTile(self.board.getTileId(tileName))
         if tile["numHouses"] < 1:
             return [("Build Fail", f"{tileName} does not have any houses.")]
-        elif tileName not in self.getSellable():
+        elif tileName not in self.board.getCandidates(self.currentPlayer.slot)[1]:
             return [("Build Fail", "You must sell evenly")]
         else:
             self.currentPlayer.giveCash(int(tile["houseCost"]/2))
-            self.board.getTileObject(self.board.getTileId(tileName)).sell()
+            self.board.getTileObject(tile["id"]).sell()
+            self.events.record(SOLD, self.currentPlayer.slot, tile["id"], int(tile["houseCost"]/2))
             return [("Build Success", f"{self.currentPlayer.toDict()['name']} sold a house on {tileName}")]
 
     # Trading
@@ -332,7 +508,7 @@ class Game:
             self.currentPlayer.giveJailCard()
             player2.takeJailCard()
 
-        self._updateMonopolies()
+        self.events.record(TRADED, self.currentPlayer.slot, player2.slot)
         return [("Trade Success", self._makeTradeString(p1Trade, p2Trade))]
 
     # Mortgaging
@@ -349,6 +525,7 @@ class Game:
         amount = int(self.board.getTile(self.board.getTileId(tileName))['price']/2)
         self.currentPlayer.giveCash(amount)
         self.board.getTileObject(self.board.getTileId(tileName)).setMortgage()
+        self.events.record(MORTGAGED, self.currentPlayer.slot, self.board.getTileId(tileName), amount)
 
         return [("Mortgage Success", f"{self.currentPlayer.toDict()['name']} mortgage {tileName} for ${amount}")]
 
@@ -367,7 +544,8 @@ class Game:
         cost = int(.6*tile['price'])
         if currentPlayer["cash"] > cost:
             self.currentPlayer.takeCash(cost)
-            self.board.getTileObject(self.board.getTileId(tileName)).setMortgage()
+            self.board.getTileObject(tile["id"]).setMortgage()
+            self.events.record(UNMORTGAGED, self.currentPlayer.slot, tile["id"], cost)
             return [("Mortgage Success",
                      f"{currentPlayer['name']} paid ${cost} to unmortgage {tileName}")]
         else:
@@ -391,14 +569,15 @@ class Game:
             Parameter: winningBidder, the name of the player one the auction
             Requires: Must be of type string
         """
-
         for player in self.players:
-            if player.toDict()["name"] == winningBidder:
+            if player.name == winningBidder:
                 playerObj = player
 
+        tileId = self.board.getTileId(tileName)
         playerObj.takeCash(winningBid)
-        playerObj.giveProperty(self.board.getTileId(tileName), self.board)
-        self.board.getTileObject(self.board.getTileId(tileName)).setOwner(playerObj)
+        playerObj.giveProperty(tileId, self.board)
+        self.board.getTileObject(tileId).setOwner(playerObj)
+        self.events.record(AUCTIONED, playerObj.slot, tileId, winningBid)
 
         return [("Auction", f"{winningBidder} won {tileName} at an auction by bidding {winningBid}")]
 
@@ -422,6 +601,9 @@ class Game:
         nextPlayerIndex = (self.players.index(self.currentPlayer) + 1) % len(self.players)
         self.currentPlayer = self.players[nextPlayerIndex]
         self.players.remove(playerToDelete)
+        self.state.version += 1
+        self.events.record(QUIT, playerToDelete.slot)
+        self.events.record(TURN_BEGAN, self.currentPlayer.slot)
         return [("Quit", f"{playerToDelete.toDict()['name']} quit the game")]
 
     # Jail
@@ -436,6 +618,7 @@ class Game:
         if currentPlayer["cash"] >= 50:
             self.currentPlayer.takeCash(50)
             self.currentPlayer.leaveJail()
+            self.events.record(JAIL_LEFT, self.currentPlayer.slot, LEFT_BY_PAYING)
             return [("Jail Success", f"{currentPlayer['name']} paid $50 to get out of jail")]
         else:
             return [("Jail Fail", f"{currentPlayer['name']} does not have $50")]
@@ -448,10 +631,13 @@ class Game:
             If the result is not a double returns A Jail Success Log
         """
         name = self.currentPlayer.toDict()["name"]
-        dice1 = random.randint(1, 6)
-        dice2 = random.randint(1, 6)
+        dice1, dice2 = self.dice.rollPair()
+        self.events.record(ROLLED, self.currentPlayer.slot, dice1, dice2)
+        # Rolling for doubles uses the turn's roll, even if the player gets out
+        self.hasRolled = True
         if dice1 == dice2:
             self.currentPlayer.leaveJail()
+            self.events.record(JAIL_LEFT, self.currentPlayer.slot, LEFT_BY_DOUBLES)
             self.currentPlayer.move(dice1+dice2)
             self.numRolled = dice1 + dice2
             result = self._handleTile()
@@ -460,6 +646,7 @@ class Game:
             else:
                 return ([("Jail Success", f"{name} rolled doubles to get out of jail")] + result)
         else:
+            self.currentPlayer.endTurnInJail()
             return [("Jail Fail", f"{name} did not roll doubles and is still in jails")]
 
     def cardJail(self):
@@ -472,6 +659,7 @@ class Game:
         currentPlayer = self.currentPlayer.toDict()
         if currentPlayer["jailCards"] >= 1:
             self.currentPlayer.useJailCard()
+            self.events.record(JAIL_LEFT, self.currentPlayer.slot, LEFT_BY_CARD)
             return [("Jail Success", f"{currentPlayer['name']} used a Get Out of Jail Free Card")]
         else:
             return [("Jail Fail", f"{currentPlayer['name']} does not have a Get Out of Jail Free Card")]
@@ -487,107 +675,108 @@ class Game:
             return [("Roll", "You haven't rolled yet.")]
         nextPlayerIndex = (self.players.index(self.currentPlayer) + 1) % len(self.players)
         self.currentPlayer = self.players[nextPlayerIndex]
+        self.state.version += 1
         self.hasRolled = False
         self.numRolled = 0
         self.numDoublesRolled = 0
+        self.events.record(TURN_BEGAN, self.currentPlayer.slot)
         return self._checkJail()
+
+    # Bankruptcy
+    def payDebt(self):
+        """
+            Attempts to pay the debt the current player could not pay earlier in their turn
+
+            Returns: A Rent, Tax, or Jail Success log if the player now has enough cash, a
+            Bankruptcy Player or Bankruptcy Bank log otherwise
+        """
+        creditor, amount = self.pendingDebt
+        name = self.currentPlayer.toDict()["name"]
+        if self.currentPlayer.toDict()["cash"] < amount:
+            if creditor is None:
+                return [("Bankruptcy Bank", f"You owe ${amount} to the Bank")]
+            return [("Bankruptcy Player", f"You owe {amount} to {creditor.toDict()['name']}")]
+        self.pendingDebt = None
+        self.currentPlayer.takeCash(amount)
+        if creditor is not None:
+            creditor.giveCash(amount)
+            self.events.record(RENT_PAID, self.currentPlayer.slot, creditor.slot, amount)
+            return [("Rent", f"{name} paid ${amount} to {creditor.toDict()['name']}")]
+        if self.currentPlayer.toDict()["inJail"]:
+            self.currentPlayer.leaveJail()
+            self.events.record(JAIL_LEFT, self.currentPlayer.slot, LEFT_BY_FORCE)
+            return [("Jail Success", f"{name} was forced to pay $50 to get out of jail")]
+        self.events.record(TAX_PAID, self.currentPlayer.slot, amount)
+        return [("Tax", f"{name} paid ${amount} to the Bank")]
+
+    def bankrupt(self):
+        """
+            Removes the current player from the game because they cannot pay their debt. Every
+            asset they have goes to the player they owe, houses being sold back to the bank at
+            half price. If they owe the bank, their properties go back to the bank.
+
+            Returns: A Bankruptcy log, followed by the logs from beginning the next player's turn
+        """
+        creditor = self.pendingDebt[0] if self.pendingDebt is not None else None
+        bankruptPlayer = self.currentPlayer
+        proceeds = bankruptPlayer.toDict()["cash"]
+        for tileName in list(bankruptPlayer.toDict()["properties"]):
+            tileId = self.board.getTileId(tileName)
+            tileObj = self.board.getTileObject(tileId)
+            for i in range(tileObj.numHouses):
+                proceeds += int(tileObj.houseCost/2)
+                tileObj.sell()
+            bankruptPlayer.takeProperty(tileId, self.board)
+            if creditor is None:
+                tileObj.setOwner(None)
+                if tileObj.mortgaged:
+                    tileObj.setMortgage()
+            else:
+                tileObj.setOwner(creditor)
+                creditor.giveProperty(tileId, self.board)
+        if creditor is not None:
+            creditor.giveCash(max(proceeds, 0))
+            for i in range(bankruptPlayer.toDict()["jailCards"]):
+                creditor.giveJailCard()
+        creditorName = "the Bank" if creditor is None else creditor.toDict()["name"]
+
+        nextPlayerIndex = (self.players.index(bankruptPlayer) + 1) % len(self.players)
+        self.currentPlayer = self.players[nextPlayerIndex]
+        self.players.remove(bankruptPlayer)
+        self.state.version += 1
+        self.hasRolled = False
+        self.numRolled = 0
+        self.numDoublesRolled = 0
+        self.pendingDebt = None
+        self.events.record(BANKRUPT, bankruptPlayer.slot, -1 if creditor is None else creditor.slot)
+        logs = [("Bankruptcy", f"{bankruptPlayer.toDict()['name']} became bankrupt and forfeited "
+                               f"all assets to {creditorName}")]
+        if self.isOver():
+            return logs
+        self.events.record(TURN_BEGAN, self.currentPlayer.slot)
+        return logs + (self._checkJail() or [])
 # HELPERS
 
-    # Init Helpers
-    def _chanceCardTexts(self):
-        """
-            Returns a list of the texts for every chance card in the game.
-        """
-        zero = "You have won a crossword competition. Collect $100."
-        one = "Advance To Go. Collect $200"
-        two = "Advance to Illinois Ave. If you pass Go, collect $200."
-        three = "Advance to St. Charles Place. If you pass Go, collect $200."
-        four = "Advance to nearest Utility. If unowned, you may buy it from the Bank. If owned, throw dice and pay owner a total 10 times the amount thrown."
-        five = "Advance to the nearest Railroad and pay owner twice the rental to which they is otherwise entitled. If Railroad is unowned, you may buy it from the Bank. "
-        six = "Bank pays you dividend of $50."
-        seven = "Get out of Jail Free. This card may be kept until needed, or traded/sold."
-        eight = "Go Back Three Spaces."
-        nine = "Go to Jail. Do not pass GO, do not collect $200."
-        ten = "Make general repairs on all your property: For each house pay $25, For each hotel pay $100."
-        eleven = "Pay poor tax of $15 "
-        twelve = "Take a trip to Reading Railroad. If you pass Go, collect $200."
-        thirteen = "Take a walk on the Boardwalk."
-        fourteen = "You have been elected Chairman of the Board. Pay each player $50."
-        fifteen = "Your building and loan matures. Collect $150."
-
-        return [zero, one, two, three, four, five, six, seven, eight, nine, ten, eleven, twelve, thirteen, fourteen, fifteen]
-
-    def _chanceCardActions(self):
-        """
-            Returns a list of the actions for every chance card in the game.
-
-            Ordered to match the text of the cards.
-        """
-        def zero(player): return player.giveCash(100)
-        def one(player): return self._advanceTo("Go")
-        def two(player): return self._advanceTo("Illinois Avenue")
-        def three(player): return self._advanceTo("St. Charles Place")
-        def four(player): return self._advanceToNearestUtility()
-        def five(player): return self._advanceToNearestRailroad()
-        def six(player): return player.giveCash(50)
-        def seven(player): return player.giveGetOutOfJail()
-        def eight(player): return self._move(-3)
-        def nine(player): return player.goToJail()
-        def ten(player): return player.makeRepairs(25, 100)
-        def eleven(player): return player.takeCash(15)
-        def twelve(player): return self._advanceTo("Reading Railroad")
-        def thirteen(player): return self._advanceTo("Boardwalk")
-        def fourteen(player): return player.giveToEach(50, self.players)
-        def fifteen(player): return player.giveCash(150)
-        return [zero, one, two, three, four, five, six, seven, eight, nine, ten, eleven, twelve, thirteen, fourteen, fifteen]
-
-    def _communityChestCardTexts(self):
-        """
-            Returns an array with all of the texts for the Community Chest Cards
-        """
-        zero = "Advance to Go."
-        one = "Bank error in your favor. Collect $200."
-        two = "Doctor's fees. Pay $50."
-        three = "From sale of stock you get $50."
-        four = "Get Out of Jail Free. This card may be kept until needed or sold/traded."
-        five = "Go to Jail.Do not pass Go, Do not collect $200."
-        six = "Grand Opera Night. Collect $50 from every player for opening night seats."
-        seven = "Holiday Fund matures. Collect $100."
-        eight = "Income tax refund. Collect $20."
-        nine = "It's your birthday. Collect $10 from every player."
-        ten = "Life insurance matures – Collect $100"
-        eleven = "Hospital Fees. Pay $50."
-        twelve = "School fees. Pay $50."
-        thirteen = "Receive $25 consultancy fee."
-        fourteen = "You are assessed for street repairs: Pay $40 per house and $115 per hotel you own."
-        fifteen = "You have won second prize in a beauty contest. Collect $10."
-        sixteen = "You inherit $100."
-        return [zero, one, two, three, four, five, six, seven, eight, nine, ten, eleven, twelve, thirteen, fourteen, fifteen, sixteen]
-
-    def _communityChestCardActions(self):
-        """
-            Returns an array with all of the actions for the Community Chest Cards.
-
-            Order matches the order of the Community Chest Card Texts
-        """
-        def zero(player): return self._advanceTo("Go")
-        def one(player): return player.giveCash(200)
-        def two(player): return player.takeCash(50)
-        def three(player): return player.giveCash(50)
-        def four(player): return player.giveGetOutOfJail()
-        def five(player): return player.goToJail()
-        def six(player): return player.takeFromEach(50, self.players)
-        def seven(player): return player.giveCash(100)
-        def eight(player): return player.giveCash(20)
-        def nine(player): return player.takeFromEach(10, self.players)
-        def ten(player): return player.giveCash(100)
-        def eleven(player): return player.takeCash(50)
-        def twelve(player): return player.takeCash(50)
-        def thirteen(player): return player.giveCash(50)
-        def fourteen(player): return player.makeRepair(40, 115)
-        def fifteen(player): return player.giveCash(10)
-        def sixteen(player): return player.giveCash(100)
-        return [zero, one, two, three, four, five, six, seven, eight, nine, ten, eleven, twelve, thirteen, fourteen, fifteen, sixteen]
+    # Snapshot Helpers
+    def _getTurnState(self):
+        """
+            Returns a tuple of everything about the game that is not stored in its BoardState
+        """
+        return (tuple(self.players), self.currentPlayer, self.chanceOrder, self.currentChanceIndex,
+                self.communityChestOrder, self.currentCommunityChestIndex, self.numRolled,
+                self.hasRolled, self.numDoublesRolled, self.pendingDebt)
+
+    def _setTurnState(self, turn):
+        """
+            Puts back the parts of the game that are not stored in its BoardState
+
+            Parameter: turn, the turn state to put back
+            Requires: Must be returned by _getTurnState
+        """
+        (players, self.currentPlayer, self.chanceOrder, self.currentChanceIndex,
+         self.communityChestOrder, self.currentCommunityChestIndex, self.numRolled,
+         self.hasRolled, self.numDoublesRolled, self.pendingDebt) = turn
+        self.players = list(players)
 
     def _advanceTo(self, tileName):
         """
@@ -619,7 +808,8 @@ class Game:
             self.currentPlayer.advanceTo("B. & O. Railroad", self.board)
         else:
             self.currentPlayer.advanceTo("Short Line", self.board)
-        return self._handleAdvanceToRail(self)
+        self.events.record(MOVED, self.currentPlayer.slot, self.currentPlayer.location)
+        return self._handleAdvanceToRail()
 
     def _handleAdvanceToRail(self):
         """
@@ -632,18 +822,10 @@ class Game:
         tile = self.board.getTile(currentPlayer["location"])
         if tile["owner"] is None:
             return [("Buy", "Not owned")]
+        elif tile["owner"] == self.currentPlayer or tile["mortgaged"]:
+            return None
         else:
-            railroads = ["Reading Railroad", "Pennsylvania Railroad",
-                         "B. & O. Railroad", "Short Line"]
-            numOwned = self._numOwned(tile["owner"], railroads)
-            if numOwned == 1:
-                return self._attemptTakeRent(tile["owner"], 50)
-            elif numOwned == 2:
-                return self._attemptTakeRent(tile["owner"], 100)
-            elif numOwned == 3:
-                return self._attemptTakeRent(tile["owner"], 200)
-            elif numOwned == 4:
-                return self._attemptTakeRent(tile["owner"], 400)
+            return self._attemptTakeRent(tile["owner"], 2 * self.board.getRent(tile["id"]))
 
     def _advanceToNearestUtility(self):
         """
@@ -659,26 +841,35 @@ class Game:
 
         if currentLocation > waterWorksLoc or currentLocation < electricCompLoc:
             self.currentPlayer.advanceTo("Electric Company", self.board)
+            self.events.record(MOVED, self.currentPlayer.slot, self.currentPlayer.location)
             currentPlayer = self.currentPlayer.toDict()
             tile = self.board.getTile(currentPlayer["location"])
             if tile["owner"] is None:
                 return [("Buy", "Not owned")]
+            elif tile["owner"] == self.currentPlayer or tile["mortgaged"]:
+                return None
             else:
-                return self._attemptTakeRent(tile["owner"], random.randint(2, 12)*10)
+                return self._attemptTakeRent(tile["owner"], self.dice.randint(2, 12)*10)
         else:
             self.currentPlayer.advanceTo("Water Works", self.board)
+            self.events.record(MOVED, self.currentPlayer.slot, self.currentPlayer.location)
             currentPlayer = self.currentPlayer.toDict()
             tile = self.board.getTile(currentPlayer["location"])
             if tile["owner"] is None:
                 return [("Buy", "Not owned")]
+            elif tile["owner"] == self.currentPlayer or tile["mortgaged"]:
+                return None
             else:
-                return self._attemptTakeRent(tile["owner"], random.randint(2, 12)*10)
+                return self._attemptTakeRent(tile["owner"], self.dice.randint(2, 12)*10)
 
     def _move(self, spaces):
         """
             Moves the current player spaces places. Awards cash if the current player passed GO
+
+            Returns: A list of logs associated with landing on the new tile
         """
         self.currentPlayer.move(spaces)
+        return self._handleTile()
 # Rolling Helpers
 
     def _handleTile(self):
@@ -689,6 +880,7 @@ class Game:
             Returns: A list of appropriate logs
         """
         tile = self.board.getTile(self.currentPlayer.toDict()["location"])
+        self.events.record(MOVED, self.currentPlayer.slot, tile["id"])
 
         if tile["name"] == "Chance" or tile["name"] == "Community Chest":
             return self._drawCard()
@@ -713,51 +905,34 @@ class Game:
         tileName = self.board.getTile(self.currentPlayer.toDict()["location"])["name"]
 
         if tileName == "Chance":
-            card = self.chanceCards[self.currentChanceIndex]
-            self.currentChanceIndex = (self.currentChanceIndex + 1) % len(self.chanceCards)
-            logs = [("Card", card.getText())]
-            actionReturn = card.getAction()(self.currentPlayer)
-            if actionReturn is not None:
-                logs + actionReturn
-            return logs
-
-        if tileName == "Community Chest":
-            card = self.communityChestCards[self.currentCommunityChestIndex]
+            cardId = self.chanceOrder[self.currentChanceIndex]
+            self.currentChanceIndex = (self.currentChanceIndex + 1) % len(self.chanceOrder)
+            self.events.record(CARD_DRAWN, self.currentPlayer.slot, CHANCE, cardId)
+            text, opcode, arg = CHANCE_CARDS[cardId]
+        else:
+            cardId = self.communityChestOrder[self.currentCommunityChestIndex]
             self.currentCommunityChestIndex = (
-                self.currentCommunityChestIndex + 1) % len(self.communityChestCards)
-            logs = [("Card", card.getText())]
-            actionReturn = card.getAction()(self.currentPlayer)
-            if actionReturn is not None:
-                logs + actionReturn
-            return logs
+                self.currentCommunityChestIndex + 1) % len(self.communityChestOrder)
+            self.events.record(CARD_DRAWN, self.currentPlayer.slot, COMMUNITY_CHEST, cardId)
+            text, opcode, arg = COMMUNITY_CHEST_CARDS[cardId]
+
+        logs = [("Card", text)]
+        actionReturn = _CARD_ACTIONS[opcode](self, self.currentPlayer, arg)
+        if actionReturn is not None:
+            logs += actionReturn
+        return logs
 
     def _takeRent(self):
         """
-            Pays rent owed to the owner of the current tile.
+            Pays rent owed to the owner of the current tile, read from the board's rent table
 
             Returns: A rent log if the current player can pay the rent, a Bankruptcy Player log otherwise
         """
-        tile = self.board.getTile(self.currentPlayer.toDict()["location"])
-        railroads = ["Reading Railroad", "Pennsylvania Railroad", "B. & O. Railroad", "Short Line"]
-        utilities = ["Electric Company", "Water Works"]
-        if tile["name"] in railroads:
-            numOwned = self._numOwned(tile["owner"], railroads)
-            if numOwned == 1:
-                return self._attemptTakeRent(tile["owner"], 25)
-            elif numOwned == 2:
-                return self._attemptTakeRent(tile["owner"], 50)
-            elif numOwned == 3:
-                return self._attemptTakeRent(tile["owner"], 100)
-            elif numOwned == 4:
-                return self._attemptTakeRent(tile["owner"], 200)
-        if tile["name"] in utilities:
-            numOwned = self._numOwned(tile["owner"], utilities)
-            if numOwned == 1:
-                return self._attemptTakeRent(tile["owner"], 4 * self.numRolled)
-            if numOwned == 2:
-                return self._attemptTakeRent(tile["owner"], 10 * self.numRolled)
-        else:
-            return self._attemptTakeRent(tile["owner"], self._getOwedRent(tile))
+        location = self.currentPlayer.location
+        rent = self.board.getRent(location)
+        if location in self.board.utilities:
+            rent *= self.numRolled
+        return self._attemptTakeRent(self.board.getTileObject(location).owner, rent)
 
     def _attemptTakeRent(self, owner, amount):
         """
@@ -772,10 +947,13 @@ class Game:
         """
         currentPlayer = self.currentPlayer.toDict()
         if amount > currentPlayer["cash"]:
+            self.pendingDebt = (owner, amount)
+            self.events.record(DEBT_OWED, self.currentPlayer.slot, owner.slot, amount)
             return [("Bankruptcy Player", f"You owe {amount} to {owner.toDict()['name']}")]
         else:
             self.currentPlayer.takeCash(amount)
             owner.giveCash(amount)
+            self.events.record(RENT_PAID, self.currentPlayer.slot, owner.slot, amount)
             return [('Rent', f"{currentPlayer['name']} paid ${amount} to {owner.toDict()['name']}")]
 
     def _takeTax(self):
@@ -788,48 +966,22 @@ class Game:
         tileName = self.board.getTile(currentPlayer["location"])["name"]
         if tileName == "Income Tax":
             if currentPlayer["cash"] < 200:
+                self.pendingDebt = (None, 200)
+                self.events.record(DEBT_OWED, self.currentPlayer.slot, -1, 200)
                 return [("Bankruptcy Bank", "You owe $200 to the Bank")]
             else:
                 self.currentPlayer.takeCash(200)
+                self.events.record(TAX_PAID, self.currentPlayer.slot, 200)
                 return [("Tax", f"{currentPlayer['name']} paid $200 in Income Tax")]
         if tileName == "Luxury Tax":
             if currentPlayer["cash"] < 100:
+                self.pendingDebt = (None, 100)
+                self.events.record(DEBT_OWED, self.currentPlayer.slot, -1, 100)
                 return [("Bankruptcy Bank", "You owe $100 to the Bank")]
             else:
                 self.currentPlayer.takeCash(100)
+                self.events.record(TAX_PAID, self.currentPlayer.slot, 100)
                 return [("Tax", f"{currentPlayer['name']} paid $100 in Luxury Tax")]
-
-    def _numOwned(self, owner, props):
-        """
-            Returns the number of properties in props that are owned by owner.
-
-            Parameter: owner, the owner requested
-            Requires: Must be of type Player
-
-            Parameter: props, list of the names of properties to check
-            Requires: Must be of type string list
-        """
-        total = 0
-        for prop in props:
-            if self.board.getTile(self.board.getTileId(prop))["owner"] == owner:
-                total += 1
-        return total
-
-    def _getOwedRent(self, tile):
-        """
-            Returns the amount of rent that would be paid if a player landed on the tile described
-            in tile
-
-            Parameter: tile, the dictionary describing the tile requested
-            Requires: Must be of type dict
-        """
-        currentMonopolies = self.board.getMonopolies()
-        if tile["color"] not in currentMonopolies:
-            return tile["rents"][0]
-        elif tile["numHouses"] == 0:
-            return tile["rents"][0] * 2
-        else:
-            return tile["rents"][tile["numHouses"]]
 # Jail Helpers
 
     def _checkJail(self):
@@ -848,15 +1000,20 @@ class Game:
             if currentPlayer["cash"] >= 50:
                 self.currentPlayer.takeCash(50)
                 self.currentPlayer.leaveJail()
+                self.events.record(JAIL_LEFT, self.currentPlayer.slot, LEFT_BY_FORCE)
                 return [("Jail Success", f"{currentPlayer['name']} was forced to pay $50 to get out of jail")]
             else:
+                self.pendingDebt = (None, 50)
+                self.events.record(DEBT_OWED, self.currentPlayer.slot, -1, 50)
                 return [("Bankruptcy Bank", "You owe $50 to the Bank")]
 
     def _goToJail(self):
         """
-            Sends the current player to jail
+            Sends the current player to jail, ending their turn
         """
         self.currentPlayer.goToJail()
+        self.hasRolled = True
+        self.events.record(JAIL_ENTERED, self.currentPlayer.slot)
 
 # Trade Helpers
 
@@ -872,28 +1029,28 @@ class Game:
             Parameter: p2Dict, the dictionary specifying what player 2 gives to player 1
             Requires: Must be of type dict
         """
-        currentPlayer = self.currentPlayer.toDict()
-        for player in self.getPlayers():
-            if player["name"] == p2Dict["name"]:
+        currentPlayer = self.currentPlayer
+        for player in self.players:
+            if player.name == p2Dict["name"]:
                 player2 = player
 
-        if currentPlayer['cash'] < p1Dict['cash']:
-            return ("Trade Fail", f"{currentPlayer['name']} doesn't have ${p1Dict['cash']}")
-        if player2['cash'] < p2Dict["cash"]:
-            return ("Trade Fail", f"{player2['name']} doesn't have ${p2Dict['cash']}")
-
-        for propName in p1Dict['properties']:
-            if propName not in currentPlayer['properties']:
-                return ("Trade Fail", f"{currentPlayer['name']} doesn't own {propName}")
+        if currentPlayer.cash < p1Dict['cash']:
+            return ("Trade Fail", f"{currentPlayer.name} doesn't have ${p1Dict['cash']}")
+        if player2.cash < p2Dict["cash"]:
+            return ("Trade Fail", f"{player2.name} doesn't have ${p2Dict['cash']}")
 
-        for propName in p2Dict['properties']:
-            if propName not in player2['properties']:
-                return ("Trade Fail", f"{player2['name']} doesn't own {propName}")
+        # Each side owns everything it offers if the offer has no bits outside its holdings
+        holdings = self.state.holdings
+        for player, tradeDict in ((currentPlayer, p1Dict), (player2, p2Dict)):
+            if self.board.getMask(tradeDict['properties']) & ~holdings[player.slot]:
+                for propName in tradeDict['properties']:
+                    if not player.holdings >> self.getTileId(propName) & 1:
+                        return ("Trade Fail", f"{player.name} doesn't own {propName}")
 
-        if currentPlayer['jailCards'] < p1Dict['jailCards']:
-            return ("Trade Fail", f"{currentPlayer['name']} doesn't have {p1Dict['jailCards']} Get Out of Jail Free Cards")
-        if player2['jailCards'] < p2Dict['jailCards']:
-            return ("Trade Fail", f"{player2['name']} doesn't have {p2Dict['jailCards']} Get Out of Jail Free Cards")
+        if currentPlayer.jailCards < p1Dict['jailCards']:
+            return ("Trade Fail", f"{currentPlayer.name} doesn't have {p1Dict['jailCards']} Get Out of Jail Free Cards")
+        if player2.jailCards < p2Dict['jailCards']:
+            return ("Trade Fail", f"{player2.name} doesn't have {p2Dict['jailCards']} Get Out of Jail Free Cards")
 
     def _makeTradeString(self, p1Dict, p2Dict):
         """
@@ -940,20 +1097,3 @@ class Game:
                        f"{p1CashString}{p1Props}{p1JailString} with {p2Dict['name']} "
                        f"for {p2CashString}{p2Props}{p2JailString}.")
         return tradeString
-# Build and Mortgage Helpers
-
-    def _getOwnedTiles(self):
-        """
-            Returns a list of dictionaries representing every tile that the current player owns
-        """
-        return list(map(lambda propName: self.board.getTile(self.board.getTileId(propName)),
-                        self.currentPlayer.toDict()["properties"]))
-
-    def _updateMonopolies(self):
-        """
-            Updates the monopolies on the board to reflect the current game status
-        """
-        for playerDict in self.getPlayers():
-            for color, props in self.possMonopolies.items():
-                if props <= playerDict["properties"]:
-                    self.board.setMonopoly(playerDict["name"], color)
@@ -0,0 +1,211 @@
+"""
+    Solves for the exact long run landing probability of every tile on the board
+
+    The game is modelled as a Markov chain over the state of a player after each roll: the tile
+    they are on with the number of doubles they have rolled this turn, or the number of turns
+    they have spent in jail. The chain covers doubles, three doubles sending a player to jail,
+    Go To Jail, the movement cards in both decks, and the jail rules of Game, where a player
+    rolls for doubles up to three times and then pays the fine and rolls normally.
+"""
+import numpy as np
+from boardspec import loadBoardSpec
+from cards import (ADVANCE, BACK, CHANCE_CARDS, COMMUNITY_CHEST_CARDS, JAIL, NEAREST_RAILROAD,
+                   NEAREST_UTILITY)
+from consts import JAIL_TILE
+
+# The number of roll states a player out of jail can be in on each tile, one per doubles count
+NUM_DOUBLES = 3
+
+# The number of turns a player can spend in jail before paying the fine, plus the turn they pay
+NUM_JAIL_STATES = 4
+
+# The outcome of a roll that sends the player to jail
+GO_TO_JAIL = -1
+
+# The landing probabilities per roll and per turn already solved, by (board file hash, jail
+# strategy)
+_cache = {}
+
+
+def solve(path=None, jailStrategy="roll"):
+    """
+        Returns a numpy array with the long run probability that a roll leaves a player on each
+        tile. Rolls that leave a player in jail count as leaving them on the jail tile. Results
+        are cached by the hash of the board file
+
+        Parameter: path, the path of the board file, the board loaded by loadBoardSpec if None
+        Requires: Must be of type string or None
+
+        Parameter: jailStrategy, "roll" to roll for doubles to leave jail, "pay" to pay the fine
+        at once
+        Requires: Must be of type string
+    """
+    return _solve(loadBoardSpec(path), jailStrategy)[0]
+
+
+def landingsPerTurn(path=None, jailStrategy="roll"):
+    """
+        Returns a numpy array with the long run expected number of times a player lands on each
+        tile in one turn, counting the extra rolls of doubles, so it sums to the expected number
+        of rolls in a turn. Results are cached like solve
+
+        Parameter: path, the path of the board file, the board loaded by loadBoardSpec if None
+        Requires: Must be of type string or None
+
+        Parameter: jailStrategy, "roll" to roll for doubles to leave jail, "pay" to pay the fine
+        at once
+        Requires: Must be of type string
+    """
+    return _solve(loadBoardSpec(path), jailStrategy)[1]
+
+
+def transitionMatrix(spec, jailStrategy="roll"):
+    """
+        Returns the transition matrix of the roll states of a player, matrix[i, j] being the
+        probability of moving from state i to state j in one roll. State tile * NUM_DOUBLES +
+        doubles is being on tile after rolling doubles times in a row this turn, and the last
+        NUM_JAIL_STATES states are being in jail after that many turns in it
+
+        Parameter: spec, the board
+        Requires: Must be of type BoardSpec
+
+        Parameter: jailStrategy, "roll" to roll for doubles to leave jail, "pay" to pay the fine
+        at once
+        Requires: Must be of type string
+    """
+    numTiles = spec.numTiles
+    jailState = numTiles * NUM_DOUBLES
+    matrix = np.zeros((jailState + NUM_JAIL_STATES, jailState + NUM_JAIL_STATES))
+    outcomes = [_landingOutcomes(spec, tile) for tile in range(numTiles)]
+
+    def addRoll(row, tile, doubles, total, isDouble, probability, endsTurn):
+        for destination, chance in outcomes[(tile + total) % numTiles].items():
+            if destination == GO_TO_JAIL:
+                matrix[row, jailState] += probability * chance
+            else:
+                nextDoubles = doubles + 1 if isDouble and not endsTurn else 0
+                matrix[row, destination * NUM_DOUBLES + nextDoubles] += probability * chance
+
+    for tile in range(numTiles):
+        for doubles in range(NUM_DOUBLES):
+            row = tile * NUM_DOUBLES + doubles
+            for dice1 in range(1, 7):
+                for dice2 in range(1, 7):
+                    if dice1 == dice2 and doubles == NUM_DOUBLES - 1:
+                        matrix[row, jailState] += 1 / 36
+                    else:
+                        addRoll(row, tile, doubles, dice1 + dice2, dice1 == dice2, 1 / 36, False)
+
+    # After paying the fine a player rolls like one just visiting jail
+    visiting = matrix[JAIL_TILE * NUM_DOUBLES]
+    for turns in range(NUM_JAIL_STATES):
+        row = jailState + turns
+        if turns == NUM_JAIL_STATES - 1 or jailStrategy == "pay":
+            matrix[row] = visiting
+            continue
+        for dice1 in range(1, 7):
+            for dice2 in range(1, 7):
+                if dice1 == dice2:
+                    # Rolling doubles out of jail moves the player but ends their turn
+                    addRoll(row, JAIL_TILE, 0, dice1 + dice2, True, 1 / 36, True)
+                else:
+                    matrix[row, row + 1] += 1 / 36
+    return matrix
+
+
+def stationaryDistribution(matrix):
+    """
+        Returns the stationary distribution of the Markov chain with transition matrix, matrix
+
+        Parameter: matrix, the transition matrix of the chain
+        Requires: Must be of type 2d numpy array, with rows summing to 1
+    """
+    size = matrix.shape[0]
+    # Solve pi (P - I) = 0 with one equation replaced by sum(pi) = 1
+    system = matrix.T - np.eye(size)
+    system[-1] = 1
+    target = np.zeros(size)
+    target[-1] = 1
+    return np.linalg.lstsq(system, target, rcond=None)[0]
+
+
+def _solve(spec, jailStrategy):
+    """
+        Returns the (per roll, per turn) landing probabilities of spec, see solve and
+        landingsPerTurn, solving the chain the first time they are asked for
+
+        Parameter: spec, the board
+        Requires: Must be of type BoardSpec
+
+        Parameter: jailStrategy, "roll" or "pay"
+        Requires: Must be of type string
+    """
+    key = (spec.digest, jailStrategy)
+    if key not in _cache:
+        stationary = stationaryDistribution(transitionMatrix(spec, jailStrategy))
+        landing = stationary[:-NUM_JAIL_STATES].reshape(spec.numTiles, NUM_DOUBLES).sum(1)
+        landing[JAIL_TILE] += stationary[-NUM_JAIL_STATES:].sum()
+        # A turn ends with every roll that leaves the player without doubles to roll again or
+        # in jail, so this is the number of turns per roll
+        turnsPerRoll = (stationary[:-NUM_JAIL_STATES:NUM_DOUBLES].sum() +
+                        stationary[-NUM_JAIL_STATES:].sum())
+        perTurn = landing / turnsPerRoll
+        landing.setflags(write=False)
+        perTurn.setflags(write=False)
+        _cache[key] = (landing, perTurn)
+    return _cache[key]
+
+
+def _landingOutcomes(spec, tile):
+    """
+        Returns a dictionary of destination: probability pairs for a player landing on tile,
+        following Go To Jail and any card drawn there. A destination of GO_TO_JAIL means the
+        player was sent to jail
+
+        Parameter: spec, the board
+        Requires: Must be of type BoardSpec
+
+        Parameter: tile, the id of the tile landed on
+        Requires: Must be of type int
+    """
+    name = spec.names[tile]
+    if name == "Go To Jail":
+        return {GO_TO_JAIL: 1.0}
+    if name == "Chance":
+        cards = CHANCE_CARDS
+    elif name == "Community Chest":
+        cards = COMMUNITY_CHEST_CARDS
+    else:
+        return {tile: 1.0}
+
+    result = {}
+    for text, opcode, arg in cards:
+        if opcode == JAIL:
+            outcomes = {GO_TO_JAIL: 1.0}
+        elif opcode == ADVANCE:
+            outcomes = {spec.getTileId(arg): 1.0}
+        elif opcode == NEAREST_RAILROAD:
+            outcomes = {nextTile(spec.railroads, tile): 1.0}
+        elif opcode == NEAREST_UTILITY:
+            outcomes = {nextTile(spec.utilities, tile): 1.0}
+        elif opcode == BACK:
+            outcomes = _landingOutcomes(spec, (tile - arg) % spec.numTiles)
+        else:
+            outcomes = {tile: 1.0}
+        for destination, chance in outcomes.items():
+            result[destination] = result.get(destination, 0) + chance / len(cards)
+    return result
+
+
+def nextTile(tileIds, tile):
+    """
+        Returns the first tile of tileIds after tile going around the board, where the nearest
+        railroad and nearest utility cards send a player
+
+        Parameter: tileIds, the tiles to choose from
+        Requires: Must be a non empty sorted tuple of int
+
+        Parameter: tile, the id of the tile the player is on
+        Requires: Must be of type int
+    """
+    return next((tileId for tileId in tileIds if tileId > tile), tileIds[0])
@@ -0,0 +1,414 @@
+"""
+    Contains MCTSPolicy, a policy that makes its buy, build, jail and auction decisions with Monte
+    Carlo tree search
+
+    For every decision with more than one sensible answer, the policy plays the game on from each
+    answer with Simulator.resume, the other players and its own later decisions left to a fast
+    rollout policy, scores where it ends up and undoes it, until its time budget runs out. The
+    search is done on the game itself, with its events off and its dice reseeded for every
+    rollout, so nothing has to be copied and the game is left exactly as it was.
+
+    The tree holds the policy's own decisions, keyed by decision and answer but not by the rolls
+    in between. Every node along a rollout is chosen by UCB1 until the rollout reaches a decision
+    the tree has not seen, which the rollout policy makes. Once it answers, the node of its answer
+    becomes the root of the next decision in the same turn, such as the build after a buy, so the
+    rollouts already played from it are kept.
+"""
+import math
+import random
+import time
+from events import TURN_BEGAN
+from policies import CashThresholdPolicy, Policy, planBuilds
+from simulation import Simulator
+
+# The wall clock seconds spent searching each decision
+TIME_BUDGET = 0.05
+
+# The number of turns each rollout plays before the position is scored
+ROLLOUT_TURNS = 40
+
+# The exploration constant of UCB1
+EXPLORATION = 1.4
+
+# The most decisions of its own a rollout looks up in the tree
+MAX_DEPTH = 4
+
+
+class Node:
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        """
+            Creates a node of the search tree that has not been visited
+        """
+        self.visits = 0
+        self.value = 0.0
+        self.children = {}
+
+    def select(self, keys, exploration):
+        """
+            Returns the index in keys of the child to visit next by UCB1, visiting every child
+            once first
+
+            Parameter: keys, the keys of the children to choose between
+            Requires: Must be a non empty list of (string, answer key) tuples
+
+            Parameter: exploration, the exploration constant
+            Requires: Must be of type float
+        """
+        logVisits = math.log(self.visits + 1)
+        best, bestScore = 0, -1.0
+        for i, key in enumerate(keys):
+            child = self.children.get(key)
+            if child is None or child.visits == 0:
+                return i
+            score = (child.value / child.visits +
+                     exploration * math.sqrt(logVisits / child.visits))
+            if score > bestScore:
+                best, bestScore = i, score
+        return best
+
+    def child(self, key):
+        """
+            Returns the child with key, key, adding it if it does not exist
+
+            Parameter: key, the decision and the key of its answer
+            Requires: Must be of type (string, answer key)
+        """
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = Node()
+        return child
+
+
+class MCTSPolicy(Policy):
+    def __init__(self, timeBudget=TIME_BUDGET, rolloutTurns=ROLLOUT_TURNS, rolloutPolicy=None,
+                 maxRollouts=None, exploration=EXPLORATION, seed=None):
+        """
+            Creates a policy that searches every decision for timeBudget seconds
+
+            Parameter: timeBudget, the wall clock seconds spent searching each decision
+            Requires: Must be of type float
+
+            Parameter: rolloutTurns, the number of turns each rollout plays
+            Requires: Must be of type int, greater than 0
+
+            Parameter: rolloutPolicy, the policy of every player in the rollouts, a
+            CashThresholdPolicy if None; Policy itself plays close to randomly
+            Requires: Must be of type Policy or None
+
+            Parameter: maxRollouts, the most rollouts played for each decision, no limit if None
+            Requires: Must be of type int or None
+
+            Parameter: exploration, the exploration constant of UCB1
+            Requires: Must be of type float
+
+            Parameter: seed, the seed of the dice of the rollouts, from the operating system if
+            None
+            Requires: Must be of type int or None
+        """
+        self.timeBudget = timeBudget
+        self.rolloutPolicy = CashThresholdPolicy() if rolloutPolicy is None else rolloutPolicy
+        self.maxRollouts = maxRollouts
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.simulator = Simulator(rolloutTurns)
+        # The node to start the next search of each player from, with the game it was searched
+        # in and the number of events the game had recorded
+        self.trees = {}
+        # The rollouts played and the seconds spent searching, over every decision
+        self.rollouts = 0
+        self.searchSeconds = 0.0
+
+    # DECISIONS ----------------------------------------------------------------------------------
+    def decideBuy(self, game, tile):
+        """
+            Returns whether to buy tile, see Policy.decideBuy
+        """
+        return self._search(game, "decideBuy", (game, tile), game.getCurrentPlayerView()["id"])
+
+    def decideJail(self, game):
+        """
+            Returns how to leave jail, see Policy.decideJail
+        """
+        return self._search(game, "decideJail", (game,), game.getCurrentPlayerView()["id"])
+
+    def decideBuild(self, game):
+        """
+            Returns the tiles to build on, see Policy.decideBuild
+        """
+        return self._search(game, "decideBuild", (game,), game.getCurrentPlayerView()["id"])
+
+    def bid(self, game, tile, player):
+        """
+            Returns the bid of player on tile, see Policy.bid
+        """
+        return self._search(game, "bid", (game, tile, player), player["id"])
+
+    def raiseCash(self, game, amount):
+        """
+            Raises cash like the rollout policy, see Policy.raiseCash
+        """
+        self.rolloutPolicy.raiseCash(game, amount)
+
+    # HELPERS ------------------------------------------------------------------------------------
+    def _search(self, game, decision, args, playerId):
+        """
+            Returns the answer to the decision that did best in the rollouts played from it
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game, waiting on the decision
+
+            Parameter: decision, the name of the decision
+            Requires: Must be "decideBuy", "decideJail", "decideBuild" or "bid"
+
+            Parameter: args, the arguments of the decision method
+            Requires: Must be of type tuple
+
+            Parameter: playerId, the id of the player deciding
+            Requires: Must be of type int
+        """
+        answers = candidates(decision, args)
+        keys = [(decision, answerKey(answer)) for answer in answers]
+        root = self._root(game, playerId)
+        if len(answers) == 1:
+            self._keep(game, playerId, root.children.get(keys[0]))
+            return answers[0]
+
+        start = time.perf_counter()
+        deadline = start + self.timeBudget
+        policies = {player["id"]: self.rolloutPolicy for player in game.getPlayersView()}
+        treePolicy = policies[playerId] = TreePolicy(self)
+        diceState = game.dice.getState()
+        enabled = game.events.enabled
+        journaling = game.state.journal is not None
+        game.events.enabled = False
+        mark = game.mark()
+        rollouts = 0
+        try:
+            while ((self.maxRollouts is None or rollouts < self.maxRollouts) and
+                   (rollouts < len(answers) or time.perf_counter() < deadline)):
+                game.dice.reset(self.random.getrandbits(64))
+                index = root.select(keys, self.exploration)
+                treePolicy.path = [root, root.child(keys[index])]
+                self.simulator.resume(game, policies, decision, args, answers[index])
+                reward = score(game, playerId)
+                for node in treePolicy.path:
+                    node.visits += 1
+                    node.value += reward
+                game.undo(mark)
+                rollouts += 1
+        finally:
+            game.dice.setState(diceState)
+            game.events.enabled = enabled
+            if not journaling:
+                game.stopJournal()
+        self.rollouts += rollouts
+        self.searchSeconds += time.perf_counter() - start
+
+        # With maxRollouts below the number of answers some are never tried, and count as 0 visits
+        best = max(range(len(answers)),
+                   key=lambda i: getattr(root.children.get(keys[i]), "visits", 0))
+        self._keep(game, playerId, root.child(keys[best]))
+        return answers[best]
+
+    def _root(self, game, playerId):
+        """
+            Returns the node the last search of the player left for the next, if it was made in
+            this turn of game, otherwise a new node. Turns are told apart by the events of the
+            game, so the tree is not reused while they are off
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: playerId, the id of the player deciding
+            Requires: Must be of type int
+        """
+        tree = self.trees.get(playerId)
+        if tree is None or tree[0] is not game or not game.events.enabled:
+            return Node()
+        treeGame, count, node = tree
+        if count > game.events.count:
+            return Node()
+        try:
+            if any(event.kind == TURN_BEGAN for event in game.events.since(count)):
+                return Node()
+        except IndexError:
+            return Node()
+        return node
+
+    def _keep(self, game, playerId, node):
+        """
+            Keeps node as the root of the next search of the player in this turn
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: playerId, the id of the player deciding
+            Requires: Must be of type int
+
+            Parameter: node, the node of the answer given, None to start the next search afresh
+            Requires: Must be of type Node or None
+        """
+        if node is None:
+            self.trees.pop(playerId, None)
+        else:
+            self.trees[playerId] = (game, game.events.count, node)
+
+
+class TreePolicy(Policy):
+    def __init__(self, search):
+        """
+            Creates the policy of the searching player in rollouts, which follows the tree of
+            search while it can and the rollout policy after
+
+            Parameter: search, the policy searching
+            Requires: Must be of type MCTSPolicy
+        """
+        self.search = search
+        # The nodes visited by the current rollout, from the root
+        self.path = []
+
+    # DECISIONS ----------------------------------------------------------------------------------
+    def decideBuy(self, game, tile):
+        """
+            Returns whether to buy tile, see Policy.decideBuy
+        """
+        return self._decide("decideBuy", (game, tile))
+
+    def decideJail(self, game):
+        """
+            Returns how to leave jail, see Policy.decideJail
+        """
+        return self._decide("decideJail", (game,))
+
+    def decideBuild(self, game):
+        """
+            Returns the tiles to build on, see Policy.decideBuild
+        """
+        return self._decide("decideBuild", (game,))
+
+    def bid(self, game, tile, player):
+        """
+            Returns the bid of player on tile, see Policy.bid
+        """
+        return self._decide("bid", (game, tile, player))
+
+    def raiseCash(self, game, amount):
+        """
+            Raises cash like the rollout policy, see Policy.raiseCash
+        """
+        self.search.rolloutPolicy.raiseCash(game, amount)
+
+    # HELPERS ------------------------------------------------------------------------------------
+
+    def _decide(self, decision, args):
+        """
+            Returns the answer to the decision, chosen by UCB1 among the children of the last node
+            of the path while the path is in the tree, otherwise by the rollout policy
+
+            Parameter: decision, the name of the decision
+            Requires: Must be "decideBuy", "decideJail", "decideBuild" or "bid"
+
+            Parameter: args, the arguments of the decision method
+            Requires: Must be of type tuple
+        """
+        node = self.path[-1]
+        if len(self.path) <= MAX_DEPTH and node.visits > 0:
+            answers = candidates(decision, args)
+            if len(answers) > 1:
+                keys = [(decision, answerKey(answer)) for answer in answers]
+                index = node.select(keys, self.search.exploration)
+                self.path.append(node.child(keys[index]))
+                return answers[index]
+        return getattr(self.search.rolloutPolicy, decision)(*args)
+
+
+def candidates(decision, args):
+    """
+        Returns the answers a search tries for a decision: buying or not when the player has more
+        cash than the price, as Game.buy requires, each way out of jail the player can take,
+        building nothing, for half the player's cash, for all but $200 or for all of it, and
+        bidding nothing, half the price, the price or one and a half times the price, up to the
+        player's cash
+
+        Parameter: decision, the name of the decision
+        Requires: Must be "decideBuy", "decideJail", "decideBuild" or "bid"
+
+        Parameter: args, the arguments of the decision method
+        Requires: Must be of type tuple
+    """
+    game = args[0]
+    if decision == "decideBuy":
+        return [True, False] if args[1]["price"] < game.getCurrentPlayerView()["cash"] else [False]
+    if decision == "decideJail":
+        player = game.getCurrentPlayerView()
+        answers = ["roll"]
+        if player["cash"] >= 50:
+            answers.append("pay")
+        if player["jailCards"] > 0:
+            answers.append("card")
+        return answers
+    if decision == "decideBuild":
+        answers = [[]]
+        if game.getBuildable():
+            cash = game.getCurrentPlayerView()["cash"]
+            for budget in (cash // 2, cash - 200, cash):
+                plan = planBuilds(game, budget)
+                if plan not in answers:
+                    answers.append(plan)
+        return answers
+    price, cash = args[1]["price"], args[2]["cash"]
+    answers = []
+    for bid in (0, price // 2, price, price * 3 // 2):
+        bid = min(bid, cash)
+        if bid not in answers:
+            answers.append(bid)
+    return answers
+
+
+def answerKey(answer):
+    """
+        Returns a hashable key for answer, the tuple of the tiles of a build plan
+
+        Parameter: answer, an answer to a decision
+        Requires: Must be of type bool, string, int or string list
+    """
+    return tuple(answer) if isinstance(answer, list) else answer
+
+
+def score(game, playerId):
+    """
+        Returns the share of the net worth of the players left in game that the player with id
+        playerId has, 1.0 if they won and 0.0 if they went bankrupt. Net worth counts cash, the
+        price of every tile owned, half for mortgaged tiles, and the cost of every house
+
+        Parameter: game, the game to score
+        Requires: Must be of type Game
+
+        Parameter: playerId, the id of the player
+        Requires: Must be of type int
+    """
+    worths = netWorths(game)
+    slot = next((player.slot for player in game.players if player.id == playerId), None)
+    if slot is None:
+        return 0.0
+    total = sum(max(worth, 0) for worth in worths.values())
+    return max(worths[slot], 0) / total if total > 0 else 1.0 / len(worths)
+
+
+def netWorths(game):
+    """
+        Returns a dictionary with the net worth of every player left in game, by slot, see score
+
+        Parameter: game, the game to value
+        Requires: Must be of type Game
+    """
+    state, spec = game.state, game.boardSpec
+    worths = {player.slot: state.cash[player.slot] for player in game.players}
+    for tileId, owner in enumerate(state.owner):
+        if owner in worths:
+            price = spec.prices[tileId]
+            worths[owner] += (price // 2 if state.mortgaged[tileId] else price) + \
+                state.numHouses[tileId] * spec.houseCosts[tileId]
+    return worths
@@ -0,0 +1,521 @@
+"""
+    Plays thousands of games of Monopoly in lockstep with NumPy
+
+    Every game owns a fixed block of the state arrays, and each step plays one turn of the current
+    player of every unfinished game at once. The rules and card effects match Game, with every player
+    following the default Policy: buy every tile they can afford, never build, never bid, use a
+    Get Out of Jail Free card or roll for doubles to leave jail, and mortgage properties to pay a
+    debt. Run `python montecarlo.py 10000` to play 10000 four player games and print the
+    throughput.
+"""
+import sys
+import time
+import numpy as np
+from boardspec import (CHANCE, COMMUNITY_CHEST, GO_TO_JAIL, OTHER, PROPERTY, RAILROAD, TAX, UTILITY,
+                       loadBoardSpec)
+from cards import *
+from consts import JAIL_TILE, NUM_TILES, STARTING_CASH
+
+# The number of turns after which an unfinished game is stopped without a winner
+MAX_TURNS = 1000
+
+# The number of columns each game uses in the tile arrays
+TILE_STRIDE = NUM_TILES + 1
+
+
+class MonteCarloResult:
+    def __init__(self, turns, winners, landings, seconds):
+        """
+            Creates the summary of a batch of lockstep games
+
+            Parameter: turns, the number of turns played in each game
+            Requires: Must be of type int numpy array
+
+            Parameter: winners, the index of the winner of each game, -1 if the game was stopped
+            Requires: Must be of type int numpy array
+
+            Parameter: landings, the number of times each tile was landed on
+            Requires: Must be of type int numpy array
+
+            Parameter: seconds, the wall clock time it took to play the batch
+            Requires: Must be of type float
+        """
+        self.turns = turns
+        self.winners = winners
+        self.landings = landings
+        self.seconds = seconds
+
+    def gamesPerSecond(self):
+        """
+            Returns the number of games played per second
+        """
+        return len(self.turns) / self.seconds
+
+    def turnsPerSecond(self):
+        """
+            Returns the number of turns played per second
+        """
+        return int(self.turns.sum()) / self.seconds
+
+
+class MonteCarloEngine:
+    # INITIALIZATION -------------------------------------------------------------------------------
+    def __init__(self, numGames, numPlayers=4, seed=None, maxTurns=MAX_TURNS):
+        """
+            Creates numGames games with numPlayers players each, ready to be played
+
+            Parameter: numGames, the number of games to play in lockstep
+            Requires: Must be of type int
+
+            Parameter: numPlayers, the number of players in each game
+            Requires: Must be of type int
+
+            Parameter: seed, the seed of the dice, a random seed if None
+            Requires: Must be of type int or None
+
+            Parameter: maxTurns, the number of turns after which a game is stopped
+            Requires: Must be of type int
+        """
+        self.numGames = numGames
+        self.numPlayers = numPlayers
+        self.maxTurns = maxTurns
+        self.rng = np.random.default_rng(seed)
+        self._createTables()
+
+        # Player columns are indexed by game * numPlayers + player, tile columns by
+        # game * TILE_STRIDE + tile. Flat indexes are much cheaper than (game, player) pairs
+        size = numGames * numPlayers
+        self.location = np.zeros(size, np.int64)
+        self.cash = np.full(size, STARTING_CASH, np.int64)
+        self.inJail = np.zeros(size, bool)
+        self.numTurnsInJail = np.zeros(size, np.int64)
+        self.jailCards = np.zeros(size, np.int64)
+        self.alive = np.ones(size, bool)
+        # The extra last tile of each game is never owned, group member lists are padded with it
+        self.owner = np.full(numGames * TILE_STRIDE, -1, np.int64)
+        self.owner[NUM_TILES::TILE_STRIDE] = -2
+        self.numHouses = np.zeros(numGames * TILE_STRIDE, np.int64)
+        self.mortgaged = np.zeros(numGames * TILE_STRIDE, bool)
+        self.currentPlayer = np.zeros(numGames, np.int64)
+        self.chanceIndex = np.zeros(numGames, np.int64)
+        self.communityChestIndex = np.zeros(numGames, np.int64)
+        self.numTurns = np.zeros(numGames, np.int64)
+        self.done = np.zeros(numGames, bool)
+        self.landings = np.zeros(NUM_TILES, np.int64)
+
+    def _createTables(self):
+        """
+            Creates the per tile lookup tables from the BoardSpec and the card tables
+        """
+        spec = loadBoardSpec()
+        tileId = spec.tileIds
+
+        self.price = np.array(spec.prices, np.int64)
+        self.rents = np.array(spec.rents, np.int64)
+        self.houseCost = np.array(spec.houseCosts, np.int64)
+        self.tax = np.array(spec.taxes, np.int64)
+        self.kind = np.array(spec.kinds, np.int64)
+
+        # The tiles in each tile's group, padded with the never owned column
+        self.groupMembers = np.full((NUM_TILES, 4), NUM_TILES, np.int64)
+        self.groupSize = np.zeros(NUM_TILES, np.int64)
+        for members in (*spec.colorGroups.values(), spec.railroads, spec.utilities):
+            for i in members:
+                self.groupMembers[i, :len(members)] = members
+                self.groupSize[i] = len(members)
+
+        def cardTable(cards):
+            opcodes = np.array([opcode for text, opcode, arg in cards], np.int64)
+            args = np.zeros((len(cards), 2), np.int64)
+            for i, (text, opcode, arg) in enumerate(cards):
+                if opcode == ADVANCE:
+                    args[i, 0] = tileId[arg]
+                elif opcode == REPAIRS:
+                    args[i] = arg
+                else:
+                    args[i, 0] = arg
+            return opcodes, args
+        self.chanceOpcodes, self.chanceArgs = cardTable(CHANCE_CARDS)
+        self.communityChestOpcodes, self.communityChestArgs = cardTable(COMMUNITY_CHEST_CARDS)
+
+        railroadIds = spec.railroads
+        utilityIds = spec.utilities
+        locations = np.arange(NUM_TILES)
+        # The railroad and utility a card sends a player on each tile to, matching Game
+        self.nearestRailroad = np.select(
+            [(locations < railroadIds[0]) | (locations > railroadIds[3]),
+             locations < railroadIds[1], locations < railroadIds[2]],
+            railroadIds[:3], railroadIds[3])
+        self.nearestUtility = np.where(
+            (locations > utilityIds[1]) | (locations < utilityIds[0]), utilityIds[0], utilityIds[1])
+
+    # PLAYING --------------------------------------------------------------------------------------
+    def run(self):
+        """
+            Plays every game until it has a winner or has lasted maxTurns turns
+
+            Returns: A MonteCarloResult
+        """
+        start = time.perf_counter()
+        while self.step():
+            pass
+        alive = self.alive.reshape(self.numGames, self.numPlayers)
+        winners = np.where(alive.sum(1) == 1, alive.argmax(1), -1)
+        return MonteCarloResult(self.numTurns.copy(), winners, self.landings.copy(),
+                                time.perf_counter() - start)
+
+    def step(self):
+        """
+            Plays one turn of the current player of every unfinished game
+
+            Returns: True if there were unfinished games, False otherwise
+        """
+        games = np.flatnonzero(~self.done)
+        if games.size == 0:
+            return False
+        slots = games * self.numPlayers + self.currentPlayer[games]
+        rolling = self._startJailTurns(games, slots)
+
+        for numRolls in range(3):
+            keep = np.flatnonzero(rolling)
+            games, slots = games[keep], slots[keep]
+            if games.size == 0:
+                break
+            dice = self.rng.integers(1, 7, (2, games.size))
+            doubles = dice[0] == dice[1]
+            if numRolls == 2:
+                self._goToJail(slots[doubles])
+                keep = np.flatnonzero(~doubles)
+                games, slots, dice = games[keep], slots[keep], dice[:, keep]
+                doubles = doubles[keep]
+            rolled = dice[0] + dice[1]
+            self._move(slots, rolled)
+            self._land(games, slots, rolled)
+            rolling = doubles & ~self.inJail[slots] & self.alive[slots] & ~self.done[games]
+
+        self._endTurns(np.flatnonzero(~self.done))
+        return True
+
+    def _startJailTurns(self, games, slots):
+        """
+            Begins the turn of every player in jail. Players that have spent 3 turns in jail pay
+            the $50 fine, players with a Get Out of Jail Free card use it, and every other player
+            rolls for doubles, moving if they roll them
+
+            Returns: A boolean array, True for the games whose player rolls normally this turn
+
+            Parameter: games, the games playing this turn
+            Requires: Must be of type int numpy array
+
+            Parameter: slots, the player column index of the current player of each game
+            Requires: Must be of type int numpy array
+        """
+        jailed = self.inJail[slots]
+        if not jailed.any():
+            return ~jailed
+        forced = jailed & (self.numTurnsInJail[slots] >= 3)
+        card = jailed & ~forced & (self.jailCards[slots] > 0)
+        rolls = np.flatnonzero(jailed & ~forced & ~card)
+
+        self._charge(games[forced], slots[forced], 50, None)
+        self.jailCards[slots[card]] -= 1
+
+        rollGames, rollSlots = games[rolls], slots[rolls]
+        dice = self.rng.integers(1, 7, (2, rolls.size))
+        doubles = dice[0] == dice[1]
+        self.numTurnsInJail[rollSlots[~doubles]] += 1
+
+        freed = forced | card
+        freed[rolls] = doubles
+        # A bankrupt player is no longer in jail, so only free the players that paid
+        freed &= self.alive[slots]
+        self.inJail[slots[freed]] = False
+        self.numTurnsInJail[slots[freed]] = 0
+
+        out = np.flatnonzero(doubles)
+        rolled = (dice[0] + dice[1])[out]
+        self._move(rollSlots[out], rolled)
+        self._land(rollGames[out], rollSlots[out], rolled)
+        return ~jailed | ((forced | card) & self.alive[slots] & ~self.done[games])
+
+    def _endTurns(self, games):
+        """
+            Passes the turn to the next player still in each game, finishing the games with a
+            single player left or that have lasted maxTurns turns
+
+            Parameter: games, the unfinished games
+            Requires: Must be of type int numpy array
+        """
+        numPlayers = self.numPlayers
+        self.numTurns[games] += 1
+        nextPlayer = (self.currentPlayer[games] + 1) % numPlayers
+        # Skip over bankrupt players, one seat at a time
+        for i in range(numPlayers - 1):
+            skipping = np.flatnonzero(~self.alive[games * numPlayers + nextPlayer])
+            if skipping.size == 0:
+                break
+            nextPlayer[skipping] = (nextPlayer[skipping] + 1) % numPlayers
+        self.currentPlayer[games] = nextPlayer
+        self.done[games] |= self.numTurns[games] >= self.maxTurns
+
+    # TILES ----------------------------------------------------------------------------------------
+    def _move(self, slots, spaces):
+        """
+            Moves each player forward, awarding $200 to those that pass Go
+        """
+        location = self.location[slots] + spaces
+        passedGo = location >= NUM_TILES
+        self.cash[slots[passedGo]] += 200
+        self.location[slots] = location % NUM_TILES
+
+    def _goToJail(self, slots):
+        """
+            Sends each player to jail
+        """
+        self.location[slots] = JAIL_TILE
+        self.inJail[slots] = True
+
+    def _land(self, games, slots, rolled):
+        """
+            Performs the actions of the tile each player is on, and of every tile a card sends
+            them to
+
+            Parameter: rolled, the total of the dice each player rolled
+            Requires: Must be of type int numpy array
+        """
+        railFactor = np.ones(games.size, np.int64)
+        utilityFactor = np.zeros(games.size, np.int64)
+        # A card can move a player onto another card, but not more than 3 times in a row
+        for depth in range(3):
+            if games.size == 0:
+                return
+            tiles = self.location[slots]
+            self.landings += np.bincount(tiles, minlength=NUM_TILES)
+            kind = self.kind[tiles]
+
+            self._goToJail(slots[kind == GO_TO_JAIL])
+
+            tax = np.flatnonzero(kind == TAX)
+            self._charge(games[tax], slots[tax], self.tax[tiles[tax]], None)
+
+            owned = np.flatnonzero(kind <= UTILITY)
+            self._landOnProperty(games[owned], slots[owned], tiles[owned], rolled[owned],
+                                 railFactor[owned], utilityFactor[owned])
+
+            moved = np.zeros(games.size, bool)
+            railFactor = np.ones(games.size, np.int64)
+            utilityFactor = np.zeros(games.size, np.int64)
+            for cardKind, opcodes, args, index, numCards in (
+                    (CHANCE, self.chanceOpcodes, self.chanceArgs, self.chanceIndex,
+                     len(CHANCE_CARDS)),
+                    (COMMUNITY_CHEST, self.communityChestOpcodes, self.communityChestArgs,
+                     self.communityChestIndex, len(COMMUNITY_CHEST_CARDS))):
+                drawing = np.flatnonzero(kind == cardKind)
+                if drawing.size == 0:
+                    continue
+                drawGames = games[drawing]
+                cards = index[drawGames]
+                index[drawGames] = (cards + 1) % numCards
+                cardMoved, cardRail, cardUtility = self._applyCards(
+                    drawGames, slots[drawing], opcodes[cards], args[cards])
+                moved[drawing] = cardMoved
+                railFactor[drawing] = cardRail
+                utilityFactor[drawing] = cardUtility
+
+            moved = np.flatnonzero(moved)
+            games, slots, rolled = games[moved], slots[moved], rolled[moved]
+            railFactor, utilityFactor = railFactor[moved], utilityFactor[moved]
+
+    def _landOnProperty(self, games, slots, tiles, rolled, railFactor, utilityFactor):
+        """
+            Buys each unowned tile the player can afford and charges rent for each tile owned by
+            another player
+
+            Parameter: railFactor, the multiple of the normal railroad rent owed
+            Requires: Must be of type int numpy array
+
+            Parameter: utilityFactor, the multiple of the dice owed for a utility, 0 to use the
+            normal multiple
+            Requires: Must be of type int numpy array
+        """
+        tileSlots = games * TILE_STRIDE + tiles
+        players = slots - games * self.numPlayers
+        owners = self.owner[tileSlots]
+        buying = np.flatnonzero((owners == -1) & (self.price[tiles] < self.cash[slots]))
+        self.owner[tileSlots[buying]] = players[buying]
+        self.cash[slots[buying]] -= self.price[tiles[buying]]
+
+        renting = np.flatnonzero((owners >= 0) & (owners != players) & ~self.mortgaged[tileSlots])
+        if renting.size == 0:
+            return
+        games, slots, tiles, owners = games[renting], slots[renting], tiles[renting], owners[renting]
+        tileSlots, rolled = tileSlots[renting], rolled[renting]
+        railFactor, utilityFactor = railFactor[renting], utilityFactor[renting]
+
+        members = games[:, None] * TILE_STRIDE + self.groupMembers[tiles]
+        numOwned = (self.owner[members] == owners[:, None]).sum(1)
+        numHouses = self.numHouses[tileSlots]
+        rent = self.rents[tiles, numHouses]
+        kind = self.kind[tiles]
+
+        monopoly = (kind == PROPERTY) & (numOwned == self.groupSize[tiles]) & (numHouses == 0)
+        rent = np.where(monopoly, rent * 2, rent)
+        rent = np.where(kind == RAILROAD, (25 << np.maximum(numOwned - 1, 0)) * railFactor, rent)
+        utility = np.flatnonzero(kind == UTILITY)
+        if utility.size > 0:
+            utilityRent = np.where(numOwned[utility] == 2, 10, 4) * rolled[utility]
+            # A card sending the player to a utility charges 10 times a fresh roll
+            utilityRent = np.where(utilityFactor[utility] > 0, utilityFactor[utility] *
+                                   self.rng.integers(2, 13, utility.size), utilityRent)
+            rent[utility] = utilityRent
+        self._charge(games, slots, rent, games * self.numPlayers + owners)
+
+    def _applyCards(self, games, slots, opcodes, args):
+        """
+            Applies the effect of the card each player drew
+
+            Returns: A tuple of arrays (moved, railFactor, utilityFactor), moved being True for the
+            players the card moved to a new tile, and the factors being the rent multiples owed
+            on that tile
+        """
+        size = games.size
+        arg = args[:, 0]
+        location = self.location[slots]
+        railFactor = np.ones(size, np.int64)
+        utilityFactor = np.zeros(size, np.int64)
+
+        cash = opcodes == CASH
+        self.cash[slots[cash]] += arg[cash]
+
+        target = np.where(opcodes == ADVANCE, arg, -1)
+        target = np.where(opcodes == NEAREST_RAILROAD, self.nearestRailroad[location], target)
+        target = np.where(opcodes == NEAREST_UTILITY, self.nearestUtility[location], target)
+        advancing = target >= 0
+        passedGo = advancing & (target < location)
+        self.cash[slots[passedGo]] += 200
+        self.location[slots[advancing]] = target[advancing]
+        railFactor[opcodes == NEAREST_RAILROAD] = 2
+        utilityFactor[opcodes == NEAREST_UTILITY] = 10
+
+        back = opcodes == BACK
+        self.location[slots[back]] = (location[back] - arg[back]) % NUM_TILES
+
+        self._goToJail(slots[opcodes == JAIL])
+        self.jailCards[slots[opcodes == JAIL_CARD]] += 1
+
+        repairs = np.flatnonzero(opcodes == REPAIRS)
+        if repairs.size > 0:
+            rGames, rSlots = games[repairs], slots[repairs]
+            rPlayers = rSlots - rGames * self.numPlayers
+            tileSlots = rGames[:, None] * TILE_STRIDE + np.arange(NUM_TILES)
+            houses = self.numHouses[tileSlots] * (self.owner[tileSlots] == rPlayers[:, None])
+            numHotels = (houses == 5).sum(1)
+            numHouses = np.where(houses == 5, 0, houses).sum(1)
+            self.cash[rSlots] -= args[repairs, 0] * numHouses + args[repairs, 1] * numHotels
+
+        for opcode, sign in ((PAY_EACH, 1), (COLLECT_EACH, -1)):
+            each = np.flatnonzero(opcodes == opcode)
+            if each.size == 0:
+                continue
+            eGames, amount = games[each], sign * arg[each]
+            gameSlots = eGames[:, None] * self.numPlayers + np.arange(self.numPlayers)
+            alive = self.alive[gameSlots]
+            self.cash[gameSlots] += amount[:, None] * alive
+            self.cash[slots[each]] -= amount * alive.sum(1)
+
+        return advancing | back, railFactor, utilityFactor
+
+    # PAYING ---------------------------------------------------------------------------------------
+    def _charge(self, games, slots, amount, creditors):
+        """
+            Takes amount from each player and gives it to their creditor. Players that cannot pay
+            mortgage properties until they can, and become bankrupt if they still cannot
+
+            Parameter: amount, the amount each player owes
+            Requires: Must be of type int or int numpy array
+
+            Parameter: creditors, the player column index of each creditor, None if the bank is
+            owed
+            Requires: Must be of type int numpy array or None
+        """
+        if games.size == 0:
+            return
+        amount = np.broadcast_to(amount, games.shape)
+        paying = amount <= self.cash[slots]
+        self.cash[slots[paying]] -= amount[paying]
+        if creditors is not None:
+            self.cash[creditors[paying]] += amount[paying]
+        for i in np.flatnonzero(~paying):
+            creditor = None if creditors is None else int(creditors[i])
+            self._settle(int(games[i]), int(slots[i]), int(amount[i]), creditor)
+
+    def _settle(self, game, slot, amount, creditor):
+        """
+            Mortgages properties of the player in slot until they can pay amount to creditor,
+            making them bankrupt if they cannot. Rare enough to be done one game at a time
+
+            Parameter: creditor, the player column index of the creditor, None if the bank is owed
+            Requires: Must be of type int or None
+        """
+        player = slot - game * self.numPlayers
+        tiles = slice(game * TILE_STRIDE, game * TILE_STRIDE + NUM_TILES)
+        owner, mortgaged = self.owner[tiles], self.mortgaged[tiles]
+        for tile in np.flatnonzero((owner == player) & ~mortgaged):
+            if self.cash[slot] >= amount:
+                break
+            mortgaged[tile] = True
+            self.cash[slot] += self.price[tile] // 2
+
+        if self.cash[slot] >= amount:
+            self.cash[slot] -= amount
+            if creditor is not None:
+                self.cash[creditor] += amount
+            return
+
+        owned = owner == player
+        numHouses = self.numHouses[tiles]
+        proceeds = max(int(self.cash[slot]), 0)
+        proceeds += int((numHouses[owned] * self.houseCost[owned] // 2).sum())
+        numHouses[owned] = 0
+        if creditor is None:
+            owner[owned] = -1
+            mortgaged[owned] = False
+        else:
+            owner[owned] = creditor - game * self.numPlayers
+            self.cash[creditor] += proceeds
+            self.jailCards[creditor] += self.jailCards[slot]
+        self.cash[slot] = 0
+        self.jailCards[slot] = 0
+        self.inJail[slot] = False
+        self.alive[slot] = False
+        gameSlots = slice(game * self.numPlayers, (game + 1) * self.numPlayers)
+        if self.alive[gameSlots].sum() <= 1:
+            self.done[game] = True
+
+
+def runGames(numGames, numPlayers=4, seed=None, maxTurns=MAX_TURNS):
+    """
+        Plays numGames games with numPlayers players each in lockstep
+
+        Returns: A MonteCarloResult
+
+        Parameter: numGames, the number of games to play
+        Requires: Must be of type int
+
+        Parameter: numPlayers, the number of players in each game
+        Requires: Must be of type int
+
+        Parameter: seed, the seed of the dice, a random seed if None
+        Requires: Must be of type int or None
+
+        Parameter: maxTurns, the number of turns after which a game is stopped
+        Requires: Must be of type int
+    """
+    return MonteCarloEngine(numGames, numPlayers, seed, maxTurns).run()
+
+
+if __name__ == "__main__":
+    result = runGames(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
+    print(f"{len(result.turns)} games, {int(result.turns.sum())} turns in {result.seconds:.2f}s")
+    print(f"{result.gamesPerSecond():.1f} games/sec, {result.turnsPerSecond():.0f} turns/sec")
+    print(f"finished: {(result.winners >= 0).sum()}")
@@ -1,7 +1,145 @@
+from collections.abc import Mapping
+from operator import attrgetter
 from consts import *
+from state import BoardState
+
+
+def _column(name, index, kind=int, changed=None):
+    """
+        Returns a property that reads and writes the BoardState column, name, at the position
+        stored in the attribute, index
+
+        Parameter: name, the name of the column
+        Requires: Must be of type string
+
+        Parameter: index, the name of the attribute holding the position in the column
+        Requires: Must be of type string
+
+        Parameter: kind, the type values are converted to when read
+        Requires: Must be of type type
+
+        Parameter: changed, called with the object after every write, nothing is called if None
+        Requires: Must be a function with one parameter or None
+    """
+    column = attrgetter("state." + name)
+    position = attrgetter(index)
+    if kind is int:
+        def getter(self):
+            return column(self)[position(self)]
+    else:
+        def getter(self):
+            return kind(column(self)[position(self)])
+
+    def setter(self, value):
+        _write(self.state, column(self), position(self), value)
+        self.state.version += 1
+        if changed is not None:
+            changed(self)
+    return property(getter, setter)
+
+
+def _write(state, column, index, value):
+    """
+        Sets column[index] to value, recording the old value in the journal of state if it keeps
+        one
+
+        Parameter: state, the state the column belongs to
+        Requires: Must be of type BoardState
+
+        Parameter: column, the column to write
+        Requires: Must be one of the columns of state
+
+        Parameter: index, the position to write
+        Requires: Must be of type int
+
+        Parameter: value, the value to write
+        Requires: Must be of type int
+    """
+    if state.journal is not None:
+        state.journal.append((column, index, column[index]))
+    column[index] = value
+
+
+def _tileChanged(tile):
+    """
+        Updates the rents and candidates that depend on tile after its houses or mortgage changed
+
+        Parameter: tile, the tile that changed
+        Requires: Must be of type Tile
+    """
+    if tile.board is not None:
+        tile.board.candidates.pop(tile.state.owner[tile.id], None)
+        tile.board.updateRents(tile.id)
+
+
+def _tileIds(mask):
+    """
+        Yields the id of every tile in the holdings mask, mask, in increasing order
+
+        Parameter: mask, a holdings mask, bit i being set if the tile with id i is included
+        Requires: Must be of type int
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class View(Mapping):
+    __slots__ = ("_obj", "_keys", "_lookup")
+
+    def __init__(self, obj, keys):
+        """
+            Creates a read only mapping over the attributes, keys, of obj. Values are read from obj
+            every time they are looked up, so the view always reflects the current state of obj.
+
+            Parameter: obj, the object to view
+            Requires: Must be of type Tile or Player
+
+            Parameter: keys, the names of the attributes that can be looked up
+            Requires: Must be of type string tuple
+        """
+        self._obj = obj
+        self._keys = keys
+        self._lookup = frozenset(keys)
+
+    def __getitem__(self, key):
+        if key not in self._lookup:
+            raise KeyError(key)
+        return getattr(self._obj, key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
 
 
 class Tile:
+    __slots__ = ("id", "name", "price", "rents", "houseCost", "color", "state", "board")
+
+    numHouses = _column("numHouses", "id", changed=_tileChanged)
+    mortgaged = _column("mortgaged", "id", bool, _tileChanged)
+
+    @property
+    def owner(self):
+        return self.state.getPlayer(self.state.owner[self.id])
+
+    @owner.setter
+    def owner(self, newOwner):
+        state = self.state
+        oldSlot = state.owner[self.id]
+        newSlot = -1 if newOwner is None else newOwner.slot
+        _write(state, state.owner, self.id, newSlot)
+        # The holdings of the players always match the owner column
+        if oldSlot >= 0:
+            _write(state, state.holdings, oldSlot, state.holdings[oldSlot] & ~(1 << self.id))
+        if newSlot >= 0:
+            _write(state, state.holdings, newSlot, state.holdings[newSlot] | 1 << self.id)
+        state.version += 1
+        if self.board is not None:
+            self.board.updateOwner(self.id, oldSlot)
+
     # Initialization
     def __init__(self, tileId, name, price, rents, houseCost, color):
         """
@@ -24,6 +162,9 @@ class Tile:
 
             Parameter: color, the color of the tile
             Requires: Must be of type string            
+
+            The owner, number of houses, mortgage status and rent of the tile are stored in the
+            BoardState of the Board the tile is placed on
         """
         self.id = tileId
         self.name = name
@@ -31,9 +172,8 @@ class Tile:
         self.rents = rents
         self.houseCost = houseCost
         self.color = color
-        self.numHouses = 0
-        self.mortgaged = False
-        self.owner = None
+        self.state = None
+        self.board = None
 
     # Getters and Setters
     def getId(self):
@@ -45,6 +185,8 @@ class Tile:
     def toDict(self):
         """
             Returns a dictionary representation of the tile
+
+            The dictionary is a copy, use Board.getView for a live read only view
         """
         tileDict = {
             "id": self.id,
@@ -92,15 +234,69 @@ class Tile:
 
 
 class Board:
-    def __init__(self, tiles):
+    def __init__(self, tiles, state=None):
         """
             Creates a single Board object with the tiles given 
 
             Parameter: tiles, a list of the tiles on the board
             Requires: Must be of type Tile list
-        """
+
+            Parameter: state, the state storing the mutable tile information, a new state with
+            every tile unowned is created if None
+            Requires: Must be of type BoardState or None; Players that own tiles on the board
+            must be stored in the same state
+        """
+        if state is None:
+            state = BoardState(len(tiles), 0)
+        for tile in tiles:
+            tile.state = state
+            tile.board = self
+            state.tileNames[tile.id] = tile.name
+        self.state = state
         self.tiles = tiles
+        self.view = tuple(View(tile, TILE_KEYS) for tile in tiles)
         self.monopolies = {}
+        self.tilesById = {}
+        self.tileIds = {}
+        self.colorGroups = {}
+        for tile in tiles:
+            self.tilesById[tile.id] = tile
+            # Names such as Chance repeat, the first tile with the name is the one looked up
+            self.tileIds.setdefault(tile.name, tile.id)
+            self.colorGroups.setdefault(tile.color, []).append(tile.id)
+
+        # The bit of every tile in a holdings mask, by name, and the combined mask of every
+        # trade offer seen, by its tuple of names
+        self.tileMasks = {tileName: 1 << tileId for tileName, tileId in self.tileIds.items()}
+        self.offerMasks = {}
+
+        # The holdings mask of every color group, a player with all of its bits has a monopoly
+        self.groupMasks = {color: sum(1 << tileId for tileId in group)
+                           for color, group in self.colorGroups.items() if color != "white"}
+
+        # The tiles whose rent changes when each tile changes hands: its color group for
+        # properties, every railroad or utility for those, and only itself otherwise
+        self.utilities = frozenset(self.tileIds[name] for name in UTILITIES if name in self.tileIds)
+        self.railroads = frozenset(self.tileIds[name] for name in RAILROADS if name in self.tileIds)
+        self.rentGroups = {}
+        for tile in tiles:
+            if tile.id in self.utilities:
+                self.rentGroups[tile.id] = tuple(self.utilities)
+            elif tile.id in self.railroads:
+                self.rentGroups[tile.id] = tuple(self.railroads)
+            elif tile.color != "white":
+                self.rentGroups[tile.id] = tuple(self.colorGroups[tile.color])
+            else:
+                self.rentGroups[tile.id] = (tile.id,)
+        self.rentMasks = {tileId: sum(1 << memberId for memberId in group)
+                          for tileId, group in self.rentGroups.items()}
+
+        # The (buildable, sellable, mortgageable, unmortgageable) tile names of each player
+        # slot, dropped whenever one of the player's tiles changes
+        self.candidates = {}
+        self.recount()
+        for tile in tiles:
+            self.updateRents(tile.id)
 
     def toDict(self):
         """
@@ -108,6 +304,14 @@ class Board:
         """
         return list(map(Tile.toDict, self.tiles))
 
+    def getView(self):
+        """
+            Returns a tuple of read only mappings, one for each tile on the board, with the same
+            keys as Tile.toDict. The mappings read the live tiles, so the tuple never needs to be
+            rebuilt
+        """
+        return self.view
+
     def getTile(self, tileId):
         """
             Returns a dictionary representation of the tile with id, tileId
@@ -124,9 +328,7 @@ class Board:
             Parameter: tileName, the name of the tile requested
             Requires: Must be of type string
         """
-        for tile in self.tiles:
-            if tile.toDict()["name"] == tileName:
-                return tile.toDict()["id"]
+        return self.tileIds.get(tileName)
 
     def getTileObject(self, tileId):
         """
@@ -137,6 +339,15 @@ class Board:
         """
         return self._findTile(tileId)
 
+    def getColorGroup(self, color):
+        """
+            Returns a list of the ids of every tile in the color group, color
+
+            Parameter: color, the color group requested
+            Requires: Must be of type string
+        """
+        return self.colorGroups.get(color, [])
+
     def getMonopolies(self):
         """
             Returns a dictionary of color: player.name pairs where player name has a monopoly on 
@@ -151,10 +362,161 @@ class Board:
             Parameter: colorGroup, the color group of the new monopoly
             Requires: Must be of type string 
 
-            Parameter: playerName, the name of the player that has the new monopoly
-            Requires: Must be of type string
+            Parameter: playerName, the name of the player that has the new monopoly, the color
+            group has no monopoly if None
+            Requires: Must be of type string or None
         """
-        self.monopolies[colorGroup] = playerName
+        if playerName is None:
+            self.monopolies.pop(colorGroup, None)
+        else:
+            self.monopolies[colorGroup] = playerName
+
+    def getMask(self, tileNames):
+        """
+            Returns the holdings mask with the bit of every tile in tileNames set. The masks of
+            the last MASK_CACHE_SIZE different lists of names are remembered, since the same
+            trade offers are checked over and over
+
+            Parameter: tileNames, the names of the tiles to include
+            Requires: Must be an iterable of strings, each the name of a tile on the board
+        """
+        key = tuple(tileNames)
+        mask = self.offerMasks.get(key)
+        if mask is None:
+            if len(self.offerMasks) >= MASK_CACHE_SIZE:
+                self.offerMasks.clear()
+            tileMasks = self.tileMasks
+            mask = 0
+            for tileName in key:
+                mask |= tileMasks[tileName]
+            self.offerMasks[key] = mask
+        return mask
+
+    def updateOwner(self, tileId, oldSlot):
+        """
+            Updates the monopolies and rents after the tile with id, tileId, changed hands
+
+            Parameter: tileId, the id of the tile that changed hands
+            Requires: Must be of type int
+
+            Parameter: oldSlot, the slot of the previous owner, -1 if it was unowned
+            Requires: Must be of type int
+        """
+        color = self.tilesById[tileId].color
+        newSlot = self.state.owner[tileId]
+        self.candidates.pop(oldSlot, None)
+        self.candidates.pop(newSlot, None)
+        mask = self.groupMasks.get(color)
+        if mask is not None:
+            # Only the new owner can have completed the group, and any old monopoly is broken
+            if newSlot >= 0 and self.state.holdings[newSlot] & mask == mask:
+                self.setMonopoly(color, self.state.players[newSlot].name)
+            else:
+                self.setMonopoly(color, None)
+        self.updateRents(tileId)
+
+    def recount(self):
+        """
+            Rebuilds the monopolies and candidates from the columns of the state, for when the
+            columns were overwritten all at once
+        """
+        self.monopolies.clear()
+        self.candidates.clear()
+        for slot, holdings in enumerate(self.state.holdings):
+            for color, mask in self.groupMasks.items():
+                if holdings & mask == mask:
+                    self.setMonopoly(color, self.state.players[slot].name)
+
+    def getRent(self, tileId):
+        """
+            Returns the rent owed for landing on the tile with id, tileId, 0 if it takes no rent.
+            The rent of a utility is the multiple of the dice rolled
+
+            Parameter: tileId, the id of the tile requested
+            Requires: Must be of type int
+        """
+        return self.state.rent[tileId]
+
+    def updateRents(self, tileId):
+        """
+            Recomputes the rent of every tile whose rent depends on the tile with id, tileId
+
+            Parameter: tileId, the id of the tile that changed
+            Requires: Must be of type int
+        """
+        group = self.rentGroups[tileId]
+        mask = self.rentMasks[tileId]
+        state = self.state
+        for memberId in group:
+            tile = self.tilesById[memberId]
+            memberOwner = state.owner[memberId]
+            if memberOwner < 0 or tile.mortgaged:
+                rent = 0
+            else:
+                numOwned = (state.holdings[memberOwner] & mask).bit_count()
+                if memberId in self.utilities:
+                    rent = 10 if numOwned == 2 else 4
+                elif memberId in self.railroads:
+                    rent = 25 << (numOwned - 1)
+                elif tile.numHouses > 0:
+                    rent = tile.rents[tile.numHouses]
+                elif numOwned == len(group):
+                    rent = tile.rents[0] * 2
+                else:
+                    rent = tile.rents[0]
+            if state.rent[memberId] != rent:
+                _write(state, state.rent, memberId, rent)
+
+    def getCandidates(self, slot):
+        """
+            Returns a (buildable, sellable, mortgageable, unmortgageable) tuple of lists with the
+            names of the properties of the player in slot that they can build a house on, sell a
+            house from, mortgage, and unmortgage, in tile order. The lists are only worked out
+            again after one of the player's tiles changed, and must not be modified
+
+            Parameter: slot, the slot of the player requested
+            Requires: Must be of type int
+        """
+        candidates = self.candidates.get(slot)
+        if candidates is None:
+            candidates = self._findCandidates(slot)
+            self.candidates[slot] = candidates
+        return candidates
+
+    def _findCandidates(self, slot):
+        """
+            Returns the (buildable, sellable, mortgageable, unmortgageable) tuple of the player in
+            slot, see getCandidates
+
+            A house can be built on a property that is not mortgaged if the player has a monopoly
+            on its color group, and it has the fewest houses in the group and fewer than 5. A
+            house can be sold from a property with houses if it has the most houses in the group
+
+            Parameter: slot, the slot of the player requested
+            Requires: Must be of type int
+        """
+        player = self.state.players[slot]
+        fewest = {}
+        most = {}
+        for color, owner in self.monopolies.items():
+            if owner == player.name:
+                houses = [self.tilesById[tileId].numHouses for tileId in self.colorGroups[color]]
+                fewest[color] = min(houses)
+                most[color] = max(houses)
+
+        buildable, sellable, mortgageable, unmortgageable = [], [], [], []
+        for tileId in _tileIds(player.holdings):
+            tile = self.tilesById[tileId]
+            numHouses = tile.numHouses
+            if fewest.get(tile.color) == numHouses and numHouses < 5 and not tile.mortgaged:
+                buildable.append(tile.name)
+            if most.get(tile.color) == numHouses and numHouses > 0:
+                sellable.append(tile.name)
+            if tile.mortgaged:
+                unmortgageable.append(tile.name)
+            else:
+                mortgageable.append(tile.name)
+        return buildable, sellable, mortgageable, unmortgageable
 
     def _findTile(self, tileId):
         """
@@ -163,13 +525,20 @@ class Board:
             Parameter: tileId, the id of the tile requested
             Requires: Must be of type int
         """
-        for tile in self.tiles:
-            if tile.toDict()["id"] == tileId:
-                return tile
+        return self.tilesById.get(tileId)
 
 
 class Player:
-    def __init__(self, playerId, playerName, color):
+    __slots__ = ("id", "name", "color", "state", "slot", "view", "namedHoldings")
+
+    location = _column("location", "slot")
+    cash = _column("cash", "slot")
+    holdings = _column("holdings", "slot")
+    inJail = _column("inJail", "slot", bool)
+    numTurnsInJail = _column("numTurnsInJail", "slot")
+    jailCards = _column("jailCards", "slot")
+
+    def __init__(self, playerId, playerName, color, state=None, slot=0):
         """
             Creates a single Player object 
 
@@ -181,22 +550,45 @@ class Player:
 
             Parameter: color, the color of the player's piece
             Requires: Must be of type string
+
+            Parameter: state, the state storing the mutable player information, a new state for
+            just this player is created if None
+            Requires: Must be of type BoardState or None
+
+            Parameter: slot, the index of the player's columns in state
+            Requires: Must be of type int
         """
+        if state is None:
+            state, slot = BoardState(0, 1), 0
+        state.players[slot] = self
         self.id = playerId
         self.name = playerName
         self.color = color
-        self.location = 0
-        self.cash = STARTING_CASH
-        self.properties = set()
-        self.inJail = False
-        self.numTurnsInJail = 0
-        self.jailCards = 0
+        self.state = state
+        self.slot = slot
+        self.view = View(self, PLAYER_KEYS)
+        # The last (holdings, names) pair worked out by properties
+        self.namedHoldings = (0, frozenset())
+
+    @property
+    def properties(self):
+        """
+            The names of the tiles the player owns, worked out from the holdings mask
+        """
+        holdings = self.holdings
+        if self.namedHoldings[0] != holdings:
+            tileNames = self.state.tileNames
+            self.namedHoldings = (holdings, frozenset(tileNames[tileId]
+                                                      for tileId in _tileIds(holdings)))
+        return self.namedHoldings[1]
 
 #Getters and Setters
 
     def toDict(self):
         """
             Returns a dictionary representation of the player
+
+            The dictionary is a copy, use getView for a live read only view
         """
         playerDict = {
             "id": self.id,
@@ -210,6 +602,12 @@ class Player:
             "jailCards": self.jailCards
         }
         return playerDict
+
+    def getView(self):
+        """
+            Returns a read only mapping with the same keys as toDict that reads the live player
+        """
+        return self.view
 # Main Functionality
 
     def move(self, spaces):
@@ -220,8 +618,8 @@ class Player:
             Requires: Must be of type int
         """
         self.location += spaces
-        if self.location > 40:
-            self.location % 40
+        if self.location >= 40:
+            self.location %= 40
             self.cash += 200
 
     def giveCash(self, amount):
@@ -252,7 +650,8 @@ class Player:
             Parameter: board, the board the tile is on
             Requires: Must be of type Board
         """
-        self.properties.add(board.getTile(tileId)["name"])
+        self.holdings |= 1 << tileId
+        board.candidates.pop(self.slot, None)
 
     def takeProperty(self, tileId, board):
         """
@@ -264,7 +663,8 @@ class Player:
             Parameter: board, the board the tile is on
             Requires: Must be of type Board
         """
-        self.properties.discard(board.getTile(tileId)["name"])
+        self.holdings &= ~(1 << tileId)
+        board.candidates.pop(self.slot, None)
 
     def goToJail(self):
         """
@@ -346,7 +746,7 @@ class Player:
             player.takeCash(amount)
             self.giveCash(amount)
 
-    def makeRepairs(self, perHouse, perHotel):
+    def makeRepairs(self, perHouse, perHotel, board):
         """
             Pays perHouse for every house owned and perHotel for every hotel owned
 
@@ -355,12 +755,15 @@ class Player:
 
             Parameter: perHotel, the amount to pay for each hotel owned
             Requires: Must be of type int
+
+            Parameter: board, the board the player's properties are on
+            Requires: Must be of type Board
         """
         numHouses = 0
         numHotels = 0
 
-        for tileName in self.properties:
-            housesOnProperty = Board.getTile(Board.getTileId(tileName))["numHouses"]
+        for tileId in _tileIds(self.holdings):
+            housesOnProperty = board.getTileObject(tileId).numHouses
             if housesOnProperty == 5:
                 numHotels += 1
             else:
@@ -382,28 +785,9 @@ class Player:
         self.jailCards -= 1
 
 
-class Card:
-    def __init__(self, text, action):
-        """
-            Creates a single Card object with the text and action give 
+# The keys of the dictionary and view representations of a tile
+TILE_KEYS = ("id", "name", "price", "rents", "houseCost", "color", "numHouses", "mortgaged", "owner")
 
-            Parameter: text, the text on the card
-            Requires: Must be of type string 
-
-            Parameter: action, the action to be executed once the card is drawn
-            Requires: Must be of type function
-        """
-        self.text = text
-        self.action = action
-
-    def getText(self):
-        """
-            Returns the text on the card
-        """
-        return self.text
-
-    def getAction(self):
-        """
-            Returns the action to be executed if the card is drawn
-        """
-        return self.action
+# The keys of the dictionary and view representations of a player
+PLAYER_KEYS = ("id", "name", "color", "location", "cash", "properties", "inJail", "numTurnsInJail",
+               "jailCards")
@@ -0,0 +1,248 @@
+"""
+    Contains the decision policies that control automated players
+
+    A policy is asked to make every decision that the GUI would otherwise ask a person to make
+    in a window. Every decision is made for the current player of the game passed in, except bid,
+    which is asked of every player in the game.
+"""
+import numpy as np
+
+
+class Policy:
+    # DECISIONS ----------------------------------------------------------------------------------
+    def decideBuy(self, game, tile):
+        """
+            Returns True if the current player should buy tile, False if it should be auctioned.
+            Buys the tile whenever the current player can afford it
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: tile, the tile the current player landed on
+            Requires: Must be of type dict, with the keys of Tile.toDict
+        """
+        return tile["price"] < game.getCurrentPlayer()["cash"]
+
+    def decideJail(self, game):
+        """
+            Returns how the current player should try to leave jail at the start of their turn,
+            one of "pay", "card" or "roll". Uses a card if the player has one, otherwise rolls
+            for doubles
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+        """
+        return "card" if game.getCurrentPlayer()["jailCards"] > 0 else "roll"
+
+    def decideBuild(self, game):
+        """
+            Returns a list of the names of the tiles the current player should build a house on,
+            in order, before ending their turn. Never builds
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+        """
+        return []
+
+    def bid(self, game, tile, player):
+        """
+            Returns the most player is willing to pay for tile at an auction, 0 to not bid.
+            Never bids
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: tile, the tile being auctioned
+            Requires: Must be of type dict, with the keys of Tile.toDict
+
+            Parameter: player, the player bidding
+            Requires: Must be of type dict, with the keys of Player.toDict
+        """
+        return 0
+
+    def bidArray(self, prices, cash):
+        """
+            Returns a numpy array with the bid of every bidder in a batch of auctions, or None if
+            the bids must be asked for one at a time with bid. AuctionEngine tries it first, so
+            policies whose bid only depends on the price of the tile and the cash of the bidder
+            can bid in a whole batch of games with one array operation. Returns None by default
+
+            Parameter: prices, the price of the tile each bidder bids on
+            Requires: Must be of type int numpy array
+
+            Parameter: cash, the cash of each bidder
+            Requires: Must be of type int numpy array, with the shape of prices
+        """
+        return None
+
+    def decideBatch(self, decision, requests):
+        """
+            Returns a list with the result of the decision with name, decision, for every request,
+            in order. Called by Simulator.playBatch with the decisions waiting in many games at
+            once, so policies that evaluate positions with NumPy can decide a whole batch in one
+            call. Makes each decision on its own by default
+
+            Parameter: decision, the name of the decision method, "decideBuy", "decideJail",
+            "decideBuild" or "bid"
+            Requires: Must be of type string
+
+            Parameter: requests, the arguments the decision method would be called with, for
+            each decision
+            Requires: Must be of type tuple list
+        """
+        decide = getattr(self, decision)
+        return [decide(*args) for args in requests]
+
+    def raiseCash(self, game, amount):
+        """
+            Sells houses and mortgages properties of the current player until they have at least
+            amount of cash, or have nothing left to sell or mortgage
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: amount, the amount of cash the current player needs
+            Requires: Must be of type int
+        """
+        while game.getCurrentPlayer()["cash"] < amount:
+            sellable = [name for name in game.getSellable()
+                        if game.getTile(game.getTileId(name))["numHouses"] > 0]
+            if sellable != []:
+                game.sell(sellable[0])
+                continue
+            mortgageable = game.getMortgageable()
+            if mortgageable == []:
+                return
+            game.mortgage(mortgageable[0])
+
+
+class AlwaysBuyPolicy(Policy):
+    """
+        Buys every tile it lands on and bids up to the price of every tile auctioned
+    """
+
+    def decideBuy(self, game, tile):
+        """
+            Returns True, buying every tile, see Policy.decideBuy
+        """
+        return True
+
+    def bid(self, game, tile, player):
+        """
+            Returns the price of tile, see Policy.bid
+        """
+        return tile["price"]
+
+    def bidArray(self, prices, cash):
+        """
+            Returns prices, see Policy.bidArray
+        """
+        return prices
+
+
+class CashThresholdPolicy(Policy):
+    def __init__(self, reserve=200):
+        """
+            Creates a policy that buys, bids and builds only while it keeps reserve cash
+
+            Parameter: reserve, the cash the player always keeps
+            Requires: Must be of type int
+        """
+        self.reserve = reserve
+
+    def decideBuy(self, game, tile):
+        """
+            Returns True if buying tile leaves the current player at least the reserve, see
+            Policy.decideBuy
+        """
+        return game.getCurrentPlayer()["cash"] - tile["price"] >= self.reserve
+
+    def bid(self, game, tile, player):
+        """
+            Returns the most player can bid, up to the price of tile, while keeping the reserve,
+            see Policy.bid
+        """
+        return max(min(tile["price"], player["cash"] - self.reserve), 0)
+
+    def bidArray(self, prices, cash):
+        """
+            Returns the bids bid would make, see Policy.bidArray
+        """
+        return prices.clip(None, cash - self.reserve).clip(0)
+
+    def decideBuild(self, game):
+        """
+            Returns as many houses as can be built evenly while keeping the reserve, see
+            Policy.decideBuild
+        """
+        return planBuilds(game, game.getCurrentPlayer()["cash"] - self.reserve)
+
+    def decideBatch(self, decision, requests):
+        """
+            Decides every buy and bid in requests with one array comparison, reading cash
+            straight from each game's columns rather than from player dictionaries, see
+            Policy.decideBatch. Builds are planned, and jail decided, one game at a time
+        """
+        if decision == "decideBuy":
+            prices = np.fromiter((tile["price"] for game, tile in requests), np.int64,
+                                 len(requests))
+            cash = np.fromiter((game.state.cash[game.currentPlayer.slot]
+                                for game, tile in requests), np.int64, len(requests))
+            return (cash - prices >= self.reserve).tolist()
+        if decision == "bid":
+            prices = np.fromiter((tile["price"] for game, tile, player in requests), np.int64,
+                                 len(requests))
+            cash = np.fromiter((player["cash"] for game, tile, player in requests), np.int64,
+                               len(requests))
+            return self.bidArray(prices, cash).tolist()
+        if decision == "decideBuild":
+            return [planBuilds(game, game.state.cash[game.currentPlayer.slot] - self.reserve)
+                    for (game,) in requests]
+        return super().decideBatch(decision, requests)
+
+
+class BuildMaxPolicy(Policy):
+    """
+        Builds every house it can afford at the end of every turn
+    """
+
+    def decideBuild(self, game):
+        """
+            Returns as many houses as the current player can afford to build evenly, see
+            Policy.decideBuild
+        """
+        return planBuilds(game, game.getCurrentPlayer()["cash"])
+
+
+def planBuilds(game, budget):
+    """
+        Returns a list of the names of the tiles the current player can build on, in order,
+        spending at most budget and following the build evenly rule. Each house goes on the
+        first tile with the fewest houses in its color group, cheapest groups first
+
+        Parameter: game, the game being played
+        Requires: Must be of type Game
+
+        Parameter: budget, the most the houses may cost together
+        Requires: Must be of type int
+    """
+    groups = {}
+    for tileName in game.getBuildable():
+        tile = game.getTile(game.getTileId(tileName))
+        if tile["color"] not in groups:
+            groups[tile["color"]] = [game.getTile(tileId)
+                                     for tileId in game.boardSpec.colorGroups[tile["color"]]]
+    houses = {tile["name"]: tile["numHouses"] for group in groups.values() for tile in group}
+
+    plan = []
+    for group in sorted(groups.values(), key=lambda group: group[0]["houseCost"]):
+        while True:
+            fewest = min(houses[tile["name"]] for tile in group)
+            tile = next((tile for tile in group if houses[tile["name"]] == fewest and
+                         not tile["mortgaged"]), None)
+            if tile is None or fewest >= 5 or tile["houseCost"] > budget:
+                break
+            plan.append(tile["name"])
+            houses[tile["name"]] += 1
+            budget -= tile["houseCost"]
+    return plan
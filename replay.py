@@ -0,0 +1,172 @@
+"""
+    Rebuilds games from a seed and the sequence of actions taken in them
+
+    A Replay records every call to a Game method that changes the game, by name and arguments.
+    Since all randomness in a game comes from its seeded Dice, replaying the actions on a new game
+    with the same seed and players rebuilds it exactly. Every checkpointInterval turns the game is
+    saved with savegame, so rebuilding the game at turn N loads the nearest checkpoint and only
+    replays the actions taken since.
+"""
+import json
+import savegame
+from dice import Dice
+from game import Game
+
+# The number of turns between checkpoints
+CHECKPOINT_INTERVAL = 50
+
+# The Game methods that change the game, the action vocabulary of a Replay
+ACTIONS = frozenset(("roll", "buy", "build", "sell", "trade", "mortgage", "unmortgage", "auction",
+                     "quit", "payJail", "rollJail", "cardJail", "endTurn", "payDebt",
+                     "bankrupt", "shuffleDecks"))
+
+
+class Replay:
+    def __init__(self, players, seed, checkpointInterval=CHECKPOINT_INTERVAL):
+        """
+            Creates an empty Replay of a game between players, rolling dice seeded with seed
+
+            Parameter: players, a list of tuples with the player information (id,name,color)
+            Requires: Must be of type (int, string, string) list
+
+            Parameter: seed, the seed of the game's dice
+            Requires: Must be of type int, from 0 to 2**64 - 1
+
+            Parameter: checkpointInterval, the number of turns between checkpoints
+            Requires: Must be of type int, greater than 0
+        """
+        self.players = [tuple(player) for player in players]
+        self.seed = seed
+        self.checkpointInterval = checkpointInterval
+        self.actions = []
+        # The index in actions of the first action of each turn
+        self.turnStarts = [0]
+        # A save of the game at the start of every checkpointInterval-th turn
+        self.checkpoints = [savegame.dumps(self.newGame())]
+
+    def __len__(self):
+        return len(self.actions)
+
+    def getNumTurns(self):
+        """
+            Returns the number of turns started, counting the first
+        """
+        return len(self.turnStarts)
+
+    def newGame(self):
+        """
+            Returns a new game with the players and seed of this replay, in the state before
+            the first action
+        """
+        return Game(self.players, Dice(self.seed))
+
+    def record(self, game, name, *args):
+        """
+            Calls the method of game with name, name, with args, and appends the action to the
+            replay, returning what the method returns
+
+            Parameter: game, the game the replay is recorded from
+            Requires: Must be of type Game, made by newGame, with every action taken on it so far
+            recorded
+
+            Parameter: name, the name of the method
+            Requires: Must be in ACTIONS
+
+            Parameter: args, the arguments of the method
+            Requires: Must be JSON serializable
+        """
+        hadRolled = game.hasRolled
+        result = getattr(game, name)(*args)
+        self.actions.append((name,) + args)
+        if name in ("quit", "bankrupt") or (name == "endTurn" and hadRolled):
+            self.turnStarts.append(len(self.actions))
+            if (len(self.turnStarts) - 1) % self.checkpointInterval == 0:
+                self.checkpoints.append(savegame.dumps(game))
+        return result
+
+    def recording(self, game):
+        """
+            Returns a RecordingGame that records every action taken through it on game
+
+            Parameter: game, the game to record
+            Requires: Must be of type Game, made by newGame, with no actions taken yet
+        """
+        return RecordingGame(self, game)
+
+    def gameAt(self, turn, game=None):
+        """
+            Returns the game as it was at the start of turn, turn, loading the nearest checkpoint
+            before it and replaying the actions taken since. Events are not recorded while the
+            actions are replayed
+
+            Parameter: turn, the turn to rebuild, counting from 0
+            Requires: Must be of type int, from 0 to self.getNumTurns() - 1
+
+            Parameter: game, a game to rebuild into, a new game if None
+            Requires: Must be of type Game with the players of this replay, or None
+        """
+        if not 0 <= turn < len(self.turnStarts):
+            raise IndexError(f"turn {turn} has not been played")
+        if game is None:
+            game = self.newGame()
+        checkpoint = min(turn // self.checkpointInterval, len(self.checkpoints) - 1)
+        savegame.loads(game, self.checkpoints[checkpoint])
+
+        enabled = game.events.enabled
+        game.events.enabled = False
+        start = self.turnStarts[checkpoint * self.checkpointInterval]
+        for action in self.actions[start:self.turnStarts[turn]]:
+            getattr(game, action[0])(*action[1:])
+        game.events.enabled = enabled
+        return game
+
+    def save(self, path):
+        """
+            Writes the players, seed and actions of this replay to path as JSON. Checkpoints are
+            not written, load makes them again
+
+            Parameter: path, the path of the file to write
+            Requires: Must be of type string
+        """
+        with open(path, "w") as replayFile:
+            json.dump({"players": self.players, "seed": self.seed,
+                       "checkpointInterval": self.checkpointInterval,
+                       "actions": self.actions}, replayFile)
+
+
+def load(path):
+    """
+        Returns the Replay saved at path, replaying every action once to make its checkpoints
+
+        Parameter: path, the path of a file written by Replay.save
+        Requires: Must be of type string
+    """
+    with open(path) as replayFile:
+        data = json.load(replayFile)
+    replay = Replay(data["players"], data["seed"], data["checkpointInterval"])
+    game = replay.newGame()
+    game.events.enabled = False
+    for action in data["actions"]:
+        replay.record(game, *action)
+    return replay
+
+
+class RecordingGame:
+    def __init__(self, replay, game):
+        """
+            Creates a stand in for game that records every action taken through it in replay,
+            so anything that plays a Game, such as a Simulator, can be recorded
+
+            Parameter: replay, the replay to record in
+            Requires: Must be of type Replay
+
+            Parameter: game, the game being recorded
+            Requires: Must be of type Game, made by replay.newGame
+        """
+        self.replay = replay
+        self.game = game
+
+    def __getattr__(self, name):
+        if name in ACTIONS:
+            return lambda *args: self.replay.record(self.game, name, *args)
+        return getattr(self.game, name)
@@ -0,0 +1,251 @@
+"""
+    Saves and loads the full state of a Game in a compact, versioned binary format
+
+    A save is a fixed size record: a turn record packed with struct, the order of both card decks,
+    and every column of the game's BoardState, so the tiles and players are fixed size records
+    laid out by column.
+    Every save of a game with the same number of tiles and players has the same size, so a
+    SaveFile can memory map millions of them and read or write any one of them directly. Columns
+    are stored in the byte order of the machine, which is little endian on every supported
+    platform.
+"""
+import mmap
+import struct
+from state import COLUMNS
+
+# The version of the format, stored in every record and file
+FORMAT_VERSION = 2
+
+# The first bytes of a save file
+MAGIC = b"MNPL"
+
+# The header of a save file: magic, format version, number of tiles, number of players, number
+# of records
+FILE_HEADER = struct.Struct("<4sHHHQ")
+
+# The turn record: format version, current player slot, mask of the slots of the players left,
+# chance and community chest deck positions, total rolled, doubles rolled, whether the current
+# player has rolled, slot of the creditor of the pending debt (-1 for the bank, -2 for no debt),
+# amount of the debt, and the dice seed, block, index and carried face (0 for none)
+TURN = struct.Struct("<HbHBBBB?biQIHB")
+
+# The creditor stored when there is no pending debt
+NO_DEBT = -2
+
+
+def recordSize(game):
+    """
+        Returns the number of bytes in a save of game
+
+        Parameter: game, the game to measure
+        Requires: Must be of type Game
+    """
+    state = game.state
+    return (TURN.size + len(game.chanceOrder) + len(game.communityChestOrder) +
+            sum(len(getattr(state, name)) * getattr(state, name).itemsize for name in COLUMNS))
+
+
+def packInto(game, buffer, offset=0):
+    """
+        Writes a save of game into buffer at offset
+
+        Parameter: game, the game to save
+        Requires: Must be of type Game
+
+        Parameter: buffer, the buffer to write to
+        Requires: Must be a writable buffer, with at least recordSize(game) bytes after offset
+
+        Parameter: offset, the position in buffer to write at
+        Requires: Must be of type int
+    """
+    if game.pendingDebt is None:
+        creditor, amount = NO_DEBT, 0
+    else:
+        creditor = -1 if game.pendingDebt[0] is None else game.pendingDebt[0].slot
+        amount = game.pendingDebt[1]
+    seed, block, carried, index = game.dice.getState()
+    TURN.pack_into(buffer, offset, FORMAT_VERSION, game.currentPlayer.slot,
+                   sum(1 << player.slot for player in game.players), game.currentChanceIndex,
+                   game.currentCommunityChestIndex, game.numRolled, game.numDoublesRolled,
+                   game.hasRolled, creditor, amount, seed, block, index, carried[0] if carried else 0)
+
+    position = offset + TURN.size
+    for order in (game.chanceOrder, game.communityChestOrder):
+        buffer[position:position + len(order)] = order
+        position += len(order)
+    for name in COLUMNS:
+        with memoryview(getattr(game.state, name)).cast("B") as column:
+            buffer[position:position + len(column)] = column
+            position += len(column)
+
+
+def unpackFrom(game, buffer, offset=0):
+    """
+        Puts game in the state saved in buffer at offset. The game must have the same players as
+        the game that was saved, in the same order
+
+        Parameter: game, the game to load into
+        Requires: Must be of type Game
+
+        Parameter: buffer, the buffer to read from
+        Requires: Must be a buffer, with a save of a game like game at offset
+
+        Parameter: offset, the position of the save in buffer
+        Requires: Must be of type int
+    """
+    (version, current, playersLeft, chanceIndex, communityChestIndex, numRolled, numDoublesRolled,
+     hasRolled, creditor, amount, seed, block, index, carried) = TURN.unpack_from(buffer, offset)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Cannot load a save with format version {version}")
+
+    state = game.state
+    state.journal = None
+    position = offset + TURN.size
+    game.chanceOrder = bytes(buffer[position:position + len(game.chanceOrder)])
+    position += len(game.chanceOrder)
+    game.communityChestOrder = bytes(buffer[position:position + len(game.communityChestOrder)])
+    position += len(game.communityChestOrder)
+    for name in COLUMNS:
+        with memoryview(getattr(state, name)).cast("B") as column:
+            column[:] = buffer[position:position + len(column)]
+            position += len(column)
+    state.version += 1
+
+    game.players = [player for player in state.players if playersLeft >> player.slot & 1]
+    game.currentPlayer = state.players[current]
+    game.currentChanceIndex = chanceIndex
+    game.currentCommunityChestIndex = communityChestIndex
+    game.numRolled = numRolled
+    game.numDoublesRolled = numDoublesRolled
+    game.hasRolled = hasRolled
+    if creditor == NO_DEBT:
+        game.pendingDebt = None
+    else:
+        game.pendingDebt = (state.getPlayer(creditor), amount)
+    game.dice.setState((seed, block, bytes([carried]) if carried else b"", index))
+    game.board.recount()
+
+
+def dumps(game):
+    """
+        Returns a save of game as bytes
+
+        Parameter: game, the game to save
+        Requires: Must be of type Game
+    """
+    buffer = bytearray(recordSize(game))
+    packInto(game, buffer)
+    return bytes(buffer)
+
+
+def loads(game, data):
+    """
+        Puts game in the state saved in data, see unpackFrom
+
+        Parameter: game, the game to load into
+        Requires: Must be of type Game
+
+        Parameter: data, a save returned by dumps
+        Requires: Must be of type bytes
+    """
+    if len(data) != recordSize(game):
+        raise ValueError(f"A save of this game has {recordSize(game)} bytes, not {len(data)}")
+    unpackFrom(game, data)
+
+
+def createSaveFile(path, game, numRecords):
+    """
+        Creates a save file at path with room for numRecords saves of games like game, every
+        record zeroed, and returns it opened as a SaveFile
+
+        Parameter: path, the path of the file to create, overwritten if it exists
+        Requires: Must be of type string
+
+        Parameter: game, a game with the number of tiles and players of the games to save
+        Requires: Must be of type Game
+
+        Parameter: numRecords, the number of saves the file holds
+        Requires: Must be of type int
+    """
+    with open(path, "wb") as saveFile:
+        saveFile.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, len(game.state.owner),
+                                        len(game.state.cash), numRecords))
+        saveFile.truncate(FILE_HEADER.size + numRecords * recordSize(game))
+    return SaveFile(path)
+
+
+class SaveFile:
+    def __init__(self, path):
+        """
+            Opens the save file at path, memory mapping it so saves are read and written in place
+
+            Parameter: path, the path of the file
+            Requires: Must be of type string; must be a file made by createSaveFile
+        """
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, self.numTiles, self.numPlayers, self.numRecords = \
+            FILE_HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a save file with format version {FORMAT_VERSION}")
+        self.recordSize = None
+
+    def __len__(self):
+        return self.numRecords
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
+
+    def write(self, index, game):
+        """
+            Saves game as the record with index, index
+
+            Parameter: index, the index of the record
+            Requires: Must be of type int, from 0 to len(self) - 1
+
+            Parameter: game, the game to save
+            Requires: Must be of type Game, with the number of tiles and players of the file
+        """
+        packInto(game, self.map, self._offset(index, game))
+
+    def read(self, index, game):
+        """
+            Puts game in the state saved in the record with index, index
+
+            Parameter: index, the index of the record
+            Requires: Must be of type int, from 0 to len(self) - 1, a record that was written
+
+            Parameter: game, the game to load into
+            Requires: Must be of type Game, with the players of the saved game
+        """
+        unpackFrom(game, self.map, self._offset(index, game))
+
+    def close(self):
+        """
+            Flushes and closes the file
+        """
+        self.map.close()
+        self.file.close()
+
+    def _offset(self, index, game):
+        """
+            Returns the position of the record with index, index, checking that game fits the file
+
+            Parameter: index, the index of the record
+            Requires: Must be of type int
+
+            Parameter: game, the game being saved or loaded
+            Requires: Must be of type Game
+        """
+        if self.recordSize is None:
+            if (len(game.state.owner), len(game.state.cash)) != (self.numTiles, self.numPlayers):
+                raise ValueError(f"The file holds games with {self.numTiles} tiles and "
+                                 f"{self.numPlayers} players")
+            self.recordSize = recordSize(game)
+        if not 0 <= index < self.numRecords:
+            raise IndexError(f"record {index} is out of range")
+        return FILE_HEADER.size + index * self.recordSize
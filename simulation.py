@@ -0,0 +1,426 @@
+"""
+    Plays complete games of Monopoly without the GUI
+
+    Every decision the GUI would open a window for is instead passed to the Policy of the player
+    making it. Run `python simulation.py 100` to play 100 four player games and print the
+    throughput.
+"""
+import sys
+import time
+from auction import AuctionEngine, SEALED
+from game import *
+from policies import Policy
+
+# The number of turns after which an unfinished game is stopped without a winner
+MAX_TURNS = 1000
+
+
+class GameResult:
+    def __init__(self, winner, turns):
+        """
+            Creates the result of a single simulated game
+
+            Parameter: winner, the name of the winning player, None if the game was stopped
+            Requires: Must be of type string or None
+
+            Parameter: turns, the number of turns played
+            Requires: Must be of type int
+        """
+        self.winner = winner
+        self.turns = turns
+
+
+class BatchResult:
+    def __init__(self, results, seconds):
+        """
+            Creates the summary of a batch of simulated games
+
+            Parameter: results, the result of every game in the batch
+            Requires: Must be of type GameResult list
+
+            Parameter: seconds, the wall clock time it took to play the batch
+            Requires: Must be of type float
+        """
+        self.results = results
+        self.seconds = seconds
+        self.games = len(results)
+        self.turns = sum(result.turns for result in results)
+        self.wins = {}
+        for result in results:
+            self.wins[result.winner] = self.wins.get(result.winner, 0) + 1
+
+    def gamesPerSecond(self):
+        """
+            Returns the number of games played per second
+        """
+        return self.games / self.seconds
+
+    def turnsPerSecond(self):
+        """
+            Returns the number of turns played per second
+        """
+        return self.turns / self.seconds
+
+
+class Simulator:
+    def __init__(self, maxTurns=MAX_TURNS, auctionMode=SEALED):
+        """
+            Creates a Simulator that stops games after maxTurns turns
+
+            Parameter: maxTurns, the number of turns after which a game is stopped
+            Requires: Must be of type int
+
+            Parameter: auctionMode, the kind of auction tiles no one buys go to, see auction.py
+            Requires: Must be SEALED or ENGLISH
+        """
+        self.maxTurns = maxTurns
+        self.auctions = AuctionEngine(auctionMode)
+        self.policies = {}
+        self._handlers = {
+            "Buy": self._buy,
+            "Jail": self._jail,
+            "Bankruptcy Player": self._debt,
+            "Bankruptcy Bank": self._debt,
+        }
+
+    def play(self, game, policies):
+        """
+            Plays game until one player is left or maxTurns turns have been played
+
+            Returns: A GameResult
+
+            Parameter: game, the game to play
+            Requires: Must be of type Game
+
+            Parameter: policies, the policy making the decisions of each player, by player id
+            Requires: Must be of type dict with int keys and Policy values
+        """
+        self.policies = policies
+        return self._run(self.steps(game))
+
+    def resume(self, game, policies, decision, args, answer):
+        """
+            Plays game on from a decision it is waiting on as if the policy asked had answered
+            answer, until one player is left or maxTurns more turns have been played. Searches
+            such as MCTSPolicy use it to try each answer to a decision on the game itself
+
+            Returns: A GameResult
+
+            Parameter: game, the game to play
+            Requires: Must be of type Game, waiting on the decision
+
+            Parameter: policies, the policy making the decisions of each player, by player id
+            Requires: Must be of type dict with int keys and Policy values
+
+            Parameter: decision, the name of the decision, "decideBuy", "decideJail",
+            "decideBuild" or "bid"
+            Requires: Must be of type string
+
+            Parameter: args, the arguments the decision method was called with
+            Requires: Must be of type tuple
+
+            Parameter: answer, the answer to the decision
+            Requires: Must be a valid result of the decision method
+        """
+        self.policies = policies
+        return self._run(self._resumeSteps(game, decision, args, answer))
+
+    def playBatch(self, games, policies):
+        """
+            Plays every game in games at once, until each has one player left or has lasted
+            maxTurns turns. The games are advanced together, and the decisions they wait on are
+            passed to each policy's decideBatch in one call per policy and kind of decision
+
+            Returns: A list of the GameResult of each game
+
+            Parameter: games, the games to play
+            Requires: Must be of type Game list
+
+            Parameter: policies, the policy making the decisions of each player, by player id
+            Requires: Must be of type dict with int keys and Policy values
+        """
+        self.policies = policies
+        results = [None] * len(games)
+        running = {index: self.steps(game) for index, game in enumerate(games)}
+        answers = {}
+        while running:
+            requests = {}
+            for index, steps in list(running.items()):
+                try:
+                    policy, decision, args = steps.send(answers.get(index))
+                except StopIteration as stop:
+                    results[index] = stop.value
+                    del running[index]
+                    continue
+                requests.setdefault((policy, decision), []).append((index, args))
+
+            answers = {}
+            for (policy, decision), batch in requests.items():
+                decisions = policy.decideBatch(decision, [args for index, args in batch])
+                for (index, args), answer in zip(batch, decisions):
+                    answers[index] = answer
+        return results
+
+    def steps(self, game):
+        """
+            Returns a generator playing game, see play. Every time a policy must decide something
+            the generator yields a (policy, decision, args) tuple, and carries on once it is
+            sent the result of calling the method of policy with name, decision, with args.
+            Auctions are yielded with the AuctionEngine of the Simulator in place of a policy.
+            The GameResult is the value the generator returns
+
+            Parameter: game, the game to play
+            Requires: Must be of type Game
+        """
+        turns = 0
+        # A game loaded from a save taken while the current player owed more than they had,
+        # such as one from the GUI, settles the debt before play goes on
+        if game.getPendingDebt() is not None:
+            yield from self._debt(game, None)
+        while not game.isOver() and turns < self.maxTurns:
+            player = game.getCurrentPlayerView()
+            playerId = player["id"]
+            while not game.hasRolled and not game.isOver() and player["id"] == playerId:
+                if player["inJail"]:
+                    yield from self._jail(game, ("Jail", "Began Turn"))
+                else:
+                    yield from self._dispatch(game, game.roll())
+                player = game.getCurrentPlayerView()
+            turns += 1
+            if game.isOver() or player["id"] != playerId:
+                continue
+            tileNames = yield (self._policy(game), "decideBuild", (game,))
+            yield from self._endTurn(game, tileNames)
+
+        winner = game.getPlayersView()[0]["name"] if game.isOver() else None
+        return GameResult(winner, turns)
+
+    # HELPERS ------------------------------------------------------------------------------------
+    def _run(self, steps):
+        """
+            Runs steps to the end, calling the policy method every step asks for
+
+            Returns: The value steps returns
+
+            Parameter: steps, the generator to run
+            Requires: Must be a generator like the one returned by steps
+        """
+        try:
+            policy, decision, args = next(steps)
+            while True:
+                policy, decision, args = steps.send(getattr(policy, decision)(*args))
+        except StopIteration as stop:
+            return stop.value
+
+    def _resumeSteps(self, game, decision, args, answer):
+        """
+            Returns a generator like steps that first carries out answer to a decision game is
+            waiting on, see resume
+        """
+        if decision == "decideBuy":
+            yield from self._settleBuy(game, args[1], answer)
+        elif decision == "decideJail":
+            yield from self._leaveJail(game, answer)
+        elif decision == "decideBuild":
+            yield from self._endTurn(game, answer)
+        else:
+            yield from self._auction(game, args[1], {args[2]["id"]: answer})
+        return (yield from self.steps(game))
+
+    def _policy(self, game):
+        """
+            Returns the policy of the current player
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+        """
+        return self.policies[game.getCurrentPlayerView()["id"]]
+
+    def _dispatch(self, game, logs):
+        """
+            Performs the decision associated with each log in logs. Logs that do not need a
+            decision are ignored
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: logs, the logs returned by a Game method
+            Requires: Must be of type (string, string) list or None
+        """
+        if logs is None:
+            return
+        for log in logs:
+            handler = self._handlers.get(log[0])
+            if handler is not None:
+                yield from handler(game, log)
+
+    def _buy(self, game, log):
+        """
+            Asks the current player's policy whether to buy the tile they are on, auctioning it
+            if they decline or cannot pay
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: log, the Buy log
+            Requires: Must be of type (string, string)
+        """
+        tile = game.getTile(game.getCurrentPlayerView()["location"])
+        buy = yield (self._policy(game), "decideBuy", (game, tile))
+        yield from self._settleBuy(game, tile, buy)
+
+    def _settleBuy(self, game, tile, buy):
+        """
+            Buys tile for the current player if buy is True, auctioning it if buy is False or
+            they cannot pay
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: tile, the tile the current player is on
+            Requires: Must be of type dict
+
+            Parameter: buy, the answer of the current player's policy to decideBuy
+            Requires: Must be of type bool
+        """
+        if buy and game.buy()[0][0] == "Buy Success":
+            return
+        yield from self._auction(game, tile)
+
+    def _auction(self, game, tile, bids=None):
+        """
+            Has the auction engine auction tile between every player, asking their policies for
+            their valuations. The tile stays with the bank if no one bids
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: tile, the tile being auctioned
+            Requires: Must be of type dict
+
+            Parameter: bids, valuations already made, by player id, which are not asked for again
+            Requires: Must be of type dict with int keys and int values, or None
+        """
+        yield (self.auctions, "auction", (game, tile, self.policies, bids))
+
+    def _jail(self, game, log):
+        """
+            Asks the current player's policy how to leave jail, rolling for doubles if the chosen
+            way fails
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: log, the Jail log
+            Requires: Must be of type (string, string)
+        """
+        choice = yield (self._policy(game), "decideJail", (game,))
+        yield from self._leaveJail(game, choice)
+
+    def _leaveJail(self, game, choice):
+        """
+            Has the current player try to leave jail the way choice names, rolling for doubles if
+            it fails
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: choice, the answer of the current player's policy to decideJail
+            Requires: Must be "pay", "card" or "roll"
+        """
+        if choice == "pay":
+            logs = game.payJail()
+        elif choice == "card":
+            logs = game.cardJail()
+        else:
+            logs = game.rollJail()
+        if game.getCurrentPlayerView()["inJail"] and not game.hasRolled:
+            logs = logs + game.rollJail()
+        yield from self._dispatch(game, logs)
+
+    def _endTurn(self, game, tileNames):
+        """
+            Builds a house on every tile in tileNames, in order, and ends the current player's
+            turn
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: tileNames, the answer of the current player's policy to decideBuild
+            Requires: Must be of type string list
+        """
+        for tileName in tileNames:
+            yield from self._dispatch(game, game.build(tileName))
+        yield from self._dispatch(game, game.endTurn())
+
+    def _debt(self, game, log):
+        """
+            Has the current player's policy raise cash to pay the debt they could not pay, making
+            the player bankrupt if they still cannot pay it
+
+            Parameter: game, the game being played
+            Requires: Must be of type Game
+
+            Parameter: log, the Bankruptcy Player or Bankruptcy Bank log, None for a debt the
+            game was loaded with
+            Requires: Must be of type (string, string) or None
+        """
+        self._policy(game).raiseCash(game, game.getPendingDebt()[1])
+        logs = game.payDebt()
+        if logs[0][0] in ("Bankruptcy Player", "Bankruptcy Bank"):
+            logs = game.bankrupt()
+        yield from self._dispatch(game, logs)
+
+
+def runGames(numGames, numPlayers=4, policies=None, maxTurns=MAX_TURNS, batchSize=1,
+             auctionMode=SEALED):
+    """
+        Plays numGames games with numPlayers players each
+
+        Returns: A BatchResult
+
+        Parameter: numGames, the number of games to play
+        Requires: Must be of type int
+
+        Parameter: numPlayers, the number of players in each game
+        Requires: Must be of type int
+
+        Parameter: policies, the policy of each player, in player order. Every player uses the
+        default Policy if None
+        Requires: Must be of type Policy list or None
+
+        Parameter: maxTurns, the number of turns after which a game is stopped
+        Requires: Must be of type int
+
+        Parameter: batchSize, the number of games played at once with Simulator.playBatch, 1 to
+        play the games one at a time
+        Requires: Must be of type int, greater than 0
+
+        Parameter: auctionMode, the kind of auction tiles no one buys go to, see auction.py
+        Requires: Must be SEALED or ENGLISH
+    """
+    if policies is None:
+        policies = [Policy()] * numPlayers
+    players = [(i, f"Player {i}", "red") for i in range(1, numPlayers + 1)]
+    policyById = {player[0]: policy for player, policy in zip(players, policies)}
+    simulator = Simulator(maxTurns, auctionMode)
+    pool = GamePool(batchSize)
+
+    start = time.perf_counter()
+    results = []
+    for first in range(0, numGames, batchSize):
+        games = [pool.acquire(players) for i in range(min(batchSize, numGames - first))]
+        if batchSize == 1:
+            results.append(simulator.play(games[0], policyById))
+        else:
+            results += simulator.playBatch(games, policyById)
+        for game in games:
+            pool.release(game)
+    return BatchResult(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    batch = runGames(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
+    print(f"{batch.games} games, {batch.turns} turns in {batch.seconds:.2f}s")
+    print(f"{batch.gamesPerSecond():.1f} games/sec, {batch.turnsPerSecond():.0f} turns/sec")
+    print(f"wins: {batch.wins}")
@@ -0,0 +1,106 @@
+"""
+    Contains the compact, column based storage for the mutable state of a game
+
+    Tile and Player objects hold no mutable state of their own, they read and write the columns
+    of a BoardState at their tile id or player slot.
+"""
+from array import array
+from consts import STARTING_CASH
+
+
+class BoardState:
+    def __init__(self, numTiles, numPlayers):
+        """
+            Creates a BoardState with room for numTiles tiles and numPlayers players, every tile
+            unowned with no houses and every player at Go with the starting cash
+
+            Parameter: numTiles, the number of tiles on the board
+            Requires: Must be of type int
+
+            Parameter: numPlayers, the number of players in the game
+            Requires: Must be of type int
+        """
+        # Tile columns, indexed by tile id. An owner of -1 means the tile is unowned
+        self.owner = array("b", [-1]) * numTiles
+        self.numHouses = array("b", bytes(numTiles))
+        self.mortgaged = array("b", bytes(numTiles))
+        # The rent owed for landing on each tile, kept up to date by the Board. For utilities it
+        # is the multiple of the dice rolled, and it is 0 for tiles that take no rent
+        self.rent = array("i", [0]) * numTiles
+
+        # Player columns, indexed by player slot. Bit i of holdings is set if the player owns
+        # the tile with id i, so boards are limited to 63 tiles
+        self.cash = array("i", [STARTING_CASH]) * numPlayers
+        self.holdings = array("q", [0]) * numPlayers
+        self.location = array("b", bytes(numPlayers))
+        self.inJail = array("b", bytes(numPlayers))
+        self.numTurnsInJail = array("b", bytes(numPlayers))
+        self.jailCards = array("b", bytes(numPlayers))
+
+        # The Player object in each slot, used to turn an owner column entry back into a Player
+        self.players = [None] * numPlayers
+
+        # The name of each tile, set by the Board, used to turn holdings back into names
+        self.tileNames = [None] * numTiles
+
+        # Incremented on every change, so readers can skip work when nothing has changed
+        self.version = 0
+
+        # The (column, index, old value) of every write to a column since the journal was
+        # started, None when no journal is kept
+        self.journal = None
+
+    def copy(self):
+        """
+            Returns a new BoardState with a copy of every column. The copy shares the Player
+            objects of this state, so it is meant to be restored with copyFrom rather than used
+            on its own
+        """
+        result = BoardState.__new__(BoardState)
+        for column in COLUMNS:
+            setattr(result, column, array(getattr(self, column).typecode, getattr(self, column)))
+        result.players = self.players
+        result.tileNames = self.tileNames
+        result.version = self.version
+        result.journal = None
+        return result
+
+    def copyFrom(self, other):
+        """
+            Overwrites every column of this state with the columns of other, in place so every
+            Tile and Player viewing this state sees the change
+
+            Parameter: other, the state to copy
+            Requires: Must be of type BoardState with the same number of tiles and players
+        """
+        for column in COLUMNS:
+            getattr(self, column)[:] = getattr(other, column)
+        self.version += 1
+
+    def rollback(self, length):
+        """
+            Undoes every write recorded in the journal after its first length writes, newest
+            first, leaving the first length writes in the journal
+
+            Parameter: length, the length of the journal to roll back to
+            Requires: Must be of type int; the journal must be started and at least this long
+        """
+        journal = self.journal
+        while len(journal) > length:
+            column, index, value = journal.pop()
+            column[index] = value
+        self.version += 1
+
+    def getPlayer(self, slot):
+        """
+            Returns the Player object in slot, None if slot is -1
+
+            Parameter: slot, the slot of the player requested
+            Requires: Must be of type int
+        """
+        return None if slot < 0 else self.players[slot]
+
+
+# The names of every column in a BoardState
+COLUMNS = ("owner", "numHouses", "mortgaged", "rent", "cash", "holdings", "location", "inJail",
+           "numTurnsInJail", "jailCards")
@@ -0,0 +1,140 @@
+"""
+    Plays batches of headless games across every core with a process pool
+
+    Each game is seeded from the master seed and its index alone, so the results of a tournament
+    are the same whatever the number of workers or the size of the chunks. Run
+    `python tournament.py 1000` to play 1000 four player games on every core.
+"""
+import hashlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from game import *
+from policies import Policy
+from simulation import BatchResult, GameResult, MAX_TURNS, Simulator
+
+# The number of games each worker plays per task, large enough that sending the task and its
+# results costs little next to playing it
+CHUNK_SIZE = 25
+
+
+def gameSeed(masterSeed, gameIndex):
+    """
+        Returns the seed of the game with index gameIndex in a tournament seeded with masterSeed
+
+        Parameter: masterSeed, the seed of the tournament
+        Requires: Must be of type int
+
+        Parameter: gameIndex, the index of the game in the tournament
+        Requires: Must be of type int
+    """
+    digest = hashlib.blake2b(f"{masterSeed}:{gameIndex}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _startWorker():
+    """
+        Loads the BoardSpec once in each worker, so the tasks it runs never parse the board file
+    """
+    loadBoardSpec()
+
+
+def _playChunk(start, stop, masterSeed, numPlayers, policies, maxTurns):
+    """
+        Plays the games with indexes start to stop - 1 of a tournament
+
+        Returns: A list of (gameIndex, winner, turns) tuples, kept small to send back cheaply
+
+        Parameter: start, the index of the first game to play
+        Requires: Must be of type int
+
+        Parameter: stop, the index after the last game to play
+        Requires: Must be of type int
+
+        Parameter: masterSeed, the seed of the tournament
+        Requires: Must be of type int
+
+        Parameter: numPlayers, the number of players in each game
+        Requires: Must be of type int
+
+        Parameter: policies, the policy of each player, in player order
+        Requires: Must be of type Policy list
+
+        Parameter: maxTurns, the number of turns after which a game is stopped
+        Requires: Must be of type int
+    """
+    players = [(i, f"Player {i}", "red") for i in range(1, numPlayers + 1)]
+    policyById = {player[0]: policy for player, policy in zip(players, policies)}
+    simulator = Simulator(maxTurns)
+    pool = GamePool(1)
+    results = []
+    for gameIndex in range(start, stop):
+        game = pool.acquire(players, gameSeed(masterSeed, gameIndex))
+        result = simulator.play(game, policyById)
+        pool.release(game)
+        results.append((gameIndex, result.winner, result.turns))
+    return results
+
+
+def streamTournament(numGames, masterSeed=0, numPlayers=4, policies=None, workers=None,
+                     chunkSize=CHUNK_SIZE, maxTurns=MAX_TURNS):
+    """
+        Plays numGames games across a pool of worker processes, yielding the results of each
+        chunk of games as soon as it finishes. Chunks finish in any order
+
+        Parameter: numGames, the number of games to play
+        Requires: Must be of type int
+
+        Parameter: masterSeed, the seed every game seed is derived from
+        Requires: Must be of type int
+
+        Parameter: numPlayers, the number of players in each game
+        Requires: Must be of type int
+
+        Parameter: policies, the policy of each player, in player order. Every player uses the
+        default Policy if None
+        Requires: Must be of type Policy list or None
+
+        Parameter: workers, the number of worker processes, one per core if None
+        Requires: Must be of type int or None
+
+        Parameter: chunkSize, the number of games in each task sent to a worker
+        Requires: Must be of type int
+
+        Parameter: maxTurns, the number of turns after which a game is stopped
+        Requires: Must be of type int
+    """
+    if policies is None:
+        policies = [Policy()] * numPlayers
+    with ProcessPoolExecutor(workers, initializer=_startWorker) as pool:
+        futures = [pool.submit(_playChunk, start, min(start + chunkSize, numGames), masterSeed,
+                               numPlayers, policies, maxTurns)
+                   for start in range(0, numGames, chunkSize)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def runTournament(numGames, masterSeed=0, numPlayers=4, policies=None, workers=None,
+                  chunkSize=CHUNK_SIZE, maxTurns=MAX_TURNS):
+    """
+        Plays numGames games across a pool of worker processes
+
+        Returns: A BatchResult with the results in game index order
+
+        The parameters are the same as streamTournament
+    """
+    start = time.perf_counter()
+    rows = []
+    for chunk in streamTournament(numGames, masterSeed, numPlayers, policies, workers,
+                                  chunkSize, maxTurns):
+        rows.extend(chunk)
+    rows.sort()
+    results = [GameResult(winner, turns) for gameIndex, winner, turns in rows]
+    return BatchResult(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    batch = runTournament(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
+    print(f"{batch.games} games, {batch.turns} turns in {batch.seconds:.2f}s")
+    print(f"{batch.gamesPerSecond():.1f} games/sec, {batch.turnsPerSecond():.0f} turns/sec")
+    print(f"wins: {batch.wins}")
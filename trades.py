@@ -0,0 +1,235 @@
+"""
+    Enumerates and scores every trade the current player could offer another player
+
+    A trade swaps a set of tiles of each player, with cash and Get Out of Jail Free cards going
+    one way. Tiles are only traded from color groups without houses. Each player's position is
+    valued group by group: every tile is worth its price, half if mortgaged, plus the rent it is
+    expected to earn over horizon opponent turns, from valuation.incomeTable. A complete color
+    group is valued at the better of its doubled rent and its rent with DEVELOPED_HOUSES houses
+    on every tile less their cost, which is what makes completing a group worth trading for.
+    The value of every subset of every group is worked out once per call, so scoring a swap only
+    looks up the groups it touches in each player's holdings bitmask.
+
+    Cash and cards move value from one side to the other without changing the total, so a swap
+    that loses value overall can be skipped without trying any amount, and for the rest only the
+    amounts that leave both sides better off are tried.
+"""
+import heapq
+from collections import namedtuple
+from itertools import combinations
+import valuation
+from boardspec import RAILROAD, UTILITY
+
+# The number of opponent turns the expected rent of a tile is counted over
+HORIZON = 60
+
+# The houses on every tile of a complete group it is valued with
+DEVELOPED_HOUSES = 3
+
+# The value of a Get Out of Jail Free card, the fine it saves
+JAIL_CARD_VALUE = 50
+
+# The most tiles each side gives in a trade
+MAX_TILES = 3
+
+# The smallest difference between two cash amounts tried
+CASH_STEP = 10
+
+# The number of trades returned
+TRADE_LIMIT = 50
+
+# A scored trade. give and take are the dictionaries to pass to Game.trade, gain and partnerGain
+# the change in value of the current player and of the partner
+TradeOption = namedtuple("TradeOption", ("gain", "partnerGain", "give", "take"))
+
+
+def evaluateTrades(game, partnerName, maxTiles=MAX_TILES, cashStep=CASH_STEP, horizon=HORIZON,
+                   limit=TRADE_LIMIT, minPartnerGain=0, jailStrategy="roll"):
+    """
+        Returns the best trades between the current player and the player with name,
+        partnerName, ranked by the current player's gain and then the partner's. Only trades
+        that leave the current player no worse off and give the partner at least minPartnerGain
+        are returned
+
+        Returns: A TradeOption list
+
+        Parameter: game, the game being played
+        Requires: Must be of type Game
+
+        Parameter: partnerName, the name of the player to trade with
+        Requires: Must be of type string, the name of another player in the game
+
+        Parameter: maxTiles, the most tiles each side gives
+        Requires: Must be of type int
+
+        Parameter: cashStep, the smallest difference between two cash amounts tried
+        Requires: Must be of type int, greater than 0
+
+        Parameter: horizon, the number of opponent turns rent is counted over
+        Requires: Must be of type int
+
+        Parameter: limit, the most trades returned
+        Requires: Must be of type int
+
+        Parameter: minPartnerGain, the least the partner must gain for a trade to be returned
+        Requires: Must be of type int
+
+        Parameter: jailStrategy, how opponents leave jail, see markov.solve
+        Requires: Must be of type string
+    """
+    state, spec = game.state, game.boardSpec
+    player = game.currentPlayer
+    partner = next(other for other in game.players if other.name == partnerName)
+    groups, groupValues = _groupValues(game, horizon, jailStrategy)
+    groupOf = {tileId: index for index, group in enumerate(groups) for tileId in group}
+    masks = [sum(1 << tileId for tileId in group) for group in groups]
+
+    def tradeable(holdings):
+        return [tileId for tileId in range(spec.numTiles) if holdings >> tileId & 1 and
+                not any(state.numHouses[memberId] for memberId in groups[groupOf[tileId]])]
+
+    holdings1, holdings2 = state.holdings[player.slot], state.holdings[partner.slot]
+    cash1, cash2 = state.cash[player.slot], state.cash[partner.slot]
+    cards1, cards2 = state.jailCards[player.slot], state.jailCards[partner.slot]
+
+    def score(give, take, touched):
+        gain = partnerGain = 0.0
+        new1 = holdings1 & ~give | take
+        new2 = holdings2 & ~take | give
+        while touched:
+            index = touched.bit_length() - 1
+            touched ^= 1 << index
+            values, mask = groupValues[index], masks[index]
+            gain += values[new1 & mask] - values[holdings1 & mask]
+            partnerGain += values[new2 & mask] - values[holdings2 & mask]
+        return gain, partnerGain
+
+    def subsets(tileIds, isGive):
+        result = []
+        for size in range(min(maxTiles, len(tileIds)) + 1):
+            for tiles in combinations(tileIds, size):
+                mask = sum(1 << tileId for tileId in tiles)
+                touched = 0
+                for tileId in tiles:
+                    touched |= 1 << groupOf[tileId]
+                result.append((mask, touched) + (score(mask, 0, touched) if isGive else
+                                                 score(0, mask, touched)))
+        return result
+
+    best = []
+    count = 0
+    takes = subsets(tradeable(holdings2), False)
+    for give, touched1, giveGain, givePartnerGain in subsets(tradeable(holdings1), True):
+        for take, touched2, takeGain, takePartnerGain in takes:
+            if give == take == 0:
+                continue
+            # Swaps that touch different groups score as the sum of their halves
+            if touched1 & touched2:
+                gain, partnerGain = score(give, take, touched1 | touched2)
+            else:
+                gain, partnerGain = giveGain + takeGain, givePartnerGain + takePartnerGain
+            # Cash and cards only move value between the sides, so no amount makes up for a
+            # swap without enough value in total, or one that cannot beat the worst trade kept
+            surplus = gain + partnerGain - minPartnerGain
+            if surplus < 0 or (len(best) == limit and surplus <= best[0][0]):
+                continue
+            for cards in range(-cards2, cards1 + 1):
+                cardGain = gain - cards * JAIL_CARD_VALUE
+                cardPartnerGain = partnerGain + cards * JAIL_CARD_VALUE
+                low = max(minPartnerGain - cardPartnerGain, -cash2)
+                high = min(cardGain, cash1)
+                cash = -(-low // cashStep) * cashStep
+                # The current player gains less with every step, so stop at the first amount
+                # that would not be kept
+                while cash <= high:
+                    option = (cardGain - cash, cardPartnerGain + cash, count, give, take, cards,
+                              int(cash))
+                    count += 1
+                    if len(best) < limit:
+                        heapq.heappush(best, option)
+                    elif option > best[0]:
+                        heapq.heapreplace(best, option)
+                    else:
+                        break
+                    cash += cashStep
+
+    return [_makeOption(game, player, partner, option) for option in sorted(best, reverse=True)]
+
+
+# HELPERS ------------------------------------------------------------------------------------------
+def _groupValues(game, horizon, jailStrategy):
+    """
+        Returns a (groups, values) tuple. groups holds the tile ids of every color group, the
+        railroads and the utilities, and values[i] maps every subset of groups[i], as a bitmask
+        of tile ids, to the value of owning exactly those tiles of the group
+
+        Parameter: game, the game being played
+        Requires: Must be of type Game
+
+        Parameter: horizon, the number of opponent turns rent is counted over
+        Requires: Must be of type int
+
+        Parameter: jailStrategy, how opponents leave jail, see markov.solve
+        Requires: Must be of type string
+    """
+    state, spec = game.state, game.boardSpec
+    table = valuation.incomeTable(spec, jailStrategy)
+    groups = list(spec.colorGroups.values())
+    for tileIds in (spec.railroads, spec.utilities):
+        if tileIds:
+            groups.append(tileIds)
+
+    values = []
+    for group in groups:
+        kind = spec.kinds[group[0]]
+        groupValue = {}
+        for size in range(len(group) + 1):
+            for tiles in combinations(group, size):
+                value = 0.0
+                income = 0.0
+                for tileId in tiles:
+                    mortgaged = state.mortgaged[tileId]
+                    value += spec.prices[tileId] // 2 if mortgaged else spec.prices[tileId]
+                    if mortgaged:
+                        continue
+                    if kind in (RAILROAD, UTILITY):
+                        income += table[tileId, size - 1]
+                    elif size == len(group):
+                        developed = (table[tileId, valuation.MONOPOLY + DEVELOPED_HOUSES] -
+                                     DEVELOPED_HOUSES * spec.houseCosts[tileId] / horizon)
+                        income += max(table[tileId, valuation.MONOPOLY], developed)
+                    else:
+                        income += table[tileId, valuation.UNIMPROVED]
+                groupValue[sum(1 << tileId for tileId in tiles)] = value + horizon * income
+        values.append(groupValue)
+    return groups, values
+
+
+def _makeOption(game, player, partner, option):
+    """
+        Returns the TradeOption of a trade scored by evaluateTrades
+
+        Parameter: game, the game being played
+        Requires: Must be of type Game
+
+        Parameter: player, the current player
+        Requires: Must be of type Player
+
+        Parameter: partner, the player traded with
+        Requires: Must be of type Player
+
+        Parameter: option, the (gain, partner gain, count, give mask, take mask, net cards, net
+        cash) tuple of the trade, cards and cash going from the current player to the partner
+        Requires: Must be of type tuple
+    """
+    gain, partnerGain, count, give, take, cards, cash = option
+    tileNames = game.state.tileNames
+
+    def names(mask):
+        return [tileNames[tileId] for tileId in range(len(tileNames)) if mask >> tileId & 1]
+
+    return TradeOption(float(gain), float(partnerGain),
+                       {"name": player.name, "cash": max(cash, 0), "properties": names(give),
+                        "jailCards": max(cards, 0)},
+                       {"name": partner.name, "cash": max(-cash, 0), "properties": names(take),
+                        "jailCards": max(-cards, 0)})
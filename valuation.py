@@ -0,0 +1,235 @@
+"""
+    Values every tile by the rent it is expected to earn each time an opponent takes a turn
+
+    A tile's expected income per opponent turn is the expected number of times a player lands on
+    it in one turn, from markov.landingsPerTurn, times the rent owed. Railroads are paid double by
+    players the nearest railroad card sends there. Utilities are paid their multiple of the mean
+    roll, except by players the nearest utility card sends there, who always pay ten times it.
+
+    incomeTable holds the income of every tile at every level it can be at. A RentValuation
+    follows a live game, keeping the income of every tile and player as it stands, and only
+    works out the tiles whose owner or rent changed since it was last asked.
+"""
+import numpy as np
+import markov
+from boardspec import CHANCE, COMMUNITY_CHEST, PROPERTY, RAILROAD, UTILITY
+from cards import (ADVANCE, BACK, CHANCE_CARDS, COMMUNITY_CHEST_CARDS, JAIL, NEAREST_RAILROAD,
+                   NEAREST_UTILITY)
+
+# The mean of two dice, what a utility's multiple is paid on
+MEAN_ROLL = 7
+
+# The levels of a tile in incomeTable. A property is unimproved, unimproved in a monopoly, or has
+# 1 to 5 houses; level n of a railroad is n + 1 railroads owned, and of a utility n + 1
+# utilities owned
+NUM_LEVELS = 7
+UNIMPROVED = 0
+MONOPOLY = 1
+
+# The multiple of the roll a utility owner is paid by how many utilities they own
+UTILITY_MULTIPLES = (4, 10)
+
+# The rent of a railroad by how many railroads its owner has
+RAILROAD_RENTS = (25, 50, 100, 200)
+
+# The tables and rent coefficients already worked out, by (board file hash, jail strategy)
+_cache = {}
+
+
+def incomeTable(spec, jailStrategy="roll"):
+    """
+        Returns a read only numpy array with the expected income per opponent turn of every tile
+        at every level, table[tileId, level], see the level constants. Levels a tile cannot be
+        at, and tiles that take no rent, are 0
+
+        Parameter: spec, the board
+        Requires: Must be of type BoardSpec
+
+        Parameter: jailStrategy, how opponents leave jail, "roll" or "pay", see markov.solve
+        Requires: Must be of type string
+    """
+    return _coefficients(spec, jailStrategy)[0]
+
+
+class RentValuation:
+    def __init__(self, game, jailStrategy="roll"):
+        """
+            Creates a valuation of the tiles and players of game, kept up to date as it changes
+
+            Parameter: game, the game to value
+            Requires: Must be of type Game
+
+            Parameter: jailStrategy, how opponents leave jail, "roll" or "pay", see markov.solve
+            Requires: Must be of type string
+        """
+        self.game = game
+        spec = game.boardSpec
+        self.table, self.perRent, self.perOwned = _coefficients(spec, jailStrategy)
+        self.groupMasks = {color: sum(1 << tileId for tileId in group)
+                           for color, group in spec.colorGroups.items()}
+        self.state = None
+        self.version = None
+
+    # GETTERS ------------------------------------------------------------------------------------
+    def getIncome(self, tileId):
+        """
+            Returns the expected income per opponent turn of the tile with id, tileId, as it
+            stands, 0 if it is unowned or mortgaged
+
+            Parameter: tileId, the id of the tile
+            Requires: Must be of type int
+        """
+        self._refresh()
+        return float(self.income[tileId])
+
+    def getIncomes(self):
+        """
+            Returns a read only numpy array with the expected income per opponent turn of every
+            tile as it stands. The array is updated in place as the game changes
+        """
+        self._refresh()
+        return self.incomeView
+
+    def getPlayerIncome(self, slot):
+        """
+            Returns the expected income per opponent turn of every tile of the player in slot
+            together. The player earns it once for every opponent left in each round
+
+            Parameter: slot, the slot of the player
+            Requires: Must be of type int
+        """
+        self._refresh()
+        return float(self.playerIncome[slot])
+
+    def getIncomeAt(self, tileId, level):
+        """
+            Returns the expected income per opponent turn of the tile with id, tileId, at level,
+            see incomeTable
+
+            Parameter: tileId, the id of the tile
+            Requires: Must be of type int
+
+            Parameter: level, the level of the tile
+            Requires: Must be of type int, from 0 to NUM_LEVELS - 1
+        """
+        return float(self.table[tileId, level])
+
+    def getBuildGain(self, tileId):
+        """
+            Returns the expected income per opponent turn one more house on the tile with id,
+            tileId, would add, 0 if it is not a property in a monopoly with room for a house
+
+            Parameter: tileId, the id of the tile
+            Requires: Must be of type int
+        """
+        state = self.game.state
+        owner = state.owner[tileId]
+        numHouses = state.numHouses[tileId]
+        if owner < 0 or numHouses >= 5 or self.game.boardSpec.kinds[tileId] != PROPERTY:
+            return 0.0
+        mask = self.groupMasks[self.game.boardSpec.colors[tileId]]
+        if state.holdings[owner] & mask != mask:
+            return 0.0
+        return float(self.table[tileId, numHouses + 2] - self.table[tileId, numHouses + 1])
+
+    # HELPERS ------------------------------------------------------------------------------------
+    def _refresh(self):
+        """
+            Works out the income of every tile whose owner or rent changed since the last call,
+            and the income of the players again if any did. Does nothing if the game has not
+            changed at all
+        """
+        state = self.game.state
+        if state is not self.state:
+            self._bind(state)
+        elif state.version == self.version:
+            return
+        self.version = state.version
+        changed = np.flatnonzero((self.rent != self.lastRent) | (self.owner != self.lastOwner))
+        if changed.size == 0:
+            return
+        rent = self.rent[changed]
+        self.income[changed] = self.perRent[changed] * rent + self.perOwned[changed] * (rent > 0)
+        self.lastRent[changed] = rent
+        self.lastOwner[changed] = self.owner[changed]
+        owned = self.owner >= 0
+        self.playerIncome[:] = np.bincount(self.owner[owned], self.income[owned],
+                                           len(self.playerIncome))
+
+    def _bind(self, state):
+        """
+            Starts following the columns of state, reading its owner and rent columns in place
+
+            Parameter: state, the game's BoardState
+            Requires: Must be of type BoardState
+        """
+        self.state = state
+        self.owner = np.frombuffer(state.owner, np.int8)
+        self.rent = np.frombuffer(state.rent, np.intc)
+        numTiles = len(self.owner)
+        # The owner and rent of every tile when its income was last worked out, set so that the
+        # first refresh works out every tile
+        self.lastOwner = np.full(numTiles, -2, np.int8)
+        self.lastRent = np.zeros(numTiles, np.intc)
+        self.income = np.zeros(numTiles)
+        self.incomeView = self.income.view()
+        self.incomeView.setflags(write=False)
+        self.playerIncome = np.zeros(len(state.cash))
+        self.version = None
+
+
+# HELPERS ------------------------------------------------------------------------------------------
+def _coefficients(spec, jailStrategy):
+    """
+        Returns an (incomeTable, perRent, perOwned) tuple for spec. The income of a tile is
+        perRent times the rent in the BoardState's rent column, which is a multiple of the roll
+        for utilities, plus perOwned if that rent is not 0
+
+        Parameter: spec, the board
+        Requires: Must be of type BoardSpec
+
+        Parameter: jailStrategy, how opponents leave jail, "roll" or "pay"
+        Requires: Must be of type string
+    """
+    key = (spec.digest, jailStrategy)
+    if key in _cache:
+        return _cache[key]
+
+    perTurn = markov.landingsPerTurn(spec.path, jailStrategy)
+    # The landings per turn on each tile that come from the nearest railroad and utility cards
+    byCard = np.zeros(spec.numTiles)
+    for tileId, kind in enumerate(spec.kinds):
+        if kind not in (CHANCE, COMMUNITY_CHEST):
+            continue
+        cards = CHANCE_CARDS if kind == CHANCE else COMMUNITY_CHEST_CARDS
+        staying = sum(1 for card in cards
+                      if card[1] not in (ADVANCE, NEAREST_RAILROAD, NEAREST_UTILITY, BACK, JAIL))
+        # perTurn only counts the players still on the tile after drawing
+        drawsPerTurn = perTurn[tileId] * len(cards) / staying
+        for text, opcode, arg in cards:
+            if opcode == NEAREST_RAILROAD:
+                byCard[markov.nextTile(spec.railroads, tileId)] += drawsPerTurn / len(cards)
+            elif opcode == NEAREST_UTILITY:
+                byCard[markov.nextTile(spec.utilities, tileId)] += drawsPerTurn / len(cards)
+
+    table = np.zeros((spec.numTiles, NUM_LEVELS))
+    perRent = np.zeros(spec.numTiles)
+    perOwned = np.zeros(spec.numTiles)
+    for tileId, kind in enumerate(spec.kinds):
+        if kind == PROPERTY:
+            rents = spec.rents[tileId]
+            perRent[tileId] = perTurn[tileId]
+            table[tileId] = perTurn[tileId] * np.array((rents[0], rents[0] * 2) + rents[1:6])
+        elif kind == RAILROAD:
+            perRent[tileId] = perTurn[tileId] + byCard[tileId]
+            table[tileId, :len(RAILROAD_RENTS)] = perRent[tileId] * np.array(RAILROAD_RENTS)
+        elif kind == UTILITY:
+            perRent[tileId] = (perTurn[tileId] - byCard[tileId]) * MEAN_ROLL
+            perOwned[tileId] = byCard[tileId] * UTILITY_MULTIPLES[-1] * MEAN_ROLL
+            table[tileId, :len(UTILITY_MULTIPLES)] = (perRent[tileId] *
+                                                     np.array(UTILITY_MULTIPLES) +
+                                                     perOwned[tileId])
+    for array in (table, perRent, perOwned):
+        array.setflags(write=False)
+    _cache[key] = (table, perRent, perOwned)
+    return _cache[key]
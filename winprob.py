@@ -0,0 +1,311 @@
+"""
+    Estimates the probability that each player wins a game from its current state
+
+    The game is saved with savegame and sent to a pool of worker processes, which load it and
+    play it out many times with the given policies, each rollout rolling dice seeded from the
+    master seed and its index alone. Most games between bots last longer than any live estimate
+    can wait for, so a rollout still going after maxTurns turns is won by the player with the
+    highest net worth, see mcts.netWorths. As chunks of rollouts come back the estimate is updated and
+    streamed out with a Wilson score interval for every player, and the estimator stops on its
+    own once every interval is narrower than the tolerance, or the deadline passes.
+
+    estimates is a generator for callers that can wait on it, such as a server handler. A GUI
+    calls start instead, which runs the estimator on a background thread, and polls latest from
+    its own loop, for instance with Tk's after, so the main loop never blocks.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+import savegame
+from game import *
+from policies import Policy
+from mcts import netWorths
+from simulation import Simulator
+from tournament import gameSeed
+
+# The number of turns after which a rollout is won by the richest player
+ROLLOUT_TURNS = 200
+
+# The number of rollouts each worker plays per task
+ROLLOUT_CHUNK = 8
+
+# The confidence of the intervals
+CONFIDENCE = 0.95
+
+# The widest half width of an interval at which the estimator stops
+TOLERANCE = 0.02
+
+# The seconds after which the estimator stops, however wide the intervals
+DEADLINE = 10.0
+
+# The rollouts played before the intervals are trusted enough to stop on
+MIN_ROLLOUTS = 32
+
+# An estimate of the win probabilities. probabilities and intervals map the name of every player
+# left to their probability of winning and its (low, high) interval, and unfinished is the
+# number of rollouts won on net worth
+Estimate = namedtuple("Estimate", ("rollouts", "unfinished", "probabilities", "intervals",
+                                   "seconds", "done"))
+
+
+class WinProbabilityEstimator:
+    def __init__(self, game, policies=None, workers=None, masterSeed=0, maxTurns=ROLLOUT_TURNS,
+                 chunkSize=ROLLOUT_CHUNK):
+        """
+            Creates an estimator of the win probabilities of the players of game, as it is now.
+            Later changes to game do not affect the estimator
+
+            Parameter: game, the game to estimate
+            Requires: Must be of type Game
+
+            Parameter: policies, the policy of each player in the rollouts, by player id. Every
+            player uses the default Policy if None
+            Requires: Must be of type dict with int keys and Policy values, or None; the
+            policies must be picklable
+
+            Parameter: workers, the number of worker processes, one per core if None, or 0 to
+            play the rollouts in this process
+            Requires: Must be of type int or None
+
+            Parameter: masterSeed, the seed every rollout seed is derived from
+            Requires: Must be of type int
+
+            Parameter: maxTurns, the number of turns after which a rollout is won on net worth
+            Requires: Must be of type int
+
+            Parameter: chunkSize, the number of rollouts in each task sent to a worker
+            Requires: Must be of type int, greater than 0
+        """
+        self.data = savegame.dumps(game)
+        self.players = [(player.id, player.name, player.color) for player in game.state.players]
+        self.names = [player.name for player in game.players]
+        if policies is None:
+            policies = {player[0]: Policy() for player in self.players}
+        self.policies = policies
+        self.workers = workers
+        self.masterSeed = masterSeed
+        self.maxTurns = maxTurns
+        self.chunkSize = chunkSize
+        # The last estimate made, None before the first, read by callers polling a background
+        # estimator
+        self.latest = None
+        self._stopped = threading.Event()
+
+    def estimates(self, tolerance=TOLERANCE, deadline=DEADLINE, confidence=CONFIDENCE,
+                  maxRollouts=None):
+        """
+            Yields an Estimate every time a chunk of rollouts finishes, until every interval has
+            a half width of at most tolerance, deadline seconds have passed, maxRollouts rollouts
+            have been played or stop is called. The last estimate yielded has done set, and is
+            made from the rollouts finished so far if the deadline passes or stop is called
+            while waiting on a chunk, even if none have finished
+
+            Parameter: tolerance, the widest half width of an interval to stop at
+            Requires: Must be of type float
+
+            Parameter: deadline, the seconds after which to stop
+            Requires: Must be of type float
+
+            Parameter: confidence, the confidence of the intervals
+            Requires: Must be of type float, from 0 to 1
+
+            Parameter: maxRollouts, the most rollouts to play, no limit if None
+            Requires: Must be of type int or None
+        """
+        self._stopped.clear()
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        start = time.perf_counter()
+        wins = [0] * len(self.players)
+        unfinished = rollouts = 0
+        for chunkWins, chunkUnfinished in self._chunks(start + deadline, maxRollouts):
+            for slot, count in enumerate(chunkWins):
+                wins[slot] += count
+            rollouts += sum(chunkWins)
+            unfinished += chunkUnfinished
+            estimate = self._estimate(wins, rollouts, unfinished, z,
+                                      time.perf_counter() - start)
+            done = (self._stopped.is_set() or time.perf_counter() - start >= deadline or
+                    (maxRollouts is not None and rollouts >= maxRollouts) or
+                    (rollouts >= MIN_ROLLOUTS and
+                     all((high - low) / 2 <= tolerance
+                         for low, high in estimate.intervals.values())))
+            self.latest = estimate._replace(done=done)
+            yield self.latest
+            if done:
+                return
+
+        # The deadline passed or stop was called before another chunk finished
+        self.latest = self._estimate(wins, rollouts, unfinished, z,
+                                     time.perf_counter() - start)._replace(done=True)
+        yield self.latest
+
+    def start(self, callback=None, **kwargs):
+        """
+            Runs estimates on a daemon thread, keeping latest up to date and calling callback
+            with every estimate, and returns the thread. The callback runs on that thread, so a
+            Tk GUI should poll latest with after rather than touch widgets from the callback
+
+            Parameter: callback, the function called with each estimate, or None
+            Requires: Must be a function taking an Estimate, or None
+
+            Parameter: kwargs, the arguments of estimates
+        """
+        def run():
+            for estimate in self.estimates(**kwargs):
+                if callback is not None:
+                    callback(estimate)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """
+            Stops the estimator after the chunk of rollouts it is waiting on, the next estimate
+            being the last
+        """
+        self._stopped.set()
+
+    # HELPERS ------------------------------------------------------------------------------------
+    def _chunks(self, deadline, maxRollouts):
+        """
+            Yields the win counts of every chunk of rollouts as it finishes, see _playRollouts,
+            keeping two tasks per worker queued and cancelling the rest once the caller stops
+
+            Parameter: deadline, the time.perf_counter() value after which no more tasks are sent
+            Requires: Must be of type float
+
+            Parameter: maxRollouts, the most rollouts to play, no limit if None
+            Requires: Must be of type int or None
+        """
+        args = (self.data, self.players, self.policies, self.masterSeed, self.maxTurns)
+        tasks = self._tasks(maxRollouts)
+        if self.workers == 0:
+            for start, stop in tasks:
+                yield _playRollouts(start, stop, *args)
+            return
+
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers, initializer=loadBoardSpec) as pool:
+            pending = set()
+            try:
+                while True:
+                    while (len(pending) < 2 * workers and not self._stopped.is_set() and
+                           time.perf_counter() < deadline):
+                        task = next(tasks, None)
+                        if task is None:
+                            break
+                        pending.add(pool.submit(_playRollouts, *task, *args))
+                    if not pending:
+                        return
+                    done, pending = wait(pending, max(deadline - time.perf_counter(), 0),
+                                         FIRST_COMPLETED)
+                    if not done:
+                        return
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _tasks(self, maxRollouts):
+        """
+            Yields the (start, stop) indexes of the rollouts of every task, without end if
+            maxRollouts is None
+
+            Parameter: maxRollouts, the most rollouts to play, no limit if None
+            Requires: Must be of type int or None
+        """
+        start = 0
+        while maxRollouts is None or start < maxRollouts:
+            stop = start + self.chunkSize
+            yield start, stop if maxRollouts is None else min(stop, maxRollouts)
+            start = stop
+
+    def _estimate(self, wins, rollouts, unfinished, z, seconds):
+        """
+            Returns the Estimate for wins out of rollouts, with Wilson score intervals. With no
+            rollouts every player has an even share and an interval from 0 to 1
+
+            Parameter: wins, the number of rollouts won by the player in each slot
+            Requires: Must be of type int list
+
+            Parameter: rollouts, the number of rollouts played
+            Requires: Must be of type int
+
+            Parameter: unfinished, the number of rollouts won on net worth
+            Requires: Must be of type int
+
+            Parameter: z, the number of standard deviations the intervals span on each side
+            Requires: Must be of type float
+
+            Parameter: seconds, the seconds since the estimator started
+            Requires: Must be of type float
+        """
+        probabilities = {}
+        intervals = {}
+        for slot, (playerId, name, color) in enumerate(self.players):
+            if name not in self.names:
+                continue
+            if rollouts == 0:
+                probabilities[name] = 1 / len(self.names)
+                intervals[name] = (0.0, 1.0)
+                continue
+            p = wins[slot] / rollouts
+            centre = (p + z * z / (2 * rollouts)) / (1 + z * z / rollouts)
+            halfWidth = (z / (1 + z * z / rollouts) *
+                         (p * (1 - p) / rollouts + z * z / (4 * rollouts * rollouts)) ** 0.5)
+            probabilities[name] = p
+            intervals[name] = (max(centre - halfWidth, 0.0), min(centre + halfWidth, 1.0))
+        return Estimate(rollouts, unfinished, probabilities, intervals, seconds, False)
+
+
+def _playRollouts(start, stop, data, players, policies, masterSeed, maxTurns):
+    """
+        Plays the rollouts with indexes start to stop - 1 from the game saved in data. A debt
+        the current player owed when the game was saved is settled first, by Simulator.steps
+
+        Returns: A (wins, unfinished) tuple, with the number of rollouts won by the player in
+        each slot and the number of them won on net worth, kept small to send back cheaply
+
+        Parameter: start, the index of the first rollout
+        Requires: Must be of type int
+
+        Parameter: stop, the index after the last rollout
+        Requires: Must be of type int
+
+        Parameter: data, the save of the game
+        Requires: Must be of type bytes, returned by savegame.dumps
+
+        Parameter: players, the player information of every slot of the game
+        Requires: Must be of type (int, string, string) list
+
+        Parameter: policies, the policy of each player, by player id
+        Requires: Must be of type dict with int keys and Policy values
+
+        Parameter: masterSeed, the seed every rollout seed is derived from
+        Requires: Must be of type int
+
+        Parameter: maxTurns, the number of turns after which a rollout is won on net worth
+        Requires: Must be of type int
+    """
+    game = Game(players)
+    game.events.enabled = False
+    simulator = Simulator(maxTurns)
+    slots = {player[1]: slot for slot, player in enumerate(players)}
+    wins = [0] * len(players)
+    unfinished = 0
+    for index in range(start, stop):
+        savegame.loads(game, data)
+        game.dice.reset(gameSeed(masterSeed, index))
+        winner = simulator.play(game, policies).winner
+        if winner is None:
+            worths = netWorths(game)
+            wins[max(worths, key=worths.get)] += 1
+            unfinished += 1
+        else:
+            wins[slots[winner]] += 1
+    return wins, unfinished